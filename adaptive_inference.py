@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+播放时的自适应推理 - 按推理耗时和动作幅度决定每隔几帧推理一次
+中间帧的关键点由最近两次推理结果线性外推得到，高帧率或较慢的机器上播放仍能跟上时钟
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from pose_renderer import VISIBILITY_THRESHOLD
+
+
+class InferenceScheduler:
+    """单个视频播放流的推理间隔调度器"""
+
+    def __init__(self, fps: float = 30.0, max_stride: int = 4, frame_budget: float = 0.7,
+                 max_motion: float = 0.01, latency_smoothing: float = 0.2):
+        """
+        Args:
+            fps: 视频帧率（决定每帧的时间预算）
+            max_stride: 最大推理间隔（帧）
+            frame_budget: 推理可占用的帧间隔比例，其余留给解码和显示
+            max_motion: 外推帧允许的最大关键点位移（归一化坐标），动作越大间隔越小
+            latency_smoothing: 推理耗时指数平均的权重
+        """
+        self.max_stride = max(1, max_stride)
+        self.frame_budget = frame_budget
+        self.max_motion = max_motion
+        self.latency_smoothing = latency_smoothing
+        self.set_fps(fps)
+        self.reset()
+
+    def set_fps(self, fps: float):
+        """设置视频帧率"""
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30.0
+
+    def reset(self):
+        """清除历史（跳转到不连续的位置后调用），下一帧重新推理"""
+        self.stride = 1
+        self.latency: Optional[float] = None
+        self.motion = 0.0
+        # 最近两次已知关键点 (帧序号, 关键点)，用于外推
+        self.previous = None
+        self.last = None
+
+    def should_infer(self, frame_index: int) -> bool:
+        """该帧是否需要推理（不连续时自动重置）"""
+        if self.last is None:
+            return True
+        gap = frame_index - self.last[0]
+        if gap <= 0 or gap > self.max_stride:
+            self.reset()
+            return True
+        return gap >= self.stride
+
+    def record(self, frame_index: int, landmarks: Optional[np.ndarray], latency: Optional[float] = None):
+        """
+        记录已知的关键点并更新推理间隔
+
+        Args:
+            frame_index: 帧序号
+            landmarks: 推理或缓存得到的关键点，None表示未检测到姿态
+            latency: 本次推理耗时（秒），来自缓存时为None
+        """
+        if latency is not None:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += (latency - self.latency) * self.latency_smoothing
+
+        if landmarks is None:
+            # 未检测到姿态时不外推，逐帧推理以便尽快重新检测到
+            self.previous = self.last = None
+            self.motion = 0.0
+            self.stride = 1
+            return
+
+        if self.last is not None and frame_index > self.last[0]:
+            self.previous = self.last
+            self.motion = self.motion_per_frame(self.previous, (frame_index, landmarks))
+        self.last = (frame_index, landmarks)
+        self.stride = self.choose_stride()
+
+    @staticmethod
+    def motion_per_frame(older, newer) -> float:
+        """两次关键点之间可见关键点的平均每帧位移（归一化坐标）"""
+        (older_index, older_landmarks), (newer_index, newer_landmarks) = older, newer
+        visible = ((older_landmarks[:, 3] > VISIBILITY_THRESHOLD)
+                   & (newer_landmarks[:, 3] > VISIBILITY_THRESHOLD))
+        if not visible.any():
+            return 0.0
+        displacement = np.linalg.norm(newer_landmarks[visible, :2] - older_landmarks[visible, :2], axis=1)
+        return float(displacement.mean()) / (newer_index - older_index)
+
+    def choose_stride(self) -> int:
+        """
+        推理间隔：不小于保持实时所需的间隔（按推理耗时），
+        在此之上动作越小可以越大（外推误差不超过 max_motion）
+        """
+        needed = 1
+        if self.latency is not None:
+            needed = math.ceil(self.latency / (self.frame_interval * self.frame_budget))
+
+        # 还不知道动作幅度时逐帧推理
+        allowed = 1
+        if self.previous is not None:
+            allowed = int(self.max_motion / self.motion) if self.motion > 0 else self.max_stride
+
+        return max(1, min(self.max_stride, max(needed, allowed)))
+
+    def estimate(self, frame_index: int) -> Optional[np.ndarray]:
+        """未推理帧的关键点：由最近两次关键点线性外推，只有一次时沿用"""
+        if self.last is None:
+            return None
+        last_index, last_landmarks = self.last
+        if self.previous is None:
+            return last_landmarks
+
+        previous_index, previous_landmarks = self.previous
+        t = (frame_index - last_index) / (last_index - previous_index)
+        estimated = last_landmarks.copy()
+        estimated[:, :3] += (last_landmarks[:, :3] - previous_landmarks[:, :3]) * t
+        # 可见度取两次中较小的值，避免只在一次中可见的点被外推
+        estimated[:, 3] = np.minimum(last_landmarks[:, 3], previous_landmarks[:, 3])
+        return estimated
@@ -0,0 +1,719 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+视频导出管线 - 在工作线程中完成解码、姿态检测、绘制和编码
+界面只接收限频后的进度和预览信号，导出循环不再依赖 processEvents()
+
+并行导出模式将视频按时间分段，每段在独立的子进程中处理（各自的Pose实例），
+最后无损拼接为一个文件
+"""
+
+import math
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import cv2
+from PySide6.QtCore import QThread, Signal
+
+from landmark_cache import LandmarkCache
+from pose_renderer import PoseStyle, draw_pose_landmarks, orient_frame, orient_landmarks, output_frame_size
+from video_encoder import create_video_encoder, ffmpeg_available, open_video_writer, release_encoder
+from video_pipeline import frame_timestamp_ms
+from watermark import WatermarkCompositor, WatermarkSettings
+
+# 并行导出时每段的最少帧数（太短的分段进程启动开销大于收益）
+MIN_SEGMENT_FRAMES = 120
+
+# 每段开头额外推理的预热帧数，使跟踪状态与前一段衔接
+SEGMENT_WARMUP_FRAMES = 15
+
+# 子进程发送的预览帧最大宽度
+PREVIEW_MAX_WIDTH = 640
+
+
+class FrameResampler:
+    """
+    按时间戳把源帧率重采样到输出帧率（只降帧，不插帧）
+
+    输出第k帧的时间戳为 k / 输出帧率，取该时刻正在显示的源帧 floor(k * 源帧率 / 输出帧率)，
+    因此 59.94→25 这类非整数比例也能均匀选帧；判断只依赖帧序号，各分段可以独立判断
+    """
+
+    def __init__(self, source_fps: float, output_fps: Optional[float] = None):
+        """
+        Args:
+            source_fps: 源视频帧率
+            output_fps: 目标帧率，None或不低于源帧率时保留全部帧
+        """
+        self.source_fps = source_fps
+        if not output_fps or source_fps <= 0 or output_fps >= source_fps:
+            output_fps = source_fps
+        self.output_fps = output_fps
+        self.ratio = source_fps / output_fps if output_fps > 0 else 1.0
+
+    @property
+    def keeps_all(self) -> bool:
+        return self.ratio <= 1.0
+
+    def keeps(self, frame_index: int) -> bool:
+        """源帧是否会被输出"""
+        if self.keeps_all:
+            return True
+        # 时间戳不早于该源帧的第一个输出帧，是否仍落在该源帧上
+        k = math.ceil(frame_index / self.ratio - 1e-9)
+        return math.floor(k * self.ratio + 1e-9) == frame_index
+
+    def kept_count(self, start: int, end: int) -> int:
+        """[start, end) 范围内输出的帧数"""
+        if self.keeps_all:
+            return max(0, end - start)
+        return sum(1 for i in range(start, end) if self.keeps(i))
+
+
+def read_resampled(cap, start: int, end: int,
+                   resampler: Optional[FrameResampler] = None) -> Iterator[Tuple[int, object]]:
+    """
+    从当前位置（须为start）顺序读取 [start, end) 中需要输出的帧
+
+    不输出的帧只 grab() 跳过，不做解码后的格式转换和拷贝
+
+    Yields:
+        (源帧序号, BGR帧)
+    """
+    for frame_index in range(start, end):
+        if resampler is not None and not resampler.keeps(frame_index):
+            if not cap.grab():
+                return
+            continue
+        ret, frame = cap.read()
+        if not ret:
+            return
+        yield frame_index, frame
+
+
+class ExportJob:
+    """单个视频的导出任务参数"""
+
+    def __init__(self, video_num: int, video_path: str, output_path: str,
+                 rotation: int = 0, output_fps: Optional[float] = None,
+                 quality: Optional[dict] = None, audio_source: Optional[str] = None,
+                 mirror: bool = False, resolution: Optional[int] = None,
+                 pose_style: Optional[PoseStyle] = None,
+                 watermark_settings: Optional[WatermarkSettings] = None,
+                 cache: Optional[LandmarkCache] = None, pose_options: Optional[dict] = None,
+                 target_seed: Optional[Tuple[int, Tuple[float, float, float, float]]] = None):
+        """
+        Args:
+            video_num: 视频编号（1或2）
+            video_path: 源视频文件路径（工作线程使用独立的VideoCapture）
+            output_path: 输出文件路径
+            rotation: 导出旋转角度（0-3，每级90度）
+            output_fps: 输出帧率，None表示使用原始帧率（高于原始帧率时也保持原始帧率）
+            quality: 编码质量设置 {"crf", "preset", "bitrate"}
+            audio_source: 提供音频的原始视频文件（编码时直接合并）
+            mirror: 旋转后是否水平镜像
+            resolution: 输出帧短边的像素数，None表示原始分辨率
+            pose_style: 开始导出时的骨架样式快照
+            watermark_settings: 开始导出时的水印设置快照
+            cache: 该视频的关键点缓存（开始导出时按当时的后端和导出配置确定），None表示不使用缓存
+            pose_options: 缓存缺失时创建姿态检测引擎的参数（create_pose_engine() 的参数，模型和输入分辨率已固定），
+                None表示不做姿态检测
+            target_seed: 用户锁定的目标人物 (帧序号, 该帧上的包围框)，导出引擎据此锁定同一人；
+                None表示自动跟随最大的人物。缓存中保存的是自动选择的人物，指定目标时不应同时使用缓存
+
+        导出线程只使用任务中的设置，导出过程中界面上的修改（包括加载新视频、切换配置或后端）不影响正在导出的视频
+        """
+        self.video_num = video_num
+        self.video_path = video_path
+        self.output_path = output_path
+        self.rotation = rotation
+        self.output_fps = output_fps
+        self.quality = quality
+        self.audio_source = audio_source
+        self.mirror = mirror
+        self.resolution = resolution
+        self.pose_style = pose_style or PoseStyle()
+        self.watermark_settings = watermark_settings or WatermarkSettings(enabled=False)
+        self.cache = cache
+        self.pose_options = pose_options
+        self.target_seed = target_seed
+
+        # 打开视频后填写（total_frames为重采样后的输出帧数）
+        self.total_frames = 0
+        self.output_width = 0
+        self.output_height = 0
+        # 编码时是否已合并了原始音频（否则需要之后单独添加）
+        self.audio_muxed = False
+
+
+class LandmarkSource:
+    """
+    导出帧的关键点来源：已缓存的帧直接读取，缓存缺失的帧才推理并写入缓存
+
+    姿态检测引擎在第一次缓存缺失时才创建（整段已缓存时不加载MediaPipe），
+    只在创建它的线程或子进程中使用，用完后调用 close()
+    """
+
+    def __init__(self, cache: Optional[LandmarkCache], pose_options: Optional[dict], fps: float,
+                 target_seed: Optional[Tuple[int, Tuple[float, float, float, float]]] = None):
+        """
+        Args:
+            cache: 关键点缓存，None表示不使用缓存
+            pose_options: 创建引擎的参数，None表示不做姿态检测（缓存缺失的帧没有关键点）
+            fps: 源视频帧率（计算推理时间戳）
+            target_seed: 锁定的目标 (帧序号, 包围框)：从第一帧起跟随与该包围框最接近的人，
+                到达该帧时再按包围框重新确认（与锁定时是同一帧的检测结果）
+        """
+        self.cache = cache
+        self.pose_options = pose_options
+        self.fps = fps
+        self.target_seed = target_seed
+        self.engine = None
+        # 是否已在锁定目标的帧上重新确认过目标
+        self.seed_confirmed = False
+
+    def get(self, frame, frame_index: int):
+        """获取源帧的关键点（推理在原始方向的帧上进行），未检测到时为None"""
+        if self.cache is not None and self.cache.has(frame_index):
+            landmarks, _ = self.cache.get(frame_index)
+            return landmarks
+        if self.pose_options is None:
+            return None
+
+        if self.engine is None:
+            # 只在需要推理时才加载MediaPipe
+            from pose_engine import create_pose_engine
+            self.engine = create_pose_engine(**self.pose_options)
+            if self.target_seed is not None:
+                self.engine.seed_target(self.target_seed[1])
+        if self.target_seed is not None and not self.seed_confirmed and frame_index >= self.target_seed[0]:
+            self.engine.seed_target(self.target_seed[1])
+            self.seed_confirmed = True
+        landmarks, world_landmarks = self.engine.detect(frame, frame_timestamp_ms(frame_index, self.fps))
+        if self.cache is not None:
+            self.cache.put(frame_index, landmarks, world_landmarks)
+        return landmarks
+
+    def close(self):
+        """释放引擎并把新推理的结果写回缓存"""
+        if self.engine is not None:
+            self.engine.close()
+            self.engine = None
+        if self.cache is not None:
+            self.cache.flush()
+
+
+class ExportWorker(QThread):
+    """视频导出工作线程"""
+
+    # 视频编号, 已写入帧数, 总帧数, 已用时间（秒）
+    progress = Signal(int, int, int, float)
+    # 视频编号, 最新处理完成的帧（BGR）
+    preview = Signal(int, object)
+    # 视频编号, 阶段名称（"encoding"、"concat" 或 "audio"）
+    stage_changed = Signal(int, str)
+    # 视频编号, 最终输出路径, 总耗时（秒）, 是否完整完成（未被取消）
+    export_finished = Signal(int, str, float, bool)
+    # 视频编号, 错误信息
+    export_failed = Signal(int, str)
+
+    def __init__(self, job: ExportJob, process_frame: Optional[Callable] = None,
+                 finalize: Optional[Callable] = None,
+                 progress_interval: float = 0.2, preview_interval: float = 0.5,
+                 parent=None):
+        """
+        初始化导出线程
+
+        Args:
+            job: 导出任务
+            process_frame: 帧处理函数 process_frame(frame, frame_index) -> 处理后的帧（frame_index为源帧序号，
+                输出尺寸为 job.output_width x job.output_height），None表示按任务中的缓存、模型、样式和水印生成
+            finalize: 编码完成后的处理函数 finalize(output_path) -> 最终路径（编码时未能合并音频时用于添加音频）
+            progress_interval: 进度信号的最小间隔（秒）
+            preview_interval: 预览信号的最小间隔（秒）
+        """
+        super().__init__(parent)
+        self.job = job
+        self.process_frame = process_frame or self.render_frame
+        self.finalize = finalize
+        self.progress_interval = progress_interval
+        self.preview_interval = preview_interval
+        self._cancelled = False
+        # 开始编码时创建，只在导出线程中使用
+        self.landmarks: Optional[LandmarkSource] = None
+        self.watermark: Optional[WatermarkCompositor] = None
+
+    def cancel(self):
+        """请求取消导出"""
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        """线程主函数"""
+        job = self.job
+        start_time = time.time()
+        try:
+            completed = self.encode(start_time)
+
+            if not completed:
+                # 删除未完成的文件
+                self.remove_partial_output()
+                self.export_finished.emit(job.video_num, job.output_path, time.time() - start_time, False)
+                return
+
+            final_path = job.output_path
+            if self.finalize is not None and not job.audio_muxed:
+                self.stage_changed.emit(job.video_num, "audio")
+                final_path = self.finalize(job.output_path)
+
+            self.export_finished.emit(job.video_num, final_path, time.time() - start_time, True)
+
+        except Exception as e:
+            print(f"导出视频{job.video_num}时出错: {e}")
+            self.export_failed.emit(job.video_num, str(e))
+
+    def encode(self, start_time: float) -> bool:
+        """
+        解码、处理并编码重采样后保留的帧（跳过的帧不做推理、绘制和编码）
+
+        Returns:
+            是否全部完成（被取消时返回False）
+        """
+        job = self.job
+        cap = cv2.VideoCapture(job.video_path)
+        if not cap.isOpened():
+            raise Exception(f"视频{job.video_num}未正确加载")
+
+        out = None
+        try:
+            source_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+            # 推理时间戳按源文件的帧率计算，不依赖界面中当前加载的视频
+            self.landmarks = LandmarkSource(job.cache, job.pose_options, fps, job.target_seed)
+            self.watermark = WatermarkCompositor(job.watermark_settings)
+
+            # 90度和270度旋转会交换宽高，再按输出分辨率缩小
+            job.output_width, job.output_height = output_frame_size(width, height, job.rotation, job.resolution)
+
+            resampler = FrameResampler(fps, job.output_fps)
+            job.total_frames = resampler.kept_count(0, source_frames)
+            out, job.audio_muxed = create_video_encoder(
+                job.output_path, resampler.output_fps, (job.output_width, job.output_height),
+                job.quality, job.audio_source
+            )
+            print(f"导出视频{job.video_num}: 原始尺寸 {width}x{height}, 旋转角度 {job.rotation*90}°, "
+                  f"输出尺寸 {job.output_width}x{job.output_height}, "
+                  f"帧率 {fps:.2f} -> {resampler.output_fps:.2f}")
+
+            self.stage_changed.emit(job.video_num, "encoding")
+            self.progress.emit(job.video_num, 0, job.total_frames, 0.0)
+
+            frame_count = 0
+            last_progress = last_preview = 0.0
+
+            for frame_index, frame in read_resampled(cap, 0, source_frames, resampler):
+                if self._cancelled:
+                    break
+
+                processed_frame = self.process_frame(frame, frame_index)
+
+                # 验证帧尺寸是否与VideoWriter期望的尺寸一致
+                frame_height, frame_width = processed_frame.shape[:2]
+                if frame_width != job.output_width or frame_height != job.output_height:
+                    print(f"警告: 帧尺寸不匹配! 期望: {job.output_width}x{job.output_height}, "
+                          f"实际: {frame_width}x{frame_height}")
+                    processed_frame = cv2.resize(processed_frame, (job.output_width, job.output_height))
+
+                out.write(processed_frame)
+                frame_count += 1
+
+                # 限制信号频率，界面只显示最新的进度和预览
+                now = time.time()
+                if now - last_progress >= self.progress_interval:
+                    self.progress.emit(job.video_num, frame_count, job.total_frames, now - start_time)
+                    last_progress = now
+                if now - last_preview >= self.preview_interval:
+                    self.preview.emit(job.video_num, processed_frame)
+                    last_preview = now
+
+            if self._cancelled:
+                return False
+
+            self.progress.emit(job.video_num, job.total_frames, job.total_frames, time.time() - start_time)
+            return True
+
+        finally:
+            if self.landmarks is not None:
+                self.landmarks.close()
+            if out is not None:
+                release_encoder(out, cancelled=self._cancelled)
+            cap.release()
+
+    def render_frame(self, frame, frame_index: int):
+        """按任务中的设置生成一帧导出画面（未指定 process_frame 时使用）"""
+        job = self.job
+        return render_export_frame(frame, self.landmarks.get(frame, frame_index), job.rotation, job.mirror,
+                                   (job.output_width, job.output_height), job.pose_style, self.watermark)
+
+    def remove_partial_output(self):
+        """删除取消后留下的未完成文件"""
+        try:
+            if os.path.exists(self.job.output_path):
+                os.remove(self.job.output_path)
+        except Exception as e:
+            print(f"删除未完成文件时出错: {e}")
+
+
+def render_export_frame(frame, landmarks, rotation: int, mirror: bool, output_size: Optional[Tuple[int, int]],
+                        pose_style: PoseStyle, watermark: WatermarkCompositor):
+    """
+    生成一帧导出画面
+
+    缩放、旋转和镜像一次生成输出尺寸的帧（不需要变换时直接使用解码出的帧，只读帧先复制），
+    骨架和水印在输出分辨率下绘制，关键点坐标随之变换
+    """
+    processed = orient_frame(frame, rotation, mirror, output_size)
+    if not processed.flags.writeable:
+        processed = processed.copy()
+    draw_pose_landmarks(processed, orient_landmarks(landmarks, rotation, mirror), pose_style)
+    return watermark.apply(processed)
+
+
+def parallel_segment_count(total_frames: int, process_count: int,
+                           min_segment_frames: int = MIN_SEGMENT_FRAMES) -> int:
+    """根据视频长度和可用进程数决定分段数量（小于2表示不值得并行）"""
+    if total_frames <= 0:
+        return 1
+    return max(1, min(process_count, total_frames // min_segment_frames))
+
+
+def plan_segments(total_frames: int, segment_count: int,
+                  warmup_frames: int = SEGMENT_WARMUP_FRAMES) -> List[Tuple[int, int, int]]:
+    """
+    将视频均分为若干段
+
+    Returns:
+        每段的 (预热起始帧, 输出起始帧, 输出结束帧)，输出范围为 [起始, 结束)
+    """
+    segment_count = max(1, min(segment_count, total_frames))
+    bounds = [total_frames * i // segment_count for i in range(segment_count + 1)]
+    return [(max(0, start - warmup_frames), start, end)
+            for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+class SegmentTask:
+    """单个分段的导出参数（传给子进程，须可序列化）"""
+
+    def __init__(self, index: int, video_path: str, output_path: str,
+                 warmup_start: int, start: int, end: int, fps: float,
+                 output_size: Tuple[int, int], rotation: int, mirror: bool,
+                 pose_options: Optional[dict], pose_style: PoseStyle,
+                 watermark_settings: WatermarkSettings,
+                 cache_base_path: Optional[str] = None, cache_frame_count: int = 0,
+                 preview_interval: float = 0.5, quality: Optional[dict] = None,
+                 resampler: Optional[FrameResampler] = None):
+        self.index = index
+        self.video_path = video_path
+        self.output_path = output_path
+        self.warmup_start = warmup_start
+        self.start = start
+        self.end = end
+        self.fps = fps
+        self.output_size = output_size
+        self.rotation = rotation
+        self.mirror = mirror
+        self.pose_options = pose_options  # None表示不做姿态检测
+        self.pose_style = pose_style
+        self.watermark_settings = watermark_settings
+        self.cache_base_path = cache_base_path
+        self.cache_frame_count = cache_frame_count
+        self.preview_interval = preview_interval
+        self.quality = quality
+        self.resampler = resampler  # None表示输出全部帧
+
+
+# 子进程内的进度队列和取消标志（由进程池初始化函数设置）
+_segment_queue = None
+_segment_cancel = None
+
+
+def init_segment_process(message_queue, cancel_event):
+    """进程池初始化函数"""
+    global _segment_queue, _segment_cancel
+    _segment_queue = message_queue
+    _segment_cancel = cancel_event
+
+
+def export_segment(task: SegmentTask) -> int:
+    """
+    在子进程中导出一个分段
+
+    已缓存关键点的帧只做解码、绘制和编码；只有缓存缺失的帧才创建Pose实例进行推理，
+    整段都已缓存时不加载MediaPipe，也不需要预热帧。降帧率导出时不输出的帧（包括预热帧）
+    只 grab() 跳过，不做推理
+
+    Returns:
+        写入的帧数（被取消时为-1）
+    """
+    cap = cv2.VideoCapture(task.video_path)
+    if not cap.isOpened():
+        raise Exception(f"无法打开视频: {task.video_path}")
+
+    out = None
+    landmark_source = None
+    try:
+        cache = None
+        if task.cache_base_path and task.cache_frame_count > 0:
+            cache = LandmarkCache(task.cache_base_path, task.cache_frame_count)
+
+        # 预热帧只用于衔接跟踪状态，整段已缓存时直接从输出起始帧开始
+        first_frame = task.warmup_start
+        if cache is not None and cache.covers(task.start, task.end,
+                                              task.resampler.keeps if task.resampler is not None else None):
+            first_frame = task.start
+
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+        landmark_source = LandmarkSource(cache, task.pose_options, cap.get(cv2.CAP_PROP_FPS))
+        # 分段不含音频，拼接时再合并
+        out, _ = create_video_encoder(task.output_path, task.fps, task.output_size, task.quality)
+        watermark = WatermarkCompositor(task.watermark_settings)
+
+        written = 0
+        last_preview = 0.0
+        for frame_index, frame in read_resampled(cap, first_frame, task.end, task.resampler):
+            if _segment_cancel is not None and _segment_cancel.is_set():
+                return -1
+
+            # 获取关键点（优先使用缓存，只在需要推理时才在子进程中加载MediaPipe）
+            landmarks = landmark_source.get(frame, frame_index)
+
+            # 预热帧只用于衔接跟踪状态，不输出
+            if frame_index < task.start:
+                continue
+
+            processed = render_export_frame(frame, landmarks, task.rotation, task.mirror, task.output_size,
+                                            task.pose_style, watermark)
+            if (processed.shape[1], processed.shape[0]) != task.output_size:
+                processed = cv2.resize(processed, task.output_size)
+
+            out.write(processed)
+            written += 1
+
+            if _segment_queue is not None:
+                if written % 10 == 0:
+                    _segment_queue.put(("progress", task.index, written))
+                now = time.time()
+                if now - last_preview >= task.preview_interval:
+                    _segment_queue.put(("preview", task.index, downscale_preview(processed)))
+                    last_preview = now
+
+        if _segment_queue is not None:
+            _segment_queue.put(("progress", task.index, written))
+        return written
+
+    finally:
+        if landmark_source is not None:
+            landmark_source.close()
+        if out is not None:
+            cancelled = _segment_cancel is not None and _segment_cancel.is_set()
+            release_encoder(out, cancelled=cancelled)
+        cap.release()
+
+
+def downscale_preview(frame):
+    """缩小预览帧，减少进程间传输的数据量"""
+    height, width = frame.shape[:2]
+    if width <= PREVIEW_MAX_WIDTH:
+        return frame
+    scale = PREVIEW_MAX_WIDTH / width
+    return cv2.resize(frame, (PREVIEW_MAX_WIDTH, int(height * scale)), interpolation=cv2.INTER_AREA)
+
+
+def concat_segments(segment_paths: List[str], output_path: str, fps: float, size: Tuple[int, int],
+                    audio_source: Optional[str] = None) -> bool:
+    """
+    拼接分段视频
+
+    优先使用 ffmpeg concat 直接复制码流（无损、无需重新编码），并在同一步合并原始音频；
+    没有ffmpeg时退回到逐帧读取并重新编码。
+
+    Returns:
+        是否已合并音频
+    """
+    if ffmpeg_available():
+        list_path = f"{output_path}.segments.txt"
+        try:
+            with open(list_path, "w", encoding="utf-8") as f:
+                for path in segment_paths:
+                    escaped = os.path.abspath(path).replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+
+            cmd = ['ffmpeg', '-y', '-v', 'error', '-f', 'concat', '-safe', '0', '-i', list_path]
+            if audio_source:
+                cmd += ['-i', audio_source, '-map', '0:v:0', '-map', '1:a:0?',
+                        '-c:v', 'copy', '-c:a', 'aac', '-shortest']
+            else:
+                cmd += ['-c', 'copy']
+            cmd += ['-movflags', '+faststart', output_path]
+
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            if result.returncode == 0:
+                return bool(audio_source)
+            print(f"FFmpeg拼接失败，改为重新编码拼接: {result.stderr}")
+        finally:
+            if os.path.exists(list_path):
+                os.remove(list_path)
+
+    out = open_video_writer(output_path, fps, size)
+    try:
+        for path in segment_paths:
+            cap = cv2.VideoCapture(path)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                out.write(frame)
+            cap.release()
+    finally:
+        out.release()
+    return False
+
+
+class ParallelExportWorker(ExportWorker):
+    """并行分段导出线程：调度子进程并汇总进度，最后拼接分段"""
+
+    def __init__(self, job: ExportJob, segment_count: int,
+                 pose_options: Optional[dict], pose_style: PoseStyle,
+                 watermark_settings: WatermarkSettings,
+                 cache: Optional[LandmarkCache] = None,
+                 finalize: Optional[Callable] = None,
+                 warmup_frames: int = SEGMENT_WARMUP_FRAMES, parent=None):
+        """
+        Args:
+            job: 导出任务
+            segment_count: 分段数（同时也是子进程数）
+            pose_options: 子进程创建Pose使用的参数，None表示不做姿态检测
+            pose_style: 骨架绘制样式
+            watermark_settings: 水印设置
+            cache: 该视频的关键点缓存（子进程按相同路径打开）
+            finalize: 拼接完成后的处理函数（如添加音频）
+            warmup_frames: 每段的预热帧数
+        """
+        super().__init__(job, process_frame=None, finalize=finalize, parent=parent)
+        self.segment_count = segment_count
+        self.pose_options = pose_options
+        self.pose_style = pose_style
+        self.watermark_settings = watermark_settings
+        self.cache = cache
+        self.warmup_frames = warmup_frames
+
+    def encode(self, start_time: float) -> bool:
+        """并行导出各分段后拼接"""
+        job = self.job
+        cap = cv2.VideoCapture(job.video_path)
+        if not cap.isOpened():
+            raise Exception(f"视频{job.video_num}未正确加载")
+        source_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+
+        job.output_width, job.output_height = output_frame_size(width, height, job.rotation, job.resolution)
+        output_size = (job.output_width, job.output_height)
+        resampler = FrameResampler(fps, job.output_fps)
+        output_fps = resampler.output_fps
+        job.total_frames = resampler.kept_count(0, source_frames)
+
+        # 按源帧序号分段，各段独立判断哪些帧需要输出
+        segments = plan_segments(source_frames, self.segment_count, self.warmup_frames)
+        print(f"并行导出视频{job.video_num}: {len(segments)} 段, 输出尺寸 {job.output_width}x{job.output_height}")
+
+        if self.cache is not None:
+            self.cache.flush()
+
+        temp_dir = tempfile.mkdtemp(prefix=".segments_", dir=os.path.dirname(os.path.abspath(job.output_path)))
+        try:
+            tasks = [
+                SegmentTask(
+                    index, job.video_path, os.path.join(temp_dir, f"segment_{index:03d}.mp4"),
+                    warmup_start, start, end, output_fps, output_size, job.rotation, job.mirror,
+                    self.pose_options, self.pose_style, self.watermark_settings,
+                    self.cache.base_path if self.cache is not None else None,
+                    self.cache.frame_count if self.cache is not None else 0,
+                    self.preview_interval, job.quality,
+                    None if resampler.keeps_all else resampler
+                )
+                for index, (warmup_start, start, end) in enumerate(segments)
+            ]
+
+            self.stage_changed.emit(job.video_num, "encoding")
+            self.progress.emit(job.video_num, 0, job.total_frames, 0.0)
+
+            if not self.run_segments(tasks, start_time):
+                return False
+
+            self.stage_changed.emit(job.video_num, "concat")
+            job.audio_muxed = concat_segments(
+                [task.output_path for task in tasks], job.output_path, output_fps, output_size, job.audio_source
+            )
+            self.progress.emit(job.video_num, job.total_frames, job.total_frames, time.time() - start_time)
+            return True
+
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def run_segments(self, tasks: List[SegmentTask], start_time: float) -> bool:
+        """
+        在进程池中导出所有分段，汇总进度和预览
+
+        Returns:
+            是否全部完成（被取消时返回False）
+        """
+        job = self.job
+        # 使用spawn启动子进程，避免fork继承Qt和MediaPipe的线程状态
+        context = multiprocessing.get_context("spawn")
+        message_queue = context.Queue()
+        cancel_event = context.Event()
+        segment_done = [0] * len(tasks)
+        last_progress = 0.0
+
+        with ProcessPoolExecutor(max_workers=len(tasks), mp_context=context,
+                                 initializer=init_segment_process,
+                                 initargs=(message_queue, cancel_event)) as pool:
+            futures = [pool.submit(export_segment, task) for task in tasks]
+
+            while not all(future.done() for future in futures):
+                if self._cancelled:
+                    cancel_event.set()
+
+                try:
+                    kind, index, payload = message_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                if kind == "progress":
+                    segment_done[index] = payload
+                    now = time.time()
+                    if now - last_progress >= self.progress_interval:
+                        self.progress.emit(job.video_num, sum(segment_done), job.total_frames, now - start_time)
+                        last_progress = now
+                elif kind == "preview":
+                    self.preview.emit(job.video_num, payload)
+
+            # 子进程中的异常在这里重新抛出
+            results = [future.result() for future in futures]
+
+        return not self._cancelled and all(written >= 0 for written in results)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+姿态关键点缓存 - 按视频内容哈希保存每帧的检测结果
+缓存以内存映射的 .npy 文件存放在配置目录中，重新打开同一视频时无需再次运行MediaPipe
+"""
+
+import hashlib
+import os
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+# MediaPipe Pose 关键点数量
+LANDMARK_COUNT = 33
+
+# 每个关键点保存的分量：x, y, z, visibility
+LANDMARK_FIELDS = 4
+
+# 默认缓存目录（与应用配置目录一致）
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.pose_detection_app/landmark_cache")
+
+# 内容哈希每段采样字节数
+HASH_SAMPLE_SIZE = 1024 * 1024
+
+
+def compute_video_hash(video_path: str, sample_size: int = HASH_SAMPLE_SIZE) -> str:
+    """
+    计算视频文件的快速内容哈希
+
+    只读取文件开头、中间和结尾各一段数据并结合文件大小，
+    对大视频也能在毫秒级完成，同时能区分不同的视频内容。
+    """
+    file_size = os.path.getsize(video_path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(file_size).encode("ascii"))
+
+    with open(video_path, "rb") as f:
+        offsets = {0, max(0, file_size // 2 - sample_size // 2), max(0, file_size - sample_size)}
+        for offset in sorted(offsets):
+            f.seek(offset)
+            digest.update(f.read(sample_size))
+
+    return digest.hexdigest()
+
+
+def landmarks_to_array(landmark_list) -> Optional[np.ndarray]:
+    """
+    将MediaPipe的关键点列表转换为 (33, 4) 的float32数组
+
+    接受旧版Pose的 NormalizedLandmarkList 和 Tasks PoseLandmarker 返回的关键点列表
+    """
+    if not landmark_list:
+        return None
+
+    landmarks = getattr(landmark_list, "landmark", landmark_list)
+    array = np.zeros((LANDMARK_COUNT, LANDMARK_FIELDS), dtype=np.float32)
+    for i, landmark in enumerate(landmarks[:LANDMARK_COUNT]):
+        array[i] = (landmark.x, landmark.y, landmark.z, landmark.visibility or 0.0)
+    return array
+
+
+class LandmarkCache:
+    """单个视频的逐帧姿态关键点缓存（内存映射文件）"""
+
+    # 帧状态
+    STATUS_UNKNOWN = 0  # 尚未分析
+    STATUS_POSE = 1     # 检测到姿态
+    STATUS_NO_POSE = 2  # 已分析但未检测到姿态
+
+    def __init__(self, base_path: str, frame_count: int):
+        """
+        打开或创建缓存文件
+
+        Args:
+            base_path: 缓存文件路径前缀（不含扩展名）
+            frame_count: 视频总帧数
+        """
+        self.frame_count = max(0, int(frame_count))
+        self.base_path = base_path
+        self.landmarks_path = f"{base_path}.landmarks.npy"
+        self.status_path = f"{base_path}.status.npy"
+
+        # 每帧保存图像坐标和世界坐标两组关键点
+        landmarks_shape = (self.frame_count, 2, LANDMARK_COUNT, LANDMARK_FIELDS)
+        self.landmarks = self._open_array(self.landmarks_path, landmarks_shape, np.float32)
+        self.status = self._open_array(self.status_path, (self.frame_count,), np.uint8)
+
+        # 两个文件必须配套，否则视为无效缓存重新创建
+        if self.landmarks is None or self.status is None:
+            self.landmarks = self._create_array(self.landmarks_path, landmarks_shape, np.float32)
+            self.status = self._create_array(self.status_path, (self.frame_count,), np.uint8)
+
+    @classmethod
+    def for_video(cls, video_hash: str, frame_count: int, variant: str = "",
+                  cache_dir: Optional[str] = None) -> "LandmarkCache":
+        """根据视频内容哈希打开缓存"""
+        cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        name = f"{video_hash}_{variant}" if variant else video_hash
+        return cls(os.path.join(cache_dir, name), frame_count)
+
+    @staticmethod
+    def _open_array(path, shape, dtype):
+        """以读写方式内存映射已有的缓存文件，不存在或格式不符时返回None"""
+        if not os.path.exists(path):
+            return None
+        try:
+            array = np.lib.format.open_memmap(path, mode="r+")
+        except (ValueError, OSError):
+            return None
+        if array.shape != shape or array.dtype != dtype:
+            return None
+        return array
+
+    @staticmethod
+    def _create_array(path, shape, dtype):
+        """创建新的内存映射缓存文件（初始全零）"""
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    def has(self, frame_index: int) -> bool:
+        """该帧是否已经分析过"""
+        return (0 <= frame_index < self.frame_count and
+                self.status[frame_index] != self.STATUS_UNKNOWN)
+
+    def get(self, frame_index: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        读取缓存的关键点
+
+        Returns:
+            (图像坐标关键点, 世界坐标关键点)，未检测到姿态或未分析时为 (None, None)
+        """
+        if not (0 <= frame_index < self.frame_count):
+            return None, None
+        if self.status[frame_index] != self.STATUS_POSE:
+            return None, None
+        entry = self.landmarks[frame_index]
+        return np.array(entry[0]), np.array(entry[1])
+
+    def put(self, frame_index: int, landmarks: Optional[np.ndarray],
+            world_landmarks: Optional[np.ndarray] = None):
+        """写入一帧的检测结果（landmarks为None表示未检测到姿态）"""
+        if not (0 <= frame_index < self.frame_count):
+            return
+
+        if landmarks is None:
+            self.status[frame_index] = self.STATUS_NO_POSE
+            return
+
+        # 先写数据再写状态，保证并发读取时不会读到半写的数据
+        self.landmarks[frame_index, 0] = landmarks
+        if world_landmarks is not None:
+            self.landmarks[frame_index, 1] = world_landmarks
+        self.status[frame_index] = self.STATUS_POSE
+
+    def covers(self, start: int, end: int, keeps: Optional[Callable[[int], bool]] = None) -> bool:
+        """[start, end) 范围内的帧是否都已分析过（给出 keeps 时只检查 keeps(帧序号) 为True的帧）"""
+        start, end = max(0, start), min(end, self.frame_count)
+        analyzed = self.status[start:end] != self.STATUS_UNKNOWN
+        if keeps is not None:
+            analyzed |= ~np.array([keeps(i) for i in range(start, end)], dtype=bool)
+        return bool(np.all(analyzed))
+
+    def coverage(self) -> float:
+        """已分析帧所占比例"""
+        if self.frame_count == 0:
+            return 1.0
+        return float(np.count_nonzero(self.status)) / self.frame_count
+
+    def flush(self):
+        """将缓存写回磁盘"""
+        self.landmarks.flush()
+        self.status.flush()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多人跟踪 - 为每帧检测到的多个人分配稳定的ID，并跟随一个目标人物
+相邻帧之间按关键点包围框的IoU和关键点平均距离匹配，画面中有教练和多名运动员时，
+分析结果不会在不同的人之间跳动；目标可以按画面中的位置锁定
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from pose_renderer import VISIBILITY_THRESHOLD
+from roi_tracker import RoiTracker
+
+# 一个人的检测结果：(landmarks, world_landmarks)
+Person = Tuple[Optional[np.ndarray], Optional[np.ndarray]]
+
+
+def landmark_box(landmarks: np.ndarray):
+    """可见关键点的归一化包围框 (x0, y0, x1, y1)，没有可见关键点时返回None"""
+    return RoiTracker.landmark_box(landmarks, (1, 1))
+
+
+def box_area(box) -> float:
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def box_iou(a, b) -> float:
+    """两个包围框的交并比"""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    return intersection / (box_area(a) + box_area(b) - intersection)
+
+
+def keypoint_distance(a: np.ndarray, b: np.ndarray) -> Optional[float]:
+    """两组关键点中同时可见的点的平均距离（归一化坐标），没有共同可见的点时返回None"""
+    visible = (a[:, 3] > VISIBILITY_THRESHOLD) & (b[:, 3] > VISIBILITY_THRESHOLD)
+    if not visible.any():
+        return None
+    return float(np.linalg.norm(a[visible, :2] - b[visible, :2], axis=1).mean())
+
+
+class Track:
+    """一个被跟踪的人"""
+
+    def __init__(self, track_id: int, landmarks: np.ndarray, world: Optional[np.ndarray]):
+        self.id = track_id
+        self.landmarks = landmarks
+        self.world = world
+        # 连续未匹配到的帧数
+        self.missed = 0
+
+    def observe(self, landmarks: np.ndarray, world: Optional[np.ndarray]):
+        self.landmarks = landmarks
+        self.world = world
+        self.missed = 0
+
+
+class PersonTracker:
+    """多人ID跟踪器（与MediaPipe无关，只处理归一化关键点）"""
+
+    def __init__(self, iou_threshold: float = 0.3, max_distance: float = 0.1, max_missed: int = 15):
+        """
+        Args:
+            iou_threshold: 包围框IoU不低于该值时可以匹配
+            max_distance: 关键点平均距离（归一化坐标）低于该值时可以匹配
+            max_missed: 连续多少帧未匹配到后删除该人
+        """
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.reset()
+
+    def reset(self):
+        """清除所有人和目标（打开新视频时调用）"""
+        self.tracks: List[Track] = []
+        self.next_id = 1
+        self.target_id: Optional[int] = None
+        # 目标是否由用户锁定（否则自动跟随最大的一人）
+        self.locked = False
+        # 待锁定目标的包围框（seed() 指定，下次选择目标时锁定与其最接近的人）
+        self.seed_box = None
+
+    def track(self, track_id: Optional[int]) -> Optional[Track]:
+        for track in self.tracks:
+            if track.id == track_id:
+                return track
+        return None
+
+    @staticmethod
+    def track_area(track: Track) -> float:
+        box = landmark_box(track.landmarks)
+        return box_area(box) if box is not None else 0.0
+
+    def similarity(self, track: Track, landmarks: np.ndarray) -> float:
+        """检测结果与已跟踪的人的相似度，0表示不能匹配"""
+        track_box, box = landmark_box(track.landmarks), landmark_box(landmarks)
+        if track_box is None or box is None:
+            return 0.0
+        iou = box_iou(track_box, box)
+        distance = keypoint_distance(track.landmarks, landmarks)
+        closeness = max(0.0, 1.0 - distance / self.max_distance) if distance is not None else 0.0
+        if iou < self.iou_threshold and closeness == 0.0:
+            return 0.0
+        return iou + closeness
+
+    def match(self, tracks: List[Track], people: List[Person]):
+        """按相似度从高到低贪心匹配，返回 {检测序号: Track}"""
+        pairs = []
+        for i, (landmarks, _) in enumerate(people):
+            for track in tracks:
+                score = self.similarity(track, landmarks)
+                if score > 0:
+                    pairs.append((score, i, track))
+        pairs.sort(key=lambda pair: pair[0], reverse=True)
+
+        matched, used = {}, set()
+        for _, i, track in pairs:
+            if i not in matched and track.id not in used:
+                matched[i] = track
+                used.add(track.id)
+        return matched
+
+    def update(self, people: List[Person]) -> Person:
+        """
+        用整帧的检测结果更新所有人（未匹配的检测创建新ID，长时间未出现的人被删除）
+
+        Returns:
+            目标人物本帧的 (landmarks, world_landmarks)，目标本帧未出现时为 (None, None)
+        """
+        matched = self.match(self.tracks, people)
+        seen = {track.id for track in matched.values()}
+        for track in self.tracks:
+            if track.id not in seen:
+                track.missed += 1
+
+        for i, (landmarks, world) in enumerate(people):
+            if i in matched:
+                matched[i].observe(landmarks, world)
+            else:
+                self.tracks.append(Track(self.next_id, landmarks, world))
+                self.next_id += 1
+
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        return self.target_person()
+
+    def follow(self, people: List[Person]) -> Person:
+        """
+        用目标区域内的检测结果只更新目标（区域内可能露出其他人的一部分，取与目标最相似的一人）
+
+        区域内没有匹配到目标时返回 (None, None)，由调用方退回整帧检测
+        """
+        target = self.track(self.target_id)
+        if target is None:
+            return self.update(people)
+        matched = self.match([target], people)
+        if not matched:
+            return None, None
+        landmarks, world = people[next(iter(matched))]
+        target.observe(landmarks, world)
+        return landmarks, world
+
+    def seed_score(self, track: Track):
+        """与待锁定包围框的接近程度：先比较IoU，不重叠时比较中心距离"""
+        box, seed = landmark_box(track.landmarks), self.seed_box
+        if box is None:
+            return -1.0, 0.0
+        distance = np.hypot((box[0] + box[2] - seed[0] - seed[2]) / 2, (box[1] + box[3] - seed[1] - seed[3]) / 2)
+        return box_iou(box, seed), -distance
+
+    def target_person(self) -> Person:
+        """
+        目标本帧的结果；目标已被删除时解除锁定，并自动跟随本帧最大的一人
+        （指定了待锁定的包围框时改为锁定与其最接近的人）
+        """
+        target = self.track(self.target_id)
+        if target is None:
+            self.locked = False
+            visible = [track for track in self.tracks if track.missed == 0]
+            if self.seed_box is not None:
+                target = max(visible, key=self.seed_score, default=None)
+                if target is not None:
+                    self.locked = True
+                    self.seed_box = None
+            else:
+                target = max(visible, key=lambda track: self.track_area(track), default=None)
+            self.target_id = target.id if target is not None else None
+        if target is None or target.missed:
+            return None, None
+        return target.landmarks, target.world
+
+    def lock(self, x: float, y: float) -> Optional[int]:
+        """
+        锁定本帧中位于 (x, y)（归一化坐标）的人，多人重叠时取较小的包围框（点击位置更可能针对被包含在他人包围框内的人）
+
+        Returns:
+            锁定的ID，该位置没有人时解除锁定并返回None
+        """
+        best, best_area = None, None
+        for track in self.tracks:
+            box = landmark_box(track.landmarks)
+            if track.missed or box is None:
+                continue
+            # 包围框只包含可见关键点，四周留出一些余量（头顶、手脚末端）
+            margin = 0.15 * max(box[2] - box[0], box[3] - box[1])
+            if box[0] - margin <= x <= box[2] + margin and box[1] - margin <= y <= box[3] + margin:
+                if best_area is None or box_area(box) < best_area:
+                    best, best_area = track, box_area(box)
+
+        if best is None:
+            self.unlock()
+            return None
+        self.target_id = best.id
+        self.locked = True
+        return best.id
+
+    def seed(self, box):
+        """
+        按包围框 (x0, y0, x1, y1)（归一化坐标）指定目标，用于在另一个检测流中锁定同一人
+
+        当前目标被解除，下次更新时锁定本帧中与该包围框最接近的人
+        """
+        self.unlock()
+        self.seed_box = box
+
+    def target_box(self):
+        """目标最近一次出现时的包围框，没有目标时为None"""
+        target = self.track(self.target_id)
+        return landmark_box(target.landmarks) if target is not None else None
+
+    def unlock(self):
+        """解除锁定，之后自动跟随最大的一人"""
+        self.target_id = None
+        self.locked = False
+        self.seed_box = None
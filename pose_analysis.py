@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台姿态预分析 - 视频加载后在工作线程中分析整段视频
+先按固定间隔抽样分析得到粗略时间线，再补全其余帧，结果写入关键点缓存
+"""
+
+import time
+from typing import Callable, Iterator, Tuple
+
+import cv2
+from PySide6.QtCore import QThread, Signal
+
+from landmark_cache import LandmarkCache
+from video_pipeline import frame_timestamp_ms
+
+
+def coarse_to_fine_passes(frame_count: int, coarse_stride: int) -> Iterator[Tuple[str, list]]:
+    """
+    生成由粗到细的分析顺序
+
+    Yields:
+        (阶段名称, 该阶段需要分析的帧序号列表)，阶段为 "coarse" 或 "fine"
+    """
+    coarse_stride = max(1, int(coarse_stride))
+    coarse = list(range(0, frame_count, coarse_stride))
+    yield "coarse", coarse
+
+    if coarse_stride > 1:
+        coarse_set = set(coarse)
+        yield "fine", [i for i in range(frame_count) if i not in coarse_set]
+
+
+class PoseAnalysisWorker(QThread):
+    """整段视频姿态预分析工作线程"""
+
+    # 视频编号, 已完成帧数, 阶段总帧数, 阶段名称
+    progress = Signal(int, int, int, str)
+    # 视频编号, 是否完整完成（未被取消）
+    analysis_finished = Signal(int, bool)
+
+    def __init__(self, video_num: int, video_path: str, cache: LandmarkCache,
+                 pose_factory: Callable, coarse_stride: int = 10, parent=None):
+        """
+        初始化预分析线程
+
+        Args:
+            video_num: 视频编号（1或2）
+            video_path: 视频文件路径（线程内使用独立的VideoCapture）
+            cache: 结果写入的关键点缓存
+            pose_factory: 创建姿态检测器的函数，参数为是否为静态图像模式
+            coarse_stride: 粗略阶段的抽样间隔（帧）
+        """
+        super().__init__(parent)
+        self.video_num = video_num
+        self.video_path = video_path
+        self.cache = cache
+        self.pose_factory = pose_factory
+        self.coarse_stride = coarse_stride
+        self._cancelled = False
+
+    def cancel(self):
+        """请求停止分析"""
+        self._cancelled = True
+
+    def run(self):
+        """线程主函数"""
+        completed = True
+        try:
+            for phase, frame_indices in coarse_to_fine_passes(self.cache.frame_count, self.coarse_stride):
+                # 粗略阶段的帧间隔较大，使用静态图像模式；补全阶段连续帧使用跟踪模式
+                pose = self.pose_factory(phase == "coarse")
+                try:
+                    if not self.analyze_frames(pose, phase, frame_indices):
+                        completed = False
+                        break
+                finally:
+                    pose.close()
+                self.cache.flush()
+        except Exception as e:
+            print(f"视频{self.video_num}预分析出错: {e}")
+            completed = False
+
+        self.analysis_finished.emit(self.video_num, completed and not self._cancelled)
+
+    def analyze_frames(self, pose, phase: str, frame_indices: list) -> bool:
+        """
+        按顺序分析指定帧，跳过的帧只用grab()前进而不解码到BGR
+
+        Returns:
+            是否分析完成（被取消时返回False）
+        """
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            return False
+
+        try:
+            total = len(frame_indices)
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            position = 0
+            last_emit = 0.0
+
+            for done, frame_index in enumerate(frame_indices):
+                if self._cancelled:
+                    return False
+
+                if self.cache.has(frame_index):
+                    continue
+
+                # 顺序前进到目标帧
+                while position < frame_index:
+                    if not cap.grab():
+                        return True
+                    position += 1
+
+                ret, frame = cap.read()
+                position += 1
+                if not ret:
+                    return True
+
+                # 始终在原始方向的帧上推理，显示和导出时再变换关键点坐标
+                landmarks, world_landmarks = pose.detect(frame, frame_timestamp_ms(frame_index, fps))
+                self.cache.put(frame_index, landmarks, world_landmarks)
+
+                # 限制进度信号频率
+                now = time.time()
+                if now - last_emit >= 0.25:
+                    self.progress.emit(self.video_num, done + 1, total, phase)
+                    last_emit = now
+
+            self.progress.emit(self.video_num, total, total, phase)
+            return True
+
+        finally:
+            cap.release()
@@ -15,13 +15,31 @@ from PySide6.QtWidgets import (
     QSizePolicy, QToolBar, QStatusBar, QTabWidget, QLineEdit
 )
 from translation_manager import tr, get_translation_manager, set_language, get_current_language, get_available_languages
+from video_pipeline import FrameCache, VideoDecoder, frame_timestamp_ms
+from seek_index import FrameReader, SeekIndex
+from landmark_cache import LandmarkCache, compute_video_hash
+from pose_analysis import PoseAnalysisWorker
+from adaptive_inference import InferenceScheduler
+from quality_profiles import (
+    DEFAULT_EXPORT_PROFILE, DEFAULT_PLAYBACK_PROFILE, MODEL_NAMES, QUALITY_PROFILES, LevelController,
+    available_profiles, profile_settings
+)
+from pose_engine import (BACKENDS, DEFAULT_BACKEND, MODEL_DIR, PoseEnginePool,
+                         available_model_complexities, create_pose_engine, tasks_models_available)
+from export_pipeline import (ExportJob, ExportWorker, ParallelExportWorker, parallel_segment_count,
+                             render_export_frame)
+from pose_renderer import (
+    RESOLUTION_PRESETS, PoseStyle, draw_pose_landmarks, orient_frame, orient_landmarks, oriented_size, rotate_frame,
+    source_point, visible_pose_elements
+)
+from watermark import WatermarkCompositor, WatermarkSettings
 from PySide6.QtCore import (
     Qt, QTimer, QThread, Signal, QSize, QPropertyAnimation, QEasingCurve,
-    QRect, QPoint
+    QRect, QPoint, QPointF, QRectF, QLineF
 )
 from PySide6.QtGui import (
     QPixmap, QIcon, QFont, QPalette, QColor, QAction, QPainter,
-    QBrush, QPen, QLinearGradient, QImage
+    QBrush, QPen, QLinearGradient, QImage, QPolygonF
 )
 
 import cv2
@@ -31,6 +49,7 @@ from PIL import Image
 import threading
 import time
 import queue
+from concurrent.futures import ThreadPoolExecutor
 
 class ModernButton(QPushButton):
     """现代化按钮样式"""
@@ -90,6 +109,10 @@ class ModernButton(QPushButton):
 
 class VideoWidget(QLabel):
     """专业视频显示控件"""
+
+    # 点击画面的位置（显示画面上的归一化坐标 x, y）
+    point_clicked = Signal(float, float)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(400, 300)
@@ -108,6 +131,134 @@ class VideoWidget(QLabel):
         self.setText(tr("video_widget.default_text"))
         self.setScaledContents(True)
 
+        # 显示缓冲：按控件和帧尺寸缓存的显示尺寸，以及复用的缩放缓冲区
+        self.display_size_key = None
+        self.display_size = None
+        self.display_buffer = None
+
+        # 叠加绘制的骨架：关键点、原始帧尺寸和获取当前样式的函数
+        self.pose_landmarks = None
+        self.pose_frame_size = None
+        self.pose_style_source = None
+
+    def resizeEvent(self, event):
+        """控件尺寸改变时重新计算显示尺寸"""
+        self.display_size_key = None
+        super().resizeEvent(event)
+
+    def compute_display_size(self, frame_width, frame_height):
+        """按控件大小计算帧的显示尺寸（控件和帧尺寸不变时直接使用缓存）"""
+        widget_width, widget_height = self.width(), self.height()
+        key = (widget_width, widget_height, frame_width, frame_height)
+        if key == self.display_size_key:
+            return self.display_size
+
+        # 如果控件还没有大小，使用默认值
+        if widget_width <= 1 or widget_height <= 1:
+            widget_width, widget_height = 640, 480
+
+        # 保持比例缩放，四周留出边距
+        scale = min(widget_width / frame_width, widget_height / frame_height) * 0.95
+        self.display_size = (int(frame_width * scale), int(frame_height * scale))
+        self.display_size_key = key
+        return self.display_size
+
+    def show_frame(self, frame, rotation=0, mirror=False):
+        """
+        显示BGR帧，保持原始比例
+
+        先缩放到复用的缓冲区，再在显示分辨率下旋转和镜像，
+        最后直接按 BGR888 格式包装为QImage，不做颜色转换
+        """
+        frame_height, frame_width = frame.shape[:2]
+        width, height = self.compute_display_size(*oriented_size(frame_width, frame_height, rotation))
+        if width <= 0 or height <= 0:
+            return
+
+        # 缩放尺寸为旋转前的方向
+        scaled_width, scaled_height = oriented_size(width, height, rotation)
+        if self.display_buffer is None or self.display_buffer.shape[:2] != (scaled_height, scaled_width):
+            self.display_buffer = np.empty((scaled_height, scaled_width, 3), dtype=np.uint8)
+        cv2.resize(frame, (scaled_width, scaled_height), dst=self.display_buffer, interpolation=cv2.INTER_AREA)
+
+        buffer = self.display_buffer
+        if rotation or mirror:
+            buffer = np.ascontiguousarray(orient_frame(buffer, rotation, mirror))
+
+        # QPixmap.fromImage会复制像素，之后缓冲区可以被下一帧复用
+        image = QImage(buffer.data, width, height, 3 * width, QImage.Format.Format_BGR888)
+        self.setPixmap(QPixmap.fromImage(image))
+        self.setScaledContents(False)  # 不拉伸内容
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)  # 居中显示
+
+    def set_pose_overlay(self, landmarks, frame_size):
+        """
+        设置叠加在当前画面上的骨架
+
+        Args:
+            landmarks: (33, 4) 归一化关键点数组，None表示不绘制
+            frame_size: 显示帧的原始尺寸 (宽, 高)，用于按相同比例缩放线宽和点大小
+        """
+        self.pose_landmarks = landmarks
+        self.pose_frame_size = frame_size
+        self.update()
+
+    def mousePressEvent(self, event):
+        """点击画面时发出归一化坐标（点击画面外的边距时忽略）"""
+        pixmap = self.pixmap()
+        if event.button() == Qt.MouseButton.LeftButton and pixmap is not None and not pixmap.isNull():
+            rect = self.contentsRect()
+            width, height = pixmap.width(), pixmap.height()
+            x = (event.position().x() - rect.x() - (rect.width() - width) / 2) / width
+            y = (event.position().y() - rect.y() - (rect.height() - height) / 2) / height
+            if 0.0 <= x <= 1.0 and 0.0 <= y <= 1.0:
+                self.point_clicked.emit(x, y)
+        super().mousePressEvent(event)
+
+    def paintEvent(self, event):
+        """先绘制画面，再在显示分辨率下绘制骨架"""
+        super().paintEvent(event)
+
+        pixmap = self.pixmap()
+        if (self.pose_landmarks is None or self.pose_style_source is None or
+                pixmap is None or pixmap.isNull()):
+            return
+
+        # 画面在内容区域中居中显示
+        rect = self.contentsRect()
+        width, height = pixmap.width(), pixmap.height()
+        left = rect.x() + (rect.width() - width) / 2
+        top = rect.y() + (rect.height() - height) / 2
+        scale = width / self.pose_frame_size[0]
+
+        style = self.pose_style_source()
+        points, visible, connections = visible_pose_elements(self.pose_landmarks, width, height, style)
+        points += (left, top)
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # 连接线
+        if len(connections):
+            b, g, r = style.connection_color
+            painter.setPen(QPen(QColor(r, g, b), max(1.0, style.line_thickness * scale)))
+            painter.drawLines([QLineF(*points[i], *points[j]) for i, j in connections.tolist()])
+
+        # 关键点
+        b, g, r = style.landmark_color
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(r, g, b))
+        size = max(1.0, style.landmark_size * scale)
+        for x, y in points[visible].tolist():
+            if style.landmark_shape == "square":
+                painter.drawRect(QRectF(x - size, y - size, 2 * size, 2 * size))
+            elif style.landmark_shape == "diamond":
+                painter.drawPolygon(QPolygonF([QPointF(x, y - size), QPointF(x + size, y),
+                                               QPointF(x, y + size), QPointF(x - size, y)]))
+            else:
+                painter.drawEllipse(QPointF(x, y), size, size)
+        painter.end()
+
 class PoseDetectionApp(QMainWindow):
     """专业姿态检测应用主窗口"""
     
@@ -134,6 +285,72 @@ class PoseDetectionApp(QMainWindow):
         self.play_timer = QTimer()
         self.play_timer.timeout.connect(self.update_frame)
         self.play_timer_interval = 33  # 约30fps
+
+        # 后台解码设置（每个视频的预读帧数和内存预算）
+        self.decode_buffer_frames = 8
+        self.decode_buffer_mb = 256
+        self.decoder1 = None
+        self.decoder2 = None
+
+        # 基于关键帧索引的随机帧读取（跳转、刷新当前帧、导出预览共用）
+        self.frame_reader1 = None
+        self.frame_reader2 = None
+        self.preview_frame_index = 0
+
+        # 每个视频的已解码帧LRU缓存（播放、跳转、旋转刷新和导出预览共用）
+        self.frame_cache_mb = 256
+        self.frame_cache1 = FrameCache(self.frame_cache_mb * 1024 * 1024)
+        self.frame_cache2 = FrameCache(self.frame_cache_mb * 1024 * 1024)
+
+        # 导出线程和待导出队列（每项为 (视频编号, 输出路径)）
+        self.export_worker = None
+        self.export_queue = []
+        # 导出队列是否正在进行（从开始导出到队列结束，期间锁定导出和推理质量设置）
+        self.export_running = False
+        # 导出期间锁定的推理质量设置（配置对话框创建后加入）
+        self.inference_settings_groups = []
+        self.export_total = 0
+        self.export_count = 0
+        self.export_save_dir = None
+
+        # 并行分段导出使用的进程数
+        self.export_parallel_enabled = False
+        self.export_process_count = os.cpu_count() or 1
+
+        # 对比播放时视频2在工作线程中处理，与视频1的推理并行
+        self.playback_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playback")
+
+        # 播放时按推理耗时和动作幅度隔帧推理，中间帧外推关键点
+        self.adaptive_inference_enabled = True
+        self.inference_schedulers = {1: InferenceScheduler(), 2: InferenceScheduler()}
+
+        # 推理质量配置：播放默认按推理耗时自动选择模型和输入分辨率，导出和预分析使用固定档位
+        self.playback_profile = DEFAULT_PLAYBACK_PROFILE
+        # 推理后端（legacy: mp.solutions.pose，tasks: PoseLandmarker）和每帧最多检测的人数
+        self.pose_backend = DEFAULT_BACKEND
+        self.max_poses = 1
+        # tasks后端的模型文件不随程序发布，没有时不能选择tasks后端，也不能多人检测
+        self.tasks_backend_ready = tasks_models_available()
+        # 播放中改变的引擎参数（后端、人数），在没有推理进行时才重建引擎
+        self.pending_engine_options = {}
+        self.export_profile = DEFAULT_EXPORT_PROFILE
+        # 不需要下载就能使用的模型（缺少的模型在运行时下载会阻塞，离线时直接失败）
+        self.available_models = available_model_complexities(self.pose_backend)
+        start_level = QUALITY_PROFILES[self.playback_profile]["level"]
+        self.level_controllers = {
+            video_num: LevelController(start_level, available=self.available_models) for video_num in (1, 2)
+        }
+
+        # 姿态关键点缓存（按视频内容哈希和推理旋转角度区分）
+        self.video1_hash = None
+        self.video2_hash = None
+        self.landmark_caches1 = {}
+        self.landmark_caches2 = {}
+
+        # 后台预分析（先按间隔抽样，再补全其余帧）
+        self.analysis_coarse_stride = 10
+        self.analysis_workers = {}
+        self.analysis_status = {}
         
         # 姿态检测设置
         self.landmark_color = (0, 255, 0)  # 绿色
@@ -141,6 +358,17 @@ class PoseDetectionApp(QMainWindow):
         self.line_thickness = 2
         self.landmark_size = 8
         self.landmark_shape = "square"
+        # 缓存的绘制样式（含预先计算的连接线数组），设置改变时重建
+        self.pose_style = None
+        self.pose_style_key = None
+        # 播放画面的骨架在控件中按显示分辨率叠加绘制，而不是画进原始帧
+        self.pose_overlay_mode = True
+        # 当前显示的原始帧和关键点（样式改变时据此重新绘制，无需解码和推理）
+        self.displayed_frames = {}
+        # 当前显示的帧序号（播放中 current_frame_pos 已指向下一帧，点击锁定目标时按显示的帧计算时间戳）
+        self.displayed_frame_indices = {}
+        self.preview_render = None
+        self.render_pending = False
         
         # 悬浮窗引用
         self.landmark_selector_dialog = None
@@ -444,6 +672,8 @@ class PoseDetectionApp(QMainWindow):
 
         # 视频1显示区域
         self.video1_widget = VideoWidget()
+        self.video1_widget.pose_style_source = self.get_pose_style
+        self.video1_widget.point_clicked.connect(lambda x, y: self.select_target_at(1, x, y))
         video1_layout.addWidget(self.video1_widget)
 
         # 视频1控制面板
@@ -460,6 +690,8 @@ class PoseDetectionApp(QMainWindow):
 
         # 视频2显示区域
         self.video2_widget = VideoWidget()
+        self.video2_widget.pose_style_source = self.get_pose_style
+        self.video2_widget.point_clicked.connect(lambda x, y: self.select_target_at(2, x, y))
         self.video2_widget.setText(tr("video_widget.video2_text"))
         video2_layout.addWidget(self.video2_widget)
 
@@ -509,6 +741,17 @@ class PoseDetectionApp(QMainWindow):
             rotate_button.clicked.connect(self.rotate_video2)
         control_layout.addWidget(rotate_button)
 
+        # 镜像按钮（比较正脚/反脚站姿时水平翻转）
+        mirror_button = ModernButton("", "↔️", "#FF9800")
+        mirror_button.setFixedSize(40, 30)
+        if video_num == 1:
+            self.mirror_button1 = mirror_button
+            mirror_button.clicked.connect(self.mirror_video1)
+        else:
+            self.mirror_button2 = mirror_button
+            mirror_button.clicked.connect(self.mirror_video2)
+        control_layout.addWidget(mirror_button)
+
         # 进度条
         progress_slider = QSlider(Qt.Orientation.Horizontal)
         progress_slider.setMinimum(0)
@@ -578,6 +821,10 @@ class PoseDetectionApp(QMainWindow):
         self.fps_label = QLabel("FPS: --")
         status_bar.addPermanentWidget(self.fps_label)
 
+        # 预分析进度标签
+        self.analysis_label = QLabel("")
+        status_bar.addPermanentWidget(self.analysis_label)
+
         # 内存使用标签
         self.memory_label = QLabel(tr("status.memory", memory="--"))
         status_bar.addPermanentWidget(self.memory_label)
@@ -619,6 +866,8 @@ class PoseDetectionApp(QMainWindow):
         self.image_watermark_position = "左下角"  # 图片水印位置
         self.watermark_opacity = 70
         self.watermark_size = "中"
+        # 水印合成器（缓存缩放好的水印图片，设置改变时更新）
+        self.watermark_compositor = WatermarkCompositor(self.get_watermark_settings())
 
         # 预览播放状态
         self.preview_playing = False
@@ -626,8 +875,11 @@ class PoseDetectionApp(QMainWindow):
         self.preview_timer.timeout.connect(self.update_preview_frame)
 
         # 视频旋转状态 (0=0°, 1=90°, 2=180°, 3=270°)
+        # 旋转和镜像只在显示和导出时变换画面与关键点坐标，推理始终使用原始方向的帧
         self.video1_rotation = 0
         self.video2_rotation = 0
+        self.video1_mirror = False
+        self.video2_mirror = False
 
         # 导出时的旋转设置（可以与播放时不同）
         self.export_video1_rotation = 0
@@ -642,18 +894,17 @@ class PoseDetectionApp(QMainWindow):
             self.mp_drawing = mp.solutions.drawing_utils
             self.mp_drawing_styles = mp.solutions.drawing_styles
 
-            # 创建Pose模型
-            self.pose = self.mp_pose.Pose(
-                static_image_mode=False,
-                model_complexity=1,
-                smooth_landmarks=True,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
-            )
+            # 每个逻辑流（视频1、视频2、导出预览）使用独立的Pose实例，保持各自的跟踪状态
+            self.pose_pool = PoseEnginePool(**self.pose_engine_options())
 
             self.mediapipe_initialized = True
             self.update_status(tr("messages.mediapipe_initialized"))
 
+            # 初始化前已加载的视频，现在开始预分析
+            for video_num, cap in ((1, self.cap1), (2, self.cap2)):
+                if cap is not None:
+                    self.start_background_analysis(video_num)
+
         except Exception as e:
             self.update_status(tr("messages.mediapipe_init_failed", error=str(e)))
             self.mediapipe_initialized = False
@@ -690,29 +941,42 @@ class PoseDetectionApp(QMainWindow):
 
             if file_path:
                 # 释放之前的视频
+                self.stop_background_analysis(1)
                 if self.cap1:
                     self.cap1.release()
+                    self.frame_reader1 = None
+                self.frame_cache1.clear()
+                if self.decoder1:
+                    self.decoder1.stop()
+                    self.decoder1 = None
 
                 # 打开新视频
                 self.cap1 = cv2.VideoCapture(file_path)
                 if self.cap1.isOpened():
                     # 存储原始视频路径（用于音频提取）
                     self.video1_path = file_path
-                    # 重置旋转设置
+                    # 创建后台解码器（播放时启动）
+                    self.decoder1 = self.create_decoder(file_path)
+                    # 关联该视频的姿态关键点缓存
+                    self.open_landmark_caches(1, file_path)
+                    self.reset_pose_tracking("video1", forget_people=True)
+                    # 关键帧索引（按内容哈希缓存）在后台读取或扫描，就绪前按帧号直接定位
+                    self.frame_reader1 = FrameReader(self.cap1, SeekIndex(None), self.frame_cache1)
+                    self.frame_reader1.load_index_in_background(file_path, self.video1_hash)
+                    # 重置旋转和镜像设置
                     self.video1_rotation = 0
+                    self.video1_mirror = False
                     # 获取视频信息
                     self.total_frames1 = int(self.cap1.get(cv2.CAP_PROP_FRAME_COUNT))
                     self.fps1 = self.cap1.get(cv2.CAP_PROP_FPS)
+                    self.inference_schedulers[1].set_fps(self.fps1)
+                    self.level_controllers[1].set_fps(self.fps1)
 
                     # 显示第一帧
-                    ret, frame = self.cap1.read()
-                    if ret:
+                    frame = self.frame_reader1.read_at(0)
+                    if frame is not None:
                         self.current_frame1 = frame
-                        processed_frame = self.process_pose_detection(frame)
-                        self.display_frame_in_widget(processed_frame, self.video1_widget)
-
-                        # 重置到开头
-                        self.cap1.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        self.show_video_frame(1, self.render_display_frame(frame, 1, 0), 0)
 
                     # 重置播放状态
                     self.is_playing1 = False
@@ -727,6 +991,9 @@ class PoseDetectionApp(QMainWindow):
 
                     self.update_status(tr("messages.video1_loaded", filename=os.path.basename(file_path)))
 
+                    # 后台分析整段视频
+                    self.start_background_analysis(1)
+
                     # 更新导出选项状态
                     if hasattr(self, 'export_dialog') and self.export_dialog is not None:
                         self.update_export_video_options()
@@ -751,29 +1018,42 @@ class PoseDetectionApp(QMainWindow):
 
             if file_path:
                 # 释放之前的视频
+                self.stop_background_analysis(2)
                 if self.cap2:
                     self.cap2.release()
+                    self.frame_reader2 = None
+                self.frame_cache2.clear()
+                if self.decoder2:
+                    self.decoder2.stop()
+                    self.decoder2 = None
 
                 # 打开新视频
                 self.cap2 = cv2.VideoCapture(file_path)
                 if self.cap2.isOpened():
                     # 存储原始视频路径（用于音频提取）
                     self.video2_path = file_path
-                    # 重置旋转设置
+                    # 创建后台解码器（播放时启动）
+                    self.decoder2 = self.create_decoder(file_path)
+                    # 关联该视频的姿态关键点缓存
+                    self.open_landmark_caches(2, file_path)
+                    self.reset_pose_tracking("video2", forget_people=True)
+                    # 关键帧索引（按内容哈希缓存）在后台读取或扫描，就绪前按帧号直接定位
+                    self.frame_reader2 = FrameReader(self.cap2, SeekIndex(None), self.frame_cache2)
+                    self.frame_reader2.load_index_in_background(file_path, self.video2_hash)
+                    # 重置旋转和镜像设置
                     self.video2_rotation = 0
+                    self.video2_mirror = False
                     # 获取视频信息
                     self.total_frames2 = int(self.cap2.get(cv2.CAP_PROP_FRAME_COUNT))
                     self.fps2 = self.cap2.get(cv2.CAP_PROP_FPS)
+                    self.inference_schedulers[2].set_fps(self.fps2)
+                    self.level_controllers[2].set_fps(self.fps2)
 
                     # 显示第一帧
-                    ret, frame = self.cap2.read()
-                    if ret:
+                    frame = self.frame_reader2.read_at(0)
+                    if frame is not None:
                         self.current_frame2 = frame
-                        processed_frame = self.process_pose_detection(frame)
-                        self.display_frame_in_widget(processed_frame, self.video2_widget)
-
-                        # 重置到开头
-                        self.cap2.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        self.show_video_frame(2, self.render_display_frame(frame, 2, 0), 0)
 
                     # 启用比较模式
                     self.video2_loaded = True
@@ -792,6 +1072,9 @@ class PoseDetectionApp(QMainWindow):
 
                     self.update_status(tr("messages.video2_loaded", filename=os.path.basename(file_path)))
 
+                    # 后台分析整段视频
+                    self.start_background_analysis(2)
+
                     # 更新导出选项状态
                     if hasattr(self, 'export_dialog') and self.export_dialog is not None:
                         self.update_export_video_options()
@@ -852,59 +1135,10 @@ class PoseDetectionApp(QMainWindow):
         else:
             self.load_video2()
 
-    def display_frame_in_widget(self, frame, widget):
-        """在控件中显示帧，保持原始比例"""
+    def display_frame_in_widget(self, frame, widget, rotation=0, mirror=False):
+        """在控件中显示帧，保持原始比例（按需旋转和镜像）"""
         try:
-            # 获取控件大小
-            widget.update()
-            widget_width = widget.width()
-            widget_height = widget.height()
-
-            # 如果控件还没有大小，使用默认值
-            if widget_width <= 1 or widget_height <= 1:
-                widget_width = 640
-                widget_height = 480
-
-            # 获取原始帧尺寸
-            frame_height, frame_width = frame.shape[:2]
-
-            # 计算帧的宽高比
-            frame_aspect_ratio = frame_width / frame_height
-
-            # 根据帧的宽高比决定显示方向和缩放策略
-            if frame_aspect_ratio > 1.5:  # 横屏视频 (宽高比 > 1.5)
-                # 横屏视频，优先适应宽度
-                scale = min(widget_width / frame_width, widget_height / frame_height) * 0.95
-            elif frame_aspect_ratio < 0.7:  # 竖屏视频 (宽高比 < 0.7)
-                # 竖屏视频，优先适应高度
-                scale = min(widget_height / frame_height, widget_width / frame_width) * 0.95
-            else:  # 接近正方形的视频
-                # 正方形视频，按比例缩放
-                scale = min(widget_width / frame_width, widget_height / frame_height) * 0.95
-
-            # 计算新尺寸
-            new_width = int(frame_width * scale)
-            new_height = int(frame_height * scale)
-
-            # 确保尺寸有效
-            if new_width > 0 and new_height > 0:
-                resized_frame = cv2.resize(frame, (new_width, new_height))
-
-                # 转换颜色空间
-                rgb_frame = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_frame.shape
-                bytes_per_line = ch * w
-
-                # 创建QImage
-                qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-
-                # 创建QPixmap
-                pixmap = QPixmap.fromImage(qt_image)
-
-                # 设置像素图，保持宽高比
-                widget.setPixmap(pixmap)
-                widget.setScaledContents(False)  # 不拉伸内容
-                widget.setAlignment(Qt.AlignmentFlag.AlignCenter)  # 居中显示
+            widget.show_frame(frame, rotation, mirror)
 
         except Exception as e:
             print(tr("messages.display_frame_error", error=str(e)))
@@ -959,8 +1193,27 @@ class PoseDetectionApp(QMainWindow):
         if self.performance_dialog.isVisible():
             self.performance_dialog.hide()
         else:
+            self.update_performance_info()
             self.performance_dialog.show()
 
+    def update_performance_info(self):
+        """在性能监控对话框中显示帧缓存统计"""
+        lines = []
+        for video_num, cap, cache in ((1, self.cap1, self.frame_cache1), (2, self.cap2, self.frame_cache2)):
+            if cap is None:
+                continue
+            stats = cache.stats()
+            lines.append(tr("performance.frame_cache", video=video_num, frames=stats["frames"],
+                            mb=stats["bytes"] / (1024 * 1024), hit_rate=stats["hit_rate"]))
+            scheduler = self.inference_schedulers[video_num]
+            if self.adaptive_inference_enabled and scheduler.latency is not None:
+                lines.append(tr("performance.inference_stride", video=video_num, stride=scheduler.stride,
+                                latency=scheduler.latency * 1000))
+            model_complexity, max_input_size = self.inference_settings(f"video{video_num}")
+            lines.append(tr("performance.inference_model", video=video_num, model=MODEL_NAMES[model_complexity],
+                            size=max_input_size or tr("performance.input_unlimited")))
+        self.performance_info_label.setText("\n".join(lines) or tr("performance.developing"))
+
     def toggle_help(self):
         """切换帮助"""
         if not hasattr(self, 'help_dialog') or self.help_dialog is None:
@@ -1230,6 +1483,22 @@ class PoseDetectionApp(QMainWindow):
         fps_layout.addWidget(self.fps_combo)
         settings_layout.addLayout(fps_layout)
 
+        # 分辨率设置（按短边缩小，不放大）
+        resolution_layout = QHBoxLayout()
+        resolution_layout.addWidget(QLabel(tr("export.output_resolution")))
+        self.resolution_combo = QComboBox()
+        self.resolution_combo.addItems(["原始分辨率", "1080p", "720p", "480p"])
+        self.resolution_combo.setCurrentText("原始分辨率")
+        resolution_layout.addWidget(self.resolution_combo)
+        settings_layout.addLayout(resolution_layout)
+
+        # 并行分段导出（长视频按时间分段，多个进程同时处理）
+        self.parallel_export_cb = QCheckBox(tr("export.parallel_export"))
+        self.parallel_export_cb.setChecked(self.export_parallel_enabled)
+        self.parallel_export_cb.setEnabled(self.export_process_count > 1)
+        self.parallel_export_cb.toggled.connect(self.on_parallel_export_toggled)
+        settings_layout.addWidget(self.parallel_export_cb)
+
         layout.addWidget(settings_group)
 
         # 旋转设置 - 紧凑布局
@@ -1438,6 +1707,7 @@ class PoseDetectionApp(QMainWindow):
         # 初始隐藏进度组
         progress_group.setVisible(False)
         self.export_progress_group = progress_group
+        self.export_settings_groups = [video_group, settings_group, rotation_group, watermark_group]
         layout.addWidget(progress_group)
 
         # 按钮
@@ -1499,8 +1769,7 @@ class PoseDetectionApp(QMainWindow):
         self.watermark_opacity_slider.setEnabled(enabled)
         self.watermark_size_combo.setEnabled(enabled)
         # 刷新预览以显示水印启用/禁用效果
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
     def on_text_watermark_enabled_changed(self, state):
         """文字水印启用状态改变"""
@@ -1508,8 +1777,7 @@ class PoseDetectionApp(QMainWindow):
         enabled = self.watermark_enabled and self.text_watermark_enabled
         self.watermark_text_input.setEnabled(enabled)
         self.text_watermark_position_combo.setEnabled(enabled)
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
     def on_image_watermark_enabled_changed(self, state):
         """图片水印启用状态改变"""
@@ -1518,53 +1786,40 @@ class PoseDetectionApp(QMainWindow):
         self.watermark_image_input.setEnabled(enabled)
         self.watermark_image_browse_btn.setEnabled(enabled)
         self.image_watermark_position_combo.setEnabled(enabled)
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
     def on_watermark_text_changed(self, text):
         """水印文本改变"""
         self.watermark_text = text
-        # 刷新预览以显示新的水印效果
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
     def on_text_watermark_position_changed(self, position):
         """文字水印位置改变"""
         self.text_watermark_position = position
-        # 刷新预览以显示新的水印效果
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
     def on_image_watermark_position_changed(self, position):
         """图片水印位置改变"""
         self.image_watermark_position = position
-        # 刷新预览以显示新的水印效果
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
     def on_watermark_opacity_changed(self, value):
         """水印透明度改变"""
         self.watermark_opacity = value
         self.watermark_opacity_label.setText(f"{value}%")
-        # 刷新预览以显示新的水印效果
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
     def on_watermark_size_changed(self, size):
         """水印大小改变"""
         self.watermark_size = size
-        # 刷新预览以显示新的水印效果
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
 
 
     def on_watermark_image_changed(self, image_path):
         """水印图片路径改变"""
         self.watermark_image_path = image_path
-        # 刷新预览以显示新的水印效果
-        if hasattr(self, 'export_preview_widget'):
-            self.refresh_export_preview()
+        self.update_watermark_settings()
 
     def browse_watermark_image(self):
         """浏览选择水印图片"""
@@ -1578,8 +1833,7 @@ class PoseDetectionApp(QMainWindow):
             self.watermark_image_input.setText(file_path)
             self.watermark_image_path = file_path
             # 刷新预览以显示新的水印效果
-            if hasattr(self, 'export_preview_widget'):
-                self.refresh_export_preview()
+            self.update_watermark_settings()
 
     def on_export_video1_rotation_changed(self, index):
         """导出时视频1旋转设置改变"""
@@ -1625,36 +1879,31 @@ class PoseDetectionApp(QMainWindow):
             self.preview_timer.start(33)  # 约30fps
             self.preview_play_btn.setText("⏸️ 停止预览")
 
-    def refresh_export_preview(self):
-        """刷新导出预览"""
-        # 确定预览哪个视频（优先视频1，如果没有则视频2）
-        preview_cap = None
-        preview_video_num = 1
-
+    def get_preview_video_num(self):
+        """确定预览哪个视频（优先视频1，如果没有则视频2），没有视频时返回None"""
         if hasattr(self, 'export_video1_cb') and self.export_video1_cb.isChecked() and self.cap1:
-            preview_cap = self.cap1
-            preview_video_num = 1
+            return 1
         elif hasattr(self, 'export_video2_cb') and self.export_video2_cb.isChecked() and self.cap2:
-            preview_cap = self.cap2
-            preview_video_num = 2
+            return 2
         elif self.cap1:  # 默认预览视频1
-            preview_cap = self.cap1
-            preview_video_num = 1
+            return 1
         elif self.cap2:  # 如果视频1不存在，预览视频2
-            preview_cap = self.cap2
-            preview_video_num = 2
+            return 2
+        return None
+
+    def refresh_export_preview(self):
+        """刷新导出预览（显示当前播放位置的帧）"""
+        preview_video_num = self.get_preview_video_num()
+        if preview_video_num is None:
+            return
 
-        if preview_cap:
-            # 获取当前帧
-            current_pos = int(preview_cap.get(cv2.CAP_PROP_POS_FRAMES))
-            ret, frame = preview_cap.read()
-            if ret:
-                # 处理姿态检测和水印
-                processed_frame = self.process_frame_for_export(frame, preview_video_num)
-                self.display_frame_in_widget(processed_frame, self.export_preview_widget)
+        if preview_video_num == 1:
+            current_pos = min(self.current_frame_pos1, max(0, self.total_frames1 - 1))
+        else:
+            current_pos = min(self.current_frame_pos2, max(0, self.total_frames2 - 1))
 
-                # 恢复视频位置
-                preview_cap.set(cv2.CAP_PROP_POS_FRAMES, current_pos)
+        self.reset_pose_tracking("preview")
+        self.show_preview_frame(preview_video_num, current_pos)
 
     def update_preview_frame(self):
         """更新预览帧"""
@@ -1662,287 +1911,85 @@ class PoseDetectionApp(QMainWindow):
             if not self.preview_playing:
                 return
 
-            # 确定预览哪个视频（优先视频1，如果没有则视频2）
-            preview_cap = None
-            preview_video_num = 1
-
-            if hasattr(self, 'export_video1_cb') and self.export_video1_cb.isChecked() and self.cap1:
-                preview_cap = self.cap1
-                preview_video_num = 1
-            elif hasattr(self, 'export_video2_cb') and self.export_video2_cb.isChecked() and self.cap2:
-                preview_cap = self.cap2
-                preview_video_num = 2
-            elif self.cap1:  # 默认预览视频1
-                preview_cap = self.cap1
-                preview_video_num = 1
-            elif self.cap2:  # 如果视频1不存在，预览视频2
-                preview_cap = self.cap2
-                preview_video_num = 2
-
-            if not preview_cap:
+            preview_video_num = self.get_preview_video_num()
+            if preview_video_num is None:
                 return
 
-            ret, frame = preview_cap.read()
-            if ret:
-                # 处理姿态检测和水印
-                processed_frame = self.process_frame_for_export(frame, preview_video_num)
-                self.display_frame_in_widget(processed_frame, self.export_preview_widget)
-            else:
-                # 视频播放完毕，重新开始
-                preview_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            # 顺序播放下一帧，播放完毕后重新开始
+            total_frames = self.total_frames1 if preview_video_num == 1 else self.total_frames2
+            frame_index = self.preview_frame_index + 1
+            if frame_index >= total_frames:
+                frame_index = 0
+            self.show_preview_frame(preview_video_num, frame_index)
 
         except Exception as e:
             print(f"更新预览帧时出错: {e}")
 
-    def process_frame_for_export(self, frame, video_num=1):
-        """处理用于导出的帧（包含旋转、姿态检测和水印）"""
+    def show_preview_frame(self, video_num, frame_index):
+        """读取指定帧，处理姿态检测和水印后显示在导出预览中"""
+        reader = self.frame_reader1 if video_num == 1 else self.frame_reader2
+        frame = reader.read_at(frame_index) if reader is not None else None
+        if frame is None:
+            return
+
+        self.preview_frame_index = frame_index
+        landmarks = None
+        if self.mediapipe_initialized:
+            landmarks = self.detect_pose_landmarks(frame, video_num, frame_index, "preview")
+        self.preview_render = (video_num, frame, landmarks)
+        self.show_preview_render()
+
+    def show_preview_render(self):
+        """按当前样式和水印设置绘制并显示导出预览"""
+        video_num, frame, landmarks = self.preview_render
+        processed_frame = self.compose_export_frame(frame, video_num, landmarks)
+        self.display_frame_in_widget(processed_frame, self.export_preview_widget)
+
+    def compose_export_frame(self, frame, video_num, landmarks):
+        """按当前导出设置旋转/镜像预览帧，绘制关键点并添加水印（界面线程中的导出预览使用）"""
         try:
-            # 首先应用旋转（使用导出旋转设置）
             if video_num == 1:
                 rotation = getattr(self, 'export_video1_rotation', self.video1_rotation)
-                rotated_frame = self.rotate_frame(frame, rotation)
+                mirror = self.video1_mirror
             else:
                 rotation = getattr(self, 'export_video2_rotation', self.video2_rotation)
-                rotated_frame = self.rotate_frame(frame, rotation)
-
-            # 然后进行姿态检测
-            processed_frame = self.process_pose_detection(rotated_frame)
-
-            # 如果启用水印，添加水印
-            if self.watermark_enabled:
-                # 添加文字水印
-                if self.text_watermark_enabled and self.watermark_text:
-                    processed_frame = self.add_text_watermark(processed_frame)
-                # 添加图片水印
-                if self.image_watermark_enabled and self.watermark_image_path:
-                    processed_frame = self.add_image_watermark(processed_frame)
-
-            return processed_frame
+                mirror = self.video2_mirror
+            return render_export_frame(frame, landmarks, rotation, mirror, None,
+                                       self.get_pose_style(), self.watermark_compositor)
 
         except Exception as e:
-            print(f"处理导出帧时出错: {e}")
+            print(f"合成导出帧时出错: {e}")
             return frame
 
+    def get_watermark_settings(self):
+        """当前水印设置的快照（可传给导出子进程）"""
+        return WatermarkSettings(
+            enabled=self.watermark_enabled,
+            text_enabled=self.text_watermark_enabled,
+            text=self.watermark_text,
+            text_position=getattr(self, 'text_watermark_position', '右下角'),
+            image_enabled=self.image_watermark_enabled,
+            image_path=self.watermark_image_path,
+            image_position=getattr(self, 'image_watermark_position', '左下角'),
+            opacity=getattr(self, 'watermark_opacity', 80),
+            size=getattr(self, 'watermark_size', '中')
+        )
+
     def add_text_watermark(self, frame):
         """添加文字水印到帧"""
-        try:
-
-            # 获取帧尺寸
-            height, width = frame.shape[:2]
-
-            # 根据大小设置字体缩放
-            size_map = {"小": 0.5, "中": 0.8, "大": 1.2}
-            font_scale = size_map.get(self.watermark_size, 0.8)
-
-            # 调整字体大小基于视频分辨率
-            base_font_scale = min(width, height) / 1000.0
-            font_scale *= base_font_scale
-
-            # 字体设置
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            thickness = max(1, int(font_scale * 2))
-
-            # 获取文本尺寸
-            (text_width, text_height), _ = cv2.getTextSize(
-                self.watermark_text, font, font_scale, thickness
-            )
-
-            # 计算位置
-            margin = 20
-            position = getattr(self, 'text_watermark_position', '右下角')
-            if position == "右下角":
-                x = width - text_width - margin
-                y = height - margin
-            elif position == "右上角":
-                x = width - text_width - margin
-                y = text_height + margin
-            elif position == "左下角":
-                x = margin
-                y = height - margin
-            elif position == "左上角":
-                x = margin
-                y = text_height + margin
-            else:  # 居中
-                x = (width - text_width) // 2
-                y = (height + text_height) // 2
-
-            # 创建水印图层
-            overlay = frame.copy()
-
-            # 绘制文本
-            cv2.putText(overlay, self.watermark_text, (x, y), font, font_scale,
-                       (255, 255, 255), thickness, cv2.LINE_AA)
-
-            # 应用透明度
-            alpha = getattr(self, 'watermark_opacity', 80) / 100.0
-            cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
-
-            return frame
-
-        except Exception as e:
-            print(f"添加文字水印时出错: {e}")
-            return frame
+        return self.watermark_compositor.add_text_watermark(frame)
 
     def add_image_watermark(self, frame):
         """添加图片水印到帧"""
-        try:
-            import os
-
-            # 检查图片文件是否存在
-            if not os.path.exists(self.watermark_image_path):
-                print(f"水印图片不存在: {self.watermark_image_path}")
-                return frame
-
-            # 读取水印图片
-            watermark_img = cv2.imread(self.watermark_image_path, cv2.IMREAD_UNCHANGED)
-            if watermark_img is None:
-                print(f"无法读取水印图片: {self.watermark_image_path}")
-                return frame
-
-            # 获取帧和水印图片的尺寸
-            frame_height, frame_width = frame.shape[:2]
-
-            # 根据大小设置调整水印尺寸
-            size_map = {"小": 0.08, "中": 0.12, "大": 0.18}  # 增大尺寸避免过小
-            scale_factor = size_map.get(getattr(self, 'watermark_size', '中'), 0.12)
-
-            # 计算水印大小（基于帧的较小边）
-            base_size = min(frame_width, frame_height)
-            watermark_width = int(base_size * scale_factor)
-
-            # 保持水印图片的宽高比
-            wm_h, wm_w = watermark_img.shape[:2]
-            aspect_ratio = wm_h / wm_w
-            watermark_height = int(watermark_width * aspect_ratio)
-
-            # 使用高质量插值调整水印图片大小
-            watermark_resized = cv2.resize(
-                watermark_img,
-                (watermark_width, watermark_height),
-                interpolation=cv2.INTER_LANCZOS4  # 使用高质量插值
-            )
-
-            # 计算水印位置
-            margin = 20
-            position = getattr(self, 'image_watermark_position', '左下角')
-            if position == "右下角":
-                x = frame_width - watermark_width - margin
-                y = frame_height - watermark_height - margin
-            elif position == "右上角":
-                x = frame_width - watermark_width - margin
-                y = margin
-            elif position == "左下角":
-                x = margin
-                y = frame_height - watermark_height - margin
-            elif position == "左上角":
-                x = margin
-                y = margin
-            else:  # 居中
-                x = (frame_width - watermark_width) // 2
-                y = (frame_height - watermark_height) // 2
-
-            # 确保水印不会超出帧边界
-            x = max(0, min(x, frame_width - watermark_width))
-            y = max(0, min(y, frame_height - watermark_height))
-
-            # 添加水印到帧
-            if watermark_resized.shape[2] == 4:  # 带透明通道的PNG
-                self.add_watermark_with_alpha(frame, watermark_resized, x, y)
-            else:  # 不带透明通道的图片
-                self.add_watermark_without_alpha(frame, watermark_resized, x, y)
-
-            return frame
-
-        except Exception as e:
-            print(f"添加图片水印时出错: {e}")
-            return frame
-
-    def add_watermark_with_alpha(self, frame, watermark, x, y):
-        """添加带透明通道的水印"""
-        try:
-            h, w = watermark.shape[:2]
-
-            # 确保帧是3通道
-            if len(frame.shape) == 2:
-                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-
-            # 提取BGR和Alpha通道
-            if len(watermark.shape) == 3 and watermark.shape[2] == 4:
-                watermark_bgr = watermark[:, :, :3]
-                watermark_alpha = watermark[:, :, 3] / 255.0
-            else:
-                print(f"警告: 水印图片不是4通道BGRA格式: {watermark.shape}")
-                return
-
-            # 应用透明度设置
-            alpha_factor = getattr(self, 'watermark_opacity', 80) / 100.0
-            watermark_alpha = watermark_alpha * alpha_factor
-
-            # 获取帧的对应区域
-            frame_region = frame[y:y+h, x:x+w]
-
-            # 确保尺寸匹配
-            if frame_region.shape[:2] != (h, w):
-                watermark_bgr = cv2.resize(watermark_bgr, (frame_region.shape[1], frame_region.shape[0]), interpolation=cv2.INTER_LANCZOS4)
-                watermark_alpha = cv2.resize(watermark_alpha, (frame_region.shape[1], frame_region.shape[0]), interpolation=cv2.INTER_LANCZOS4)
-                h, w = frame_region.shape[:2]
-
-            # 确保frame_region是3通道
-            if len(frame_region.shape) == 2:
-                frame_region = cv2.cvtColor(frame_region, cv2.COLOR_GRAY2BGR)
-
-            # 使用向量化操作进行alpha混合，提高性能和质量
-            alpha_3d = watermark_alpha[:, :, np.newaxis]
-            blended = watermark_bgr * alpha_3d + frame_region * (1 - alpha_3d)
-
-            frame[y:y+h, x:x+w] = blended.astype(np.uint8)
-
-        except Exception as e:
-            print(f"添加带透明通道水印时出错: {e}")
-            print(f"帧形状: {frame.shape}, 水印形状: {watermark.shape}")
-            print(f"位置: ({x}, {y}), 尺寸: ({w}, {h})")
-
-    def add_watermark_without_alpha(self, frame, watermark, x, y):
-        """添加不带透明通道的水印"""
-        try:
-            h, w = watermark.shape[:2]
-
-            # 确保水印和帧有相同的通道数
-            if len(watermark.shape) == 2:  # 灰度图
-                watermark = cv2.cvtColor(watermark, cv2.COLOR_GRAY2BGR)
-            elif len(watermark.shape) == 3 and watermark.shape[2] == 4:  # BGRA
-                watermark = cv2.cvtColor(watermark, cv2.COLOR_BGRA2BGR)
-
-            # 确保帧也是3通道
-            if len(frame.shape) == 2:
-                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-
-            # 应用透明度
-            alpha = getattr(self, 'watermark_opacity', 80) / 100.0
-
-            # 获取帧的对应区域
-            frame_region = frame[y:y+h, x:x+w]
-
-            # 确保尺寸匹配
-            if frame_region.shape[:2] != watermark.shape[:2]:
-                watermark = cv2.resize(watermark, (frame_region.shape[1], frame_region.shape[0]))
-
-            # 确保通道数匹配
-            if len(frame_region.shape) == 3 and len(watermark.shape) == 3:
-                if frame_region.shape[2] != watermark.shape[2]:
-                    if watermark.shape[2] == 1:
-                        watermark = cv2.cvtColor(watermark, cv2.COLOR_GRAY2BGR)
-                    elif watermark.shape[2] == 4:
-                        watermark = cv2.cvtColor(watermark, cv2.COLOR_BGRA2BGR)
-
-            # 混合图像
-            blended = cv2.addWeighted(watermark, alpha, frame_region, 1 - alpha, 0)
-            frame[y:y+h, x:x+w] = blended
-
-        except Exception as e:
-            print(f"添加不带透明通道水印时出错: {e}")
-            print(f"帧形状: {frame.shape}, 水印形状: {watermark.shape}")
-            print(f"位置: ({x}, {y}), 尺寸: ({w}, {h})")
+        return self.watermark_compositor.add_image_watermark(frame)
+
+    def update_watermark_settings(self):
+        """水印设置改变后更新合成器并刷新预览"""
+        self.watermark_compositor.set_settings(self.get_watermark_settings())
+        if self.preview_render is not None:
+            self.invalidate_render()
+        elif hasattr(self, 'export_preview_widget'):
+            self.refresh_export_preview()
 
     def create_performance_dialog(self):
         """创建性能监控对话框"""
@@ -1957,14 +2004,21 @@ class PoseDetectionApp(QMainWindow):
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title_label)
 
-        info_label = QLabel(tr("performance.developing"))
-        info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(info_label)
+        self.performance_info_label = QLabel(tr("performance.developing"))
+        self.performance_info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.performance_info_label.setWordWrap(True)
+        layout.addWidget(self.performance_info_label)
 
         close_btn = ModernButton(tr("settings.close"), "", "#607D8B")
         close_btn.clicked.connect(self.performance_dialog.hide)
         layout.addWidget(close_btn)
 
+        # 对话框显示时定期刷新（推理间隔随播放变化）
+        self.performance_timer = QTimer(self.performance_dialog)
+        self.performance_timer.timeout.connect(
+            lambda: self.performance_dialog.isVisible() and self.update_performance_info())
+        self.performance_timer.start(500)
+
     def create_help_dialog(self):
         """创建帮助对话框"""
         self.help_dialog = QDialog(self)
@@ -2031,7 +2085,7 @@ class PoseDetectionApp(QMainWindow):
                 QMessageBox.warning(self.export_dialog, "警告", "视频2未加载")
                 return
 
-            # 选择保存路径
+            # 选择保存路径，生成导出队列
             if self.export_video1_cb.isChecked() and self.export_video2_cb.isChecked():
                 # 导出两个视频，选择文件夹
                 save_dir = QFileDialog.getExistingDirectory(
@@ -2042,47 +2096,11 @@ class PoseDetectionApp(QMainWindow):
                 if not save_dir:
                     return
 
-                # 导出多个视频
-                export_count = 0
-                total_exports = 0
-                if self.export_video1_cb.isChecked():
-                    total_exports += 1
-                if self.export_video2_cb.isChecked():
-                    total_exports += 1
-
-                # 显示进度区域
-                self.show_export_progress()
-
-                # 导出视频1
-                if self.export_video1_cb.isChecked() and not self.export_cancelled:
-                    export_count += 1
-                    self.export_status_label.setText(f"📹 准备导出第 {export_count}/{total_exports} 个视频...")
-                    output_path1 = f"{save_dir}/video1_with_pose.mp4"
-                    self.export_video_with_pose(self.cap1, output_path1, 1)
-
-                # 导出视频2
-                if self.export_video2_cb.isChecked() and not self.export_cancelled:
-                    export_count += 1
-                    self.export_status_label.setText(f"📹 准备导出第 {export_count}/{total_exports} 个视频...")
-                    output_path2 = f"{save_dir}/video2_with_pose.mp4"
-                    self.export_video_with_pose(self.cap2, output_path2, 2)
-
-                # 隐藏进度区域
-                self.hide_export_progress()
-
-                # 全部完成
-                if total_exports > 1 and not self.export_cancelled:
-                    QMessageBox.information(
-                        self.export_dialog,
-                        "批量导出完成",
-                        f"🎉 所有 {total_exports} 个视频已成功导出到:\n{save_dir}"
-                    )
-                elif self.export_cancelled:
-                    QMessageBox.information(
-                        self.export_dialog,
-                        "导出已取消",
-                        "❌ 批量导出已被用户取消"
-                    )
+                self.export_queue = [
+                    (1, f"{save_dir}/video1_with_pose.mp4"),
+                    (2, f"{save_dir}/video2_with_pose.mp4"),
+                ]
+                self.export_save_dir = save_dir
             else:
                 # 导出单个视频，选择文件名
                 output_path, _ = QFileDialog.getSaveFileName(
@@ -2094,24 +2112,16 @@ class PoseDetectionApp(QMainWindow):
                 if not output_path:
                     return
 
-                # 显示进度区域
-                self.show_export_progress()
+                video_num = 1 if self.export_video1_cb.isChecked() else 2
+                self.export_queue = [(video_num, output_path)]
+                self.export_save_dir = None
 
-                if self.export_video1_cb.isChecked():
-                    self.export_video_with_pose(self.cap1, output_path, 1)
-                else:
-                    self.export_video_with_pose(self.cap2, output_path, 2)
-
-                # 检查是否被取消
-                if self.export_cancelled:
-                    QMessageBox.information(
-                        self.export_dialog,
-                        "导出已取消",
-                        "❌ 视频导出已被用户取消"
-                    )
+            self.export_total = len(self.export_queue)
+            self.export_count = 0
 
-                # 隐藏进度区域
-                self.hide_export_progress()
+            # 显示进度区域，在后台线程中依次导出
+            self.show_export_progress()
+            self.start_next_export()
 
         except Exception as e:
             # 隐藏进度区域
@@ -2121,6 +2131,10 @@ class PoseDetectionApp(QMainWindow):
     def show_export_progress(self):
         """显示导出进度区域"""
         self.export_progress_group.setVisible(True)
+        self.export_running = True
+        # 导出过程中锁定导出设置和推理质量设置（导出线程使用开始时的快照，避免界面显示与输出不一致）
+        for group in self.export_settings_groups + self.inference_settings_groups:
+            group.setEnabled(False)
         self.export_start_btn.setVisible(False)
         self.export_cancel_btn.setVisible(True)
         self.export_cancelled = False
@@ -2131,238 +2145,228 @@ class PoseDetectionApp(QMainWindow):
             self.preview_timer.stop()
             self.preview_play_btn.setText("▶️ 播放预览")
 
-        # 强制更新UI
-        QApplication.processEvents()
-
     def hide_export_progress(self):
         """隐藏导出进度区域"""
         self.export_progress_group.setVisible(False)
+        self.export_running = False
+        for group in self.export_settings_groups + self.inference_settings_groups:
+            group.setEnabled(True)
         self.export_start_btn.setVisible(True)
         self.export_cancel_btn.setVisible(False)
 
-    def export_video_with_pose(self, cap, output_path, video_num):
-        """导出带姿态检测的视频"""
-        import time
-
-        try:
-            if not cap or not cap.isOpened():
-                QMessageBox.critical(self.export_dialog, "错误", f"视频{video_num}未正确加载")
-                return
+    def start_next_export(self):
+        """启动导出队列中的下一个视频，队列为空时结束导出"""
+        if self.export_cancelled or not self.export_queue:
+            self.finish_export_queue()
+            return
 
-            # 设置导出状态
+        video_num, output_path = self.export_queue.pop(0)
+        self.export_count += 1
+        if self.export_total > 1:
+            self.export_status_label.setText(f"📹 准备导出第 {self.export_count}/{self.export_total} 个视频...")
+        else:
             self.export_status_label.setText(f"🎬 正在准备导出视频{video_num}...")
 
-            # 获取视频信息
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            original_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            original_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-            # 根据旋转角度计算输出视频尺寸
-            if video_num == 1:
-                rotation = getattr(self, 'export_video1_rotation', self.video1_rotation)
-            else:
-                rotation = getattr(self, 'export_video2_rotation', self.video2_rotation)
-
-            # 90度和270度旋转会交换宽高
-            if rotation == 1 or rotation == 3:  # 90度或270度
-                output_width = original_height
-                output_height = original_width
-            else:  # 0度或180度
-                output_width = original_width
-                output_height = original_height
-
-            # 根据设置调整参数
-            output_fps = self.get_output_fps(fps)
-
-            # 创建视频写入器，使用旋转后的尺寸
-            # 尝试使用更兼容的编码器
-            fourcc = cv2.VideoWriter_fourcc(*'H264')
-            out = cv2.VideoWriter(output_path, fourcc, output_fps, (output_width, output_height))
-
-            # 如果H264失败，尝试使用mp4v
-            if not out.isOpened():
-                print("H264编码器失败，尝试使用mp4v编码器")
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                out = cv2.VideoWriter(output_path, fourcc, output_fps, (output_width, output_height))
-
-            if not out.isOpened():
-                raise Exception(f"无法创建输出视频文件。尺寸: {output_width}x{output_height}, FPS: {output_fps}")
+        if video_num == 1:
+            video_path = getattr(self, 'video1_path', None)
+            rotation = getattr(self, 'export_video1_rotation', self.video1_rotation)
+            mirror = self.video1_mirror
+            fps = self.fps1
+        else:
+            video_path = getattr(self, 'video2_path', None)
+            rotation = getattr(self, 'export_video2_rotation', self.video2_rotation)
+            mirror = self.video2_mirror
+            fps = self.fps2
+
+        total_frames = self.total_frames1 if video_num == 1 else self.total_frames2
+
+        # 点击锁定了目标人物时导出跟随同一人；缓存中保存的是自动选择的人物，此时不使用缓存
+        target_seed = self.locked_target_seed(video_num)
+
+        # 旋转、样式、水印、关键点缓存和推理参数在开始时保存到任务中，导出线程不读取界面状态
+        job = ExportJob(
+            video_num, video_path, output_path, rotation, self.get_output_fps(fps),
+            quality=self.get_quality_settings(), audio_source=video_path, mirror=mirror,
+            resolution=self.get_output_resolution(), pose_style=self.get_pose_style(),
+            watermark_settings=self.get_watermark_settings(),
+            cache=self.get_landmark_cache(video_num) if target_seed is None else None,
+            pose_options=self.export_pose_options(),
+            target_seed=target_seed
+        )
+        finalize = lambda path: self.add_audio_to_video(path, job.audio_source)
+
+        if target_seed is not None:
+            self.update_status(f"视频{video_num}按锁定的目标人物重新检测导出")
+
+        # 已完成预分析的视频只做解码、绘制和编码（不加载MediaPipe），缓存缺失的帧才创建引擎推理
+        cache = job.cache
+        if cache is not None and cache.covers(0, total_frames):
+            self.update_status(f"视频{video_num}已完成分析，使用缓存的关键点渲染导出")
+
+        segment_count = 1
+        # 各分段的跟踪不能衔接同一个锁定的目标，锁定目标时按顺序导出
+        if self.export_parallel_enabled and target_seed is None:
+            segment_count = parallel_segment_count(total_frames, self.export_process_count)
+
+        if segment_count > 1:
+            # 分段在子进程中处理，各自创建Pose实例
+            worker = ParallelExportWorker(
+                job,
+                segment_count,
+                pose_options=job.pose_options,
+                pose_style=job.pose_style,
+                watermark_settings=job.watermark_settings,
+                cache=cache,
+                finalize=finalize,
+                parent=self
+            )
+        else:
+            # 导出线程按任务中的参数创建自己的引擎和水印合成器，不使用界面的引擎池
+            worker = ExportWorker(job, finalize=finalize, parent=self)
+        worker.progress.connect(self.on_export_progress)
+        worker.preview.connect(self.on_export_preview)
+        worker.stage_changed.connect(self.on_export_stage_changed)
+        worker.export_finished.connect(self.on_export_finished)
+        worker.export_failed.connect(self.on_export_failed)
+        self.export_worker = worker
+        worker.start()
+
+    def on_parallel_export_toggled(self, checked):
+        """并行分段导出开关"""
+        self.export_parallel_enabled = checked
+
+    def on_export_stage_changed(self, video_num, stage):
+        """导出阶段变化"""
+        if stage == "audio":
+            self.export_status_label.setText(f"🎵 正在添加音频到视频{video_num}...")
+        elif stage == "concat":
+            self.export_status_label.setText(f"🔗 正在合并视频{video_num}的分段...")
+        else:
+            self.export_status_label.setText(f"🎬 正在导出视频{video_num}...")
+            self.frame_progress_label.setText("帧: 0 / 0")
+            self.percentage_label.setText("0%")
+            self.eta_label.setText("预计剩余: 计算中...")
 
-            # 调试信息
-            print(f"导出视频{video_num}: 原始尺寸 {original_width}x{original_height}, 旋转角度 {rotation*90}°, 输出尺寸 {output_width}x{output_height}")
+    def on_export_progress(self, video_num, frame_count, total_frames, elapsed_time):
+        """导出进度更新（工作线程已限制信号频率）"""
+        if self.export_cancelled:
+            return
 
-            # 重置视频到开头
-            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.export_progress.setMaximum(max(total_frames, 1))
+        self.export_progress.setValue(frame_count)
 
-            # 初始化进度跟踪
-            self.export_progress.setMaximum(total_frames)
-            self.export_progress.setValue(0)
-            self.export_progress.setVisible(True)
+        # 计算百分比
+        percentage = (frame_count / total_frames) * 100 if total_frames > 0 else 0
 
-            # 立即更新UI显示进度条
-            QApplication.processEvents()
+        # 计算预计剩余时间
+        if frame_count > 0:
+            avg_time_per_frame = elapsed_time / frame_count
+            remaining_frames = total_frames - frame_count
+            eta_text = self.format_eta(remaining_frames * avg_time_per_frame)
+        else:
+            eta_text = "计算中..."
+
+        # 更新显示
+        self.frame_progress_label.setText(f"帧: {frame_count} / {total_frames}")
+        self.percentage_label.setText(f"{percentage:.1f}%")
+        self.eta_label.setText(f"预计剩余: {eta_text}")
+
+        # 更新状态文本
+        if percentage < 25:
+            status_icon = "🎬"
+        elif percentage < 50:
+            status_icon = "⚡"
+        elif percentage < 75:
+            status_icon = "🚀"
+        else:
+            status_icon = "🎯"
 
-            # 时间跟踪
-            start_time = time.time()
-            frame_count = 0
-            last_update_time = start_time
+        self.export_status_label.setText(
+            f"{status_icon} 正在导出视频{video_num}... {percentage:.1f}%"
+        )
 
-            # 更新初始状态
-            self.frame_progress_label.setText(f"帧: 0 / {total_frames}")
-            self.percentage_label.setText("0%")
-            self.eta_label.setText("预计剩余: 计算中...")
-            self.export_status_label.setText(f"🎬 正在导出视频{video_num}...")
+    def on_export_preview(self, video_num, frame):
+        """显示导出线程最新处理完成的帧"""
+        # 预览控件改为显示导出进度，不再按设置重绘之前的预览帧
+        self.preview_render = None
+        if hasattr(self, 'export_preview_widget'):
+            self.display_frame_in_widget(frame, self.export_preview_widget)
 
-            # 确保对话框保持在前台
-            self.export_dialog.raise_()
-            self.export_dialog.activateWindow()
+    def on_export_finished(self, video_num, final_output_path, total_time, completed):
+        """单个视频导出结束"""
+        worker = self.sender()
+        if worker is not self.export_worker:
+            return
 
-            # 立即更新UI
-            QApplication.processEvents()
+        job = worker.job
+        self.export_worker = None
+        worker.deleteLater()
+        self.flush_landmark_caches(video_num)
 
-            while True:
-                # 检查是否取消导出
-                if self.export_cancelled:
-                    self.export_status_label.setText("❌ 导出已取消")
-                    break
+        if not completed:
+            self.export_status_label.setText("❌ 导出已取消，文件已删除")
+            self.finish_export_queue()
+            return
 
-                ret, frame = cap.read()
-                if not ret:
-                    break
+        # 完成状态
+        total_time_text = self.format_eta(total_time)
+        self.export_progress.setValue(self.export_progress.maximum())
+        self.frame_progress_label.setText(f"帧: {job.total_frames} / {job.total_frames}")
+        self.percentage_label.setText("100%")
+        self.eta_label.setText(f"总耗时: {total_time_text}")
+        self.export_status_label.setText(f"✅ 视频{video_num}导出完成！")
 
-                # 再次检查是否取消（在处理帧之前）
-                if self.export_cancelled:
-                    break
+        # 验证导出的文件
+        file_size = os.path.getsize(final_output_path) if os.path.exists(final_output_path) else 0
+        file_size_mb = file_size / (1024 * 1024)
 
-                # 处理姿态检测和水印
-                processed_frame = self.process_frame_for_export(frame, video_num)
-
-                # 验证帧尺寸是否与VideoWriter期望的尺寸一致
-                frame_height, frame_width = processed_frame.shape[:2]
-                if frame_width != output_width or frame_height != output_height:
-                    print(f"警告: 帧尺寸不匹配! 期望: {output_width}x{output_height}, 实际: {frame_width}x{frame_height}")
-                    # 调整帧尺寸以匹配VideoWriter
-                    processed_frame = cv2.resize(processed_frame, (output_width, output_height))
-
-                # 写入帧
-                out.write(processed_frame)
-
-                frame_count += 1
-                current_time = time.time()
-
-                # 每处理10帧或每秒更新一次进度（避免过于频繁的UI更新）
-                if frame_count % 10 == 0 or (current_time - last_update_time) >= 1.0:
-                    # 检查是否取消
-                    if self.export_cancelled:
-                        break
-
-                    # 更新预览显示当前处理的帧
-                    self.display_frame_in_widget(processed_frame, self.export_preview_widget)
-                    # 更新进度条
-                    self.export_progress.setValue(frame_count)
-
-                    # 计算百分比
-                    percentage = (frame_count / total_frames) * 100
-
-                    # 计算预计剩余时间
-                    elapsed_time = current_time - start_time
-                    if frame_count > 0:
-                        avg_time_per_frame = elapsed_time / frame_count
-                        remaining_frames = total_frames - frame_count
-                        eta_seconds = remaining_frames * avg_time_per_frame
-                        eta_text = self.format_eta(eta_seconds)
-                    else:
-                        eta_text = "计算中..."
-
-                    # 更新显示
-                    self.frame_progress_label.setText(f"帧: {frame_count} / {total_frames}")
-                    self.percentage_label.setText(f"{percentage:.1f}%")
-                    self.eta_label.setText(f"预计剩余: {eta_text}")
-
-                    # 更新状态文本
-                    if percentage < 25:
-                        status_icon = "🎬"
-                    elif percentage < 50:
-                        status_icon = "⚡"
-                    elif percentage < 75:
-                        status_icon = "🚀"
-                    else:
-                        status_icon = "🎯"
-
-                    self.export_status_label.setText(
-                        f"{status_icon} 正在导出视频{video_num}... {percentage:.1f}%"
-                    )
-
-                    # 处理GUI事件，保持界面响应
-                    QApplication.processEvents()
-                    last_update_time = current_time
-
-                # 检查是否需要跳帧（根据帧率设置）
-                if self.fps_combo.currentText() != "原始帧率":
-                    frame_skip = self.calculate_frame_skip(fps, output_fps)
-                    if frame_count % frame_skip != 0:
-                        continue
-
-            # 清理
-            out.release()
-
-            # 检查是否被取消
-            if self.export_cancelled:
-                # 删除未完成的文件
-                try:
-                    import os
-                    if os.path.exists(output_path):
-                        os.remove(output_path)
-                        self.export_status_label.setText("❌ 导出已取消，文件已删除")
-                except Exception as e:
-                    print(f"删除未完成文件时出错: {e}")
-                    self.export_status_label.setText("❌ 导出已取消")
-                return  # 直接返回，不执行后续的完成逻辑
-
-            # 计算总耗时
-            total_time = time.time() - start_time
-            total_time_text = self.format_eta(total_time)
-
-            # 完成状态
-            self.export_progress.setValue(total_frames)
-            self.frame_progress_label.setText(f"帧: {total_frames} / {total_frames}")
-            self.percentage_label.setText("100%")
-            self.eta_label.setText(f"总耗时: {total_time_text}")
-            self.export_status_label.setText(f"✅ 视频{video_num}导出完成！")
-
-            # 注意：不在这里隐藏进度区域，由调用方控制
-
-            # 添加音频到导出的视频
-            self.export_status_label.setText(f"🎵 正在添加音频到视频{video_num}...")
-            QApplication.processEvents()
+        # 显示完成消息
+        QMessageBox.information(
+            self.export_dialog,
+            "导出完成",
+            f"🎉 视频{video_num}已成功导出！\n\n"
+            f"📁 保存位置: {final_output_path}\n"
+            f"⏱️ 总耗时: {total_time_text}\n"
+            f"🎬 总帧数: {job.total_frames} 帧\n"
+            f"📊 文件大小: {file_size_mb:.1f} MB\n"
+            f"🔄 旋转角度: {job.rotation * 90}°\n"
+            f"📐 输出尺寸: {job.output_width}x{job.output_height}\n"
+            f"🎵 音频: 已包含原始音频"
+        )
 
-            final_output_path = self.add_audio_to_video(output_path, video_num)
+        self.start_next_export()
 
-            # 验证导出的文件
-            import os
-            file_size = os.path.getsize(final_output_path) if os.path.exists(final_output_path) else 0
-            file_size_mb = file_size / (1024 * 1024)
+    def on_export_failed(self, video_num, error):
+        """导出出错"""
+        worker = self.sender()
+        if worker is not self.export_worker:
+            return
 
-            # 显示完成消息
+        self.export_worker = None
+        worker.deleteLater()
+        self.export_queue = []
+        self.export_status_label.setText("❌ 导出失败")
+        self.hide_export_progress()
+        QMessageBox.critical(self.export_dialog, "错误", f"导出失败: {error}")
+
+    def finish_export_queue(self):
+        """导出队列全部结束"""
+        self.export_queue = []
+        self.hide_export_progress()
+
+        if self.export_cancelled:
+            if self.export_total > 1:
+                message = "❌ 批量导出已被用户取消"
+            else:
+                message = "❌ 视频导出已被用户取消"
+            QMessageBox.information(self.export_dialog, "导出已取消", message)
+        elif self.export_total > 1:
             QMessageBox.information(
                 self.export_dialog,
-                "导出完成",
-                f"🎉 视频{video_num}已成功导出！\n\n"
-                f"📁 保存位置: {final_output_path}\n"
-                f"⏱️ 总耗时: {total_time_text}\n"
-                f"🎬 总帧数: {total_frames} 帧\n"
-                f"📊 文件大小: {file_size_mb:.1f} MB\n"
-                f"🔄 旋转角度: {rotation * 90}°\n"
-                f"📐 输出尺寸: {output_width}x{output_height}\n"
-                f"🎵 音频: 已包含原始音频"
+                "批量导出完成",
+                f"🎉 所有 {self.export_total} 个视频已成功导出到:\n{self.export_save_dir}"
             )
 
-        except Exception as e:
-            # 错误处理
-            self.export_status_label.setText("❌ 导出失败")
-            raise e
-
     def format_eta(self, seconds):
         """格式化时间显示"""
         if seconds < 60:
@@ -2390,94 +2394,82 @@ class PoseDetectionApp(QMainWindow):
         else:
             return original_fps
 
+    def get_output_resolution(self):
+        """获取输出分辨率（短边像素数），None表示原始分辨率"""
+        return RESOLUTION_PRESETS.get(self.resolution_combo.currentText())
+
     def get_quality_settings(self):
         """获取质量设置"""
         quality = self.quality_combo.currentText()
         if quality == "高质量":
-            return {"bitrate": "5000k", "crf": 18}
+            return {"bitrate": "5000k", "crf": 18, "preset": "slow"}
         elif quality == "中等质量":
-            return {"bitrate": "2500k", "crf": 23}
+            return {"bitrate": "2500k", "crf": 23, "preset": "medium"}
         else:  # 压缩质量
-            return {"bitrate": "1000k", "crf": 28}
-
-    def calculate_frame_skip(self, original_fps, target_fps):
-        """计算帧跳跃间隔"""
-        if target_fps >= original_fps:
-            return 1
-        return int(original_fps / target_fps)
+            return {"bitrate": "1000k", "crf": 28, "preset": "medium"}
 
     def rotate_video1(self):
         """旋转视频1"""
         self.video1_rotation = (self.video1_rotation + 1) % 4
         self.update_status(f"视频1已旋转 {self.video1_rotation * 90}°")
-        # 立即更新显示
+        # 关键点按原始方向缓存，只需重新显示（不重新推理）
+        self.update_current_frame_display()
+
+    def mirror_video1(self):
+        """水平镜像视频1"""
+        self.video1_mirror = not self.video1_mirror
+        self.update_status(f"视频1镜像已{'开启' if self.video1_mirror else '关闭'}")
         self.update_current_frame_display()
 
     def rotate_video2(self):
         """旋转视频2"""
         self.video2_rotation = (self.video2_rotation + 1) % 4
         self.update_status(f"视频2已旋转 {self.video2_rotation * 90}°")
-        # 立即更新显示
+        # 关键点按原始方向缓存，只需重新显示（不重新推理）
+        self.update_current_frame_display()
+
+    def mirror_video2(self):
+        """水平镜像视频2"""
+        self.video2_mirror = not self.video2_mirror
+        self.update_status(f"视频2镜像已{'开启' if self.video2_mirror else '关闭'}")
         self.update_current_frame_display()
 
     def rotate_frame(self, frame, rotation):
         """旋转帧"""
-        if rotation == 0:
-            return frame
-        elif rotation == 1:  # 90度顺时针
-            return cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-        elif rotation == 2:  # 180度
-            return cv2.rotate(frame, cv2.ROTATE_180)
-        elif rotation == 3:  # 270度顺时针 (90度逆时针)
-            return cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        return frame
+        return rotate_frame(frame, rotation)
 
     def update_current_frame_display(self):
         """更新当前帧显示（用于旋转后立即刷新）"""
         try:
-            # 更新视频1
-            if self.cap1 is not None:
-                current_pos1 = int(self.cap1.get(cv2.CAP_PROP_POS_FRAMES))
-                ret1, frame1 = self.cap1.read()
-                if ret1:
-                    # 应用旋转
-                    rotated_frame1 = self.rotate_frame(frame1, self.video1_rotation)
-                    # 处理姿态检测
-                    processed_frame1 = self.process_pose_detection(rotated_frame1)
-                    # 显示帧
-                    self.display_frame_in_widget(processed_frame1, self.video1_widget)
-                    # 恢复视频位置
-                    self.cap1.set(cv2.CAP_PROP_POS_FRAMES, current_pos1)
-
-            # 更新视频2
-            if self.cap2 is not None:
-                current_pos2 = int(self.cap2.get(cv2.CAP_PROP_POS_FRAMES))
-                ret2, frame2 = self.cap2.read()
-                if ret2:
-                    # 应用旋转
-                    rotated_frame2 = self.rotate_frame(frame2, self.video2_rotation)
-                    # 处理姿态检测
-                    processed_frame2 = self.process_pose_detection(rotated_frame2)
-                    # 显示帧
-                    self.display_frame_in_widget(processed_frame2, self.video2_widget)
-                    # 恢复视频位置
-                    self.cap2.set(cv2.CAP_PROP_POS_FRAMES, current_pos2)
+            # 更新视频1（播放中由下一次定时器刷新应用旋转）
+            if self.cap1 is not None and not self.is_playing1:
+                current_pos1 = min(self.current_frame_pos1, max(0, self.total_frames1 - 1))
+                frame1 = self.frame_reader1.read_at(current_pos1)
+                if frame1 is not None:
+                    # 处理姿态检测并显示（显示时应用旋转）
+                    self.show_video_frame(1, self.render_display_frame(frame1, 1, current_pos1), current_pos1)
+
+            # 更新视频2（播放中由下一次定时器刷新应用旋转）
+            if self.cap2 is not None and not self.is_playing2:
+                current_pos2 = min(self.current_frame_pos2, max(0, self.total_frames2 - 1))
+                frame2 = self.frame_reader2.read_at(current_pos2)
+                if frame2 is not None:
+                    # 处理姿态检测并显示（显示时应用旋转）
+                    self.show_video_frame(2, self.render_display_frame(frame2, 2, current_pos2), current_pos2)
 
         except Exception as e:
             print(f"更新当前帧显示时出错: {e}")
 
-    def add_audio_to_video(self, video_path, video_num):
-        """使用FFmpeg将原始音频添加到导出的视频中"""
+    def add_audio_to_video(self, video_path, original_video_path):
+        """
+        使用FFmpeg将原始音频添加到导出的视频中
+
+        在导出线程中调用：原始视频路径来自导出任务，不访问界面控件和状态
+        """
         import subprocess
         import os
 
         try:
-            # 获取原始视频文件路径
-            if video_num == 1:
-                original_video_path = getattr(self, 'video1_path', None)
-            else:
-                original_video_path = getattr(self, 'video2_path', None)
-
             if not original_video_path or not os.path.exists(original_video_path):
                 print(f"原始视频文件不存在，跳过音频添加: {original_video_path}")
                 return video_path
@@ -2551,11 +2543,12 @@ class PoseDetectionApp(QMainWindow):
             self.export_cancelled = True
             self.export_status_label.setText("⏹️ 正在取消导出...")
 
-            # 强制更新UI显示取消状态
-            QApplication.processEvents()
-
-            # 稍等一下让用户看到取消状态
-            QTimer.singleShot(1000, self.hide_export_progress)
+            # 通知导出线程停止，线程结束后删除未完成的文件
+            if self.export_worker is not None:
+                self.export_worker.cancel()
+            else:
+                # 稍等一下让用户看到取消状态
+                QTimer.singleShot(1000, self.hide_export_progress)
 
     def toggle_playback1(self):
         """切换视频1播放状态"""
@@ -2569,6 +2562,9 @@ class PoseDetectionApp(QMainWindow):
             self.play_button1.setText("▶️")
             self.update_status("视频1已暂停")
 
+            # 停止后台解码，并让VideoCapture与当前播放位置保持一致
+            self.stop_decoder(1)
+
             # 如果两个视频都暂停了，停止定时器
             if not self.is_playing2:
                 self.play_timer.stop()
@@ -2578,6 +2574,9 @@ class PoseDetectionApp(QMainWindow):
             self.play_button1.setText("⏸️")
             self.update_status("视频1正在播放")
 
+            # 从当前位置启动后台解码
+            self.start_decoder(1)
+
             # 启动定时器
             if self.fps1 > 0:
                 self.play_timer_interval = int(1000 / self.fps1)
@@ -2599,6 +2598,9 @@ class PoseDetectionApp(QMainWindow):
             self.play_button2.setText("▶️")
             self.update_status("视频2已暂停")
 
+            # 停止后台解码，并让VideoCapture与当前播放位置保持一致
+            self.stop_decoder(2)
+
             # 如果两个视频都暂停了，停止定时器
             if not self.is_playing1:
                 self.play_timer.stop()
@@ -2608,6 +2610,9 @@ class PoseDetectionApp(QMainWindow):
             self.play_button2.setText("⏸️")
             self.update_status("视频2正在播放")
 
+            # 从当前位置启动后台解码
+            self.start_decoder(2)
+
             # 启动定时器
             if self.fps2 > 0:
                 timer_interval = int(1000 / self.fps2)
@@ -2617,6 +2622,30 @@ class PoseDetectionApp(QMainWindow):
             if not self.play_timer.isActive():
                 self.play_timer.start(timer_interval)
 
+    def create_decoder(self, video_path):
+        """创建后台解码器"""
+        return VideoDecoder(
+            video_path,
+            max_frames=self.decode_buffer_frames,
+            max_bytes=self.decode_buffer_mb * 1024 * 1024
+        )
+
+    def start_decoder(self, video_num):
+        """从当前播放位置启动指定视频的后台解码"""
+        if video_num == 1:
+            decoder, start_frame = self.decoder1, self.current_frame_pos1
+        else:
+            decoder, start_frame = self.decoder2, self.current_frame_pos2
+
+        if decoder is not None:
+            decoder.start(start_frame)
+
+    def stop_decoder(self, video_num):
+        """停止指定视频的后台解码（播放位置保存在 current_frame_pos 中）"""
+        decoder = self.decoder1 if video_num == 1 else self.decoder2
+        if decoder is not None:
+            decoder.stop()
+
     def update_frame(self):
         """更新视频帧"""
         try:
@@ -2627,59 +2656,58 @@ class PoseDetectionApp(QMainWindow):
             video1_ended = False
             video2_ended = False
 
-            # 处理视频1
+            # 从后台解码缓冲区取帧，不在GUI线程等待解码；
+            # 缓冲区暂时为空时本次跳过，等待解码线程补充
+            decoded1 = None
             if self.is_playing1 and self.cap1 is not None:
-                ret1, frame1 = self.cap1.read()
+                decoded1 = self.decoder1.read() if self.decoder1 else None
+                if decoded1 is None and (self.decoder1 is None or self.decoder1.at_end()):
+                    video1_ended = True
 
-                if ret1:
-                    self.current_frame1 = frame1
-                    self.current_frame_pos1 = int(self.cap1.get(cv2.CAP_PROP_POS_FRAMES))
+            decoded2 = None
+            if self.is_playing2 and self.video2_loaded and self.cap2 is not None:
+                decoded2 = self.decoder2.read() if self.decoder2 else None
+                if decoded2 is None and (self.decoder2 is None or self.decoder2.at_end()):
+                    video2_ended = True
 
-                    # 应用旋转
-                    rotated_frame1 = self.rotate_frame(frame1, self.video1_rotation)
+            # 旋转、姿态检测和绘制（两个视频同时有新帧时并行处理）
+            processed_frame1, processed_frame2 = self.render_playback_frames(decoded1, decoded2)
 
-                    # 处理姿态检测
-                    processed_frame1 = self.process_pose_detection(rotated_frame1)
+            # 处理视频1
+            if decoded1 is not None:
+                frame_index1, frame1 = decoded1
+                self.current_frame1 = frame1
+                self.frame_cache1.put(frame_index1, frame1)
+                self.current_frame_pos1 = frame_index1 + 1
 
-                    # 显示帧
-                    self.display_frame_in_widget(processed_frame1, self.video1_widget)
+                # 显示帧
+                self.show_video_frame(1, processed_frame1, frame_index1)
 
-                    # 更新进度条1
-                    if self.total_frames1 > 0:
-                        progress = (self.current_frame_pos1 / self.total_frames1) * 100
-                        self.progress_slider1.setValue(int(progress))
+                # 更新进度条1
+                if self.total_frames1 > 0:
+                    progress = (self.current_frame_pos1 / self.total_frames1) * 100
+                    self.progress_slider1.setValue(int(progress))
 
-                    # 更新时间显示1
-                    self.update_time_display1()
-                else:
-                    video1_ended = True
+                # 更新时间显示1
+                self.update_time_display1()
 
             # 处理视频2
-            if self.is_playing2 and self.video2_loaded and self.cap2 is not None:
-                ret2, frame2 = self.cap2.read()
+            if decoded2 is not None:
+                frame_index2, frame2 = decoded2
+                self.current_frame2 = frame2
+                self.frame_cache2.put(frame_index2, frame2)
+                self.current_frame_pos2 = frame_index2 + 1
 
-                if ret2:
-                    self.current_frame2 = frame2
-                    self.current_frame_pos2 = int(self.cap2.get(cv2.CAP_PROP_POS_FRAMES))
+                # 显示帧
+                self.show_video_frame(2, processed_frame2, frame_index2)
 
-                    # 应用旋转
-                    rotated_frame2 = self.rotate_frame(frame2, self.video2_rotation)
+                # 更新进度条2
+                if self.total_frames2 > 0:
+                    progress = (self.current_frame_pos2 / self.total_frames2) * 100
+                    self.progress_slider2.setValue(int(progress))
 
-                    # 处理姿态检测
-                    processed_frame2 = self.process_pose_detection(rotated_frame2)
-
-                    # 显示帧
-                    self.display_frame_in_widget(processed_frame2, self.video2_widget)
-
-                    # 更新进度条2
-                    if self.total_frames2 > 0:
-                        progress = (self.current_frame_pos2 / self.total_frames2) * 100
-                        self.progress_slider2.setValue(int(progress))
-
-                    # 更新时间显示2
-                    self.update_time_display2()
-                else:
-                    video2_ended = True
+                # 更新时间显示2
+                self.update_time_display2()
 
             # 检查视频1是否播放完毕
             if video1_ended:
@@ -2688,8 +2716,9 @@ class PoseDetectionApp(QMainWindow):
                 self.update_status("视频1播放完毕")
 
                 # 重置视频1到开头
+                if self.decoder1:
+                    self.decoder1.stop()
                 if self.cap1:
-                    self.cap1.set(cv2.CAP_PROP_POS_FRAMES, 0)
                     self.current_frame_pos1 = 0
                     self.progress_slider1.setValue(0)
 
@@ -2700,8 +2729,9 @@ class PoseDetectionApp(QMainWindow):
                 self.update_status("视频2播放完毕")
 
                 # 重置视频2到开头
+                if self.decoder2:
+                    self.decoder2.stop()
                 if self.cap2:
-                    self.cap2.set(cv2.CAP_PROP_POS_FRAMES, 0)
                     self.current_frame_pos2 = 0
                     self.progress_slider2.setValue(0)
 
@@ -2713,76 +2743,436 @@ class PoseDetectionApp(QMainWindow):
             print(f"更新帧时出错: {e}")
             self.update_status(f"播放错误: {str(e)}")
 
-    def process_pose_detection(self, frame):
-        """处理姿态检测"""
-        try:
-            if not self.mediapipe_initialized:
-                return frame
-
-            # 转换颜色空间
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def render_playback_frame(self, video_num, frame_index, frame, engine=None):
+        """播放帧的姿态检测和绘制（在工作线程中调用时须给出 prepare_stream() 准备好的引擎）"""
+        if not (self.adaptive_inference_enabled and self.mediapipe_initialized):
+            return self.render_display_frame(frame, video_num, frame_index, engine)
 
-            # 进行姿态检测
-            results = self.pose.process(rgb_frame)
+        try:
+            return frame, self.detect_playback_landmarks(frame, video_num, frame_index, engine)
+        except Exception as e:
+            print(f"姿态检测处理出错: {e}")
+            return frame, None
+
+    def detect_playback_landmarks(self, frame, video_num, frame_index, engine=None):
+        """
+        自适应推理：已缓存的帧直接使用缓存，其余的帧按调度器选择的间隔推理，
+        中间帧使用外推的关键点（外推结果不写入缓存）
+        """
+        scheduler = self.inference_schedulers[video_num]
+        cache = None if self.target_locked(video_num) else self.get_landmark_cache(video_num)
+        if cache is not None and cache.has(frame_index):
+            landmarks, _ = cache.get(frame_index)
+            scheduler.record(frame_index, landmarks)
+            return landmarks
+
+        if not scheduler.should_infer(frame_index):
+            return scheduler.estimate(frame_index)
+
+        start = time.perf_counter()
+        landmarks = self.detect_pose_landmarks(frame, video_num, frame_index, engine=engine)
+        latency = time.perf_counter() - start
+        scheduler.record(frame_index, landmarks, latency)
+
+        # 实时预览配置下按推理耗时切换模型和输入分辨率
+        if QUALITY_PROFILES.get(self.playback_profile, {}).get("auto"):
+            controller = self.level_controllers[video_num]
+            if controller.record(latency):
+                model_complexity, max_input_size = controller.settings
+                print(f"视频{video_num}推理档位切换为 {MODEL_NAMES[model_complexity]}，"
+                      f"输入上限 {max_input_size or '不限'}")
+        return landmarks
+
+    def render_display_frame(self, frame, video_num, frame_index=None, engine=None):
+        """
+        获取要在播放控件中显示的帧的关键点（在工作线程中调用时须给出 prepare_stream() 准备好的引擎）
+
+        帧和关键点都保持原始方向，骨架绘制、旋转和镜像在显示时应用
+
+        Returns:
+            (原始帧, 关键点或None)
+        """
+        landmarks = None
+        if self.mediapipe_initialized:
+            try:
+                landmarks = self.detect_pose_landmarks(frame, video_num, frame_index, engine=engine)
+            except Exception as e:
+                print(f"姿态检测处理出错: {e}")
+        return frame, landmarks
+
+    def show_video_frame(self, video_num, rendered, frame_index=None):
+        """
+        在视频控件中按当前样式、旋转和镜像设置显示 render_display_frame() 的结果
+
+        叠加模式下由控件按显示分辨率绘制骨架，否则把骨架画进帧的副本；
+        frame_index 为显示的帧序号，重绘同一帧时省略
+        """
+        self.displayed_frames[video_num] = rendered
+        if frame_index is not None:
+            self.displayed_frame_indices[video_num] = frame_index
+        frame, landmarks = rendered
+        if video_num == 1:
+            widget, rotation, mirror = self.video1_widget, self.video1_rotation, self.video1_mirror
+        else:
+            widget, rotation, mirror = self.video2_widget, self.video2_rotation, self.video2_mirror
 
-            # 绘制姿态关键点
+        frame_size = oriented_size(frame.shape[1], frame.shape[0], rotation)
+        if self.pose_overlay_mode:
+            self.display_frame_in_widget(frame, widget, rotation, mirror)
+            widget.set_pose_overlay(orient_landmarks(landmarks, rotation, mirror), frame_size)
+        else:
             annotated_frame = frame.copy()
-            if results.pose_landmarks:
-                self.draw_custom_landmarks(annotated_frame, results.pose_landmarks)
+            if landmarks is not None:
+                self.draw_custom_landmarks(annotated_frame, landmarks)
+            self.display_frame_in_widget(annotated_frame, widget, rotation, mirror)
+            widget.set_pose_overlay(None, frame_size)
+
+    def invalidate_render(self):
+        """
+        骨架样式、关节点选择或水印设置改变后请求重绘当前画面
+
+        同一轮事件中的多次改变（如全选关节点）合并为一次重绘
+        """
+        if not self.render_pending:
+            self.render_pending = True
+            QTimer.singleShot(0, self.rerender_displayed_frames)
+
+    def rerender_displayed_frames(self):
+        """用缓存的原始帧和关键点重新绘制两个视频和导出预览（不解码也不推理）"""
+        self.render_pending = False
+        try:
+            # 播放中的视频由下一次定时器刷新使用新设置
+            for video_num, playing in ((1, self.is_playing1), (2, self.is_playing2)):
+                if not playing and video_num in self.displayed_frames:
+                    self.show_video_frame(video_num, self.displayed_frames[video_num])
 
-            return annotated_frame
+            if self.preview_render is not None and hasattr(self, 'export_preview_widget'):
+                self.show_preview_render()
 
         except Exception as e:
-            print(f"姿态检测处理出错: {e}")
-            return frame
+            print(f"重新绘制画面时出错: {e}")
+
+    def render_playback_frames(self, decoded1, decoded2):
+        """
+        渲染两个视频本次要显示的帧
+
+        两个视频各自使用独立的Pose实例，MediaPipe推理时会释放GIL，
+        因此视频2提交到工作线程，视频1在当前线程处理，最后汇合结果。
+        关键点缓存、引擎和推理档位在并行处理之前准备好，两个视频的处理过程只读取共享状态。
+
+        Returns:
+            (视频1处理后的帧, 视频2处理后的帧)，没有新帧的一方为None
+        """
+        # 上一帧的推理都已完成，此时可以安全地重建引擎
+        self.apply_pending_engine_options()
+
+        if decoded1 is not None and decoded2 is not None:
+            engine1, engine2 = self.prepare_stream(1), self.prepare_stream(2)
+            future2 = self.playback_executor.submit(self.render_playback_frame, 2, *decoded2, engine2)
+            processed_frame1 = self.render_playback_frame(1, *decoded1, engine1)
+            return processed_frame1, future2.result()
+
+        processed_frame1 = self.render_playback_frame(1, *decoded1) if decoded1 is not None else None
+        processed_frame2 = self.render_playback_frame(2, *decoded2) if decoded2 is not None else None
+        return processed_frame1, processed_frame2
+
+    def open_landmark_caches(self, video_num, video_path):
+        """为新加载的视频计算内容哈希，关联其关键点缓存"""
+        self.flush_landmark_caches(video_num)
 
-    def draw_custom_landmarks(self, image, landmarks):
-        """绘制自定义关键点"""
         try:
-            if not landmarks:
-                return
+            video_hash = compute_video_hash(video_path)
+        except Exception as e:
+            print(f"计算视频哈希时出错，不使用关键点缓存: {e}")
+            video_hash = None
 
-            height, width, _ = image.shape
+        if video_num == 1:
+            self.video1_hash = video_hash
+            self.landmark_caches1 = {}
+        else:
+            self.video2_hash = video_hash
+            self.landmark_caches2 = {}
 
-            # 绘制连接线
-            for connection in self.mp_pose.POSE_CONNECTIONS:
-                start_idx = connection[0]
-                end_idx = connection[1]
+    def get_landmark_cache(self, video_num):
+        """获取指定视频的关键点缓存（按需打开，关键点按原始方向保存）"""
+        if video_num == 1:
+            video_hash, total_frames, caches = self.video1_hash, self.total_frames1, self.landmark_caches1
+        elif video_num == 2:
+            video_hash, total_frames, caches = self.video2_hash, self.total_frames2, self.landmark_caches2
+        else:
+            return None
 
-                if (start_idx < len(landmarks.landmark) and
-                    end_idx < len(landmarks.landmark) and
-                    self.landmark_visibility.get(start_idx, True) and
-                    self.landmark_visibility.get(end_idx, True)):
+        if not video_hash or total_frames <= 0:
+            return None
 
-                    start_landmark = landmarks.landmark[start_idx]
-                    end_landmark = landmarks.landmark[end_idx]
+        # 按推理后端和导出配置的模型区分缓存，不同模型的结果不混用
+        variant = f"{self.pose_backend[0]}{self.export_inference_settings()[0]}"
+        if variant not in caches:
+            try:
+                caches[variant] = LandmarkCache.for_video(video_hash, total_frames, variant=variant)
+            except Exception as e:
+                print(f"打开关键点缓存时出错: {e}")
+                caches[variant] = None
+
+        return caches[variant]
+
+    def flush_landmark_caches(self, video_num=None):
+        """将关键点缓存写回磁盘"""
+        cache_groups = []
+        if video_num in (None, 1):
+            cache_groups.append(self.landmark_caches1)
+        if video_num in (None, 2):
+            cache_groups.append(self.landmark_caches2)
+
+        for caches in cache_groups:
+            for cache in caches.values():
+                if cache is not None:
+                    try:
+                        cache.flush()
+                    except Exception as e:
+                        print(f"保存关键点缓存时出错: {e}")
+
+    def inference_settings(self, stream):
+        """指定流当前使用的 (模型复杂度, 推理输入长边上限)"""
+        if stream in ("video1", "video2"):
+            profile = QUALITY_PROFILES.get(self.playback_profile, QUALITY_PROFILES[DEFAULT_PLAYBACK_PROFILE])
+            if profile["auto"]:
+                return self.level_controllers[int(stream[-1])].settings
+            return profile_settings(self.playback_profile, DEFAULT_PLAYBACK_PROFILE, self.available_models)
+        # 导出、导出预览和预分析使用导出配置（结果写入同一份关键点缓存）
+        return self.export_inference_settings()
+
+    def export_inference_settings(self):
+        """导出配置的 (模型复杂度, 推理输入长边上限)，配置的模型不可用时使用最接近的可用档位"""
+        return profile_settings(self.export_profile, DEFAULT_EXPORT_PROFILE, self.available_models)
+
+    def pose_engine_options(self):
+        """创建姿态检测引擎的公共参数（当前后端和人数，不需要MediaPipe已初始化）"""
+        return dict(
+            backend=self.pose_backend,
+            num_poses=self.max_poses,
+            model_complexity=1,
+            smooth_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    def export_pose_options(self):
+        """导出线程和子进程创建引擎使用的参数（按导出配置固定模型和输入分辨率）"""
+        model_complexity, max_input_size = self.export_inference_settings()
+        options = self.pose_engine_options()
+        options.update(model_complexity=model_complexity, max_input_size=max_input_size)
+        return options
+
+    def create_analysis_pose(self, static_image_mode):
+        """为后台预分析创建独立的姿态检测器"""
+        options = self.export_pose_options()
+        options.update(static_image_mode=static_image_mode, smooth_landmarks=not static_image_mode)
+        return create_pose_engine(**options)
+
+    def start_background_analysis(self, video_num):
+        """启动指定视频的后台预分析（已有任务时先停止）"""
+        self.stop_background_analysis(video_num)
+
+        if not self.mediapipe_initialized:
+            return  # MediaPipe初始化完成后会自动启动
+
+        video_path = getattr(self, f'video{video_num}_path', None)
+        cache = self.get_landmark_cache(video_num)
+        if not video_path or cache is None:
+            return
+
+        worker = PoseAnalysisWorker(
+            video_num, video_path, cache,
+            pose_factory=self.create_analysis_pose,
+            coarse_stride=self.analysis_coarse_stride,
+            parent=self
+        )
+        worker.progress.connect(self.on_analysis_progress)
+        worker.analysis_finished.connect(self.on_analysis_finished)
+        self.analysis_workers[video_num] = worker
+        worker.start(QThread.Priority.LowPriority)
+
+    def stop_background_analysis(self, video_num=None):
+        """停止后台预分析"""
+        video_nums = [video_num] if video_num is not None else list(self.analysis_workers.keys())
+        for num in video_nums:
+            worker = self.analysis_workers.pop(num, None)
+            if worker is not None:
+                worker.cancel()
+                worker.wait()
+                worker.deleteLater()
+            self.analysis_status.pop(num, None)
+        self.update_analysis_label()
+
+    def on_analysis_progress(self, video_num, done, total, phase):
+        """预分析进度更新"""
+        percent = int(done * 100 / total) if total > 0 else 100
+        phase_text = tr("status.analysis_phase_coarse") if phase == "coarse" else tr("status.analysis_phase_fine")
+        self.analysis_status[video_num] = tr(
+            "status.analysis_progress", video=video_num, phase=phase_text, percent=percent
+        )
+        self.update_analysis_label()
+
+    def on_analysis_finished(self, video_num, completed):
+        """预分析结束"""
+        if self.analysis_workers.get(video_num) is not self.sender():
+            return  # 已被新任务替换
+
+        self.analysis_workers.pop(video_num, None)
+        if completed:
+            self.analysis_status[video_num] = tr("status.analysis_done", video=video_num)
+        else:
+            self.analysis_status.pop(video_num, None)
+        self.update_analysis_label()
+
+    def update_analysis_label(self):
+        """刷新状态栏中的预分析进度"""
+        if hasattr(self, 'analysis_label'):
+            self.analysis_label.setText(
+                " | ".join(self.analysis_status[num] for num in sorted(self.analysis_status))
+            )
 
-                    if (start_landmark.visibility > 0.5 and end_landmark.visibility > 0.5):
-                        start_point = (
-                            int(start_landmark.x * width),
-                            int(start_landmark.y * height)
-                        )
-                        end_point = (
-                            int(end_landmark.x * width),
-                            int(end_landmark.y * height)
-                        )
+    def reset_pose_tracking(self, stream, forget_people=False):
+        """
+        重置指定流的姿态跟踪状态
 
-                        # 绘制连接线
-                        cv2.line(image, start_point, end_point,
-                                self.connection_color, self.line_thickness)
+        forget_people 为True时同时清除人物ID和锁定的目标（打开新视频时）
+        """
+        if stream in ("video1", "video2"):
+            self.inference_schedulers[int(stream[-1])].reset()
+        if self.mediapipe_initialized:
+            self.pose_pool.reset(stream, forget_people)
 
-            # 绘制关键点
-            for i, landmark in enumerate(landmarks.landmark):
-                if (landmark.visibility > 0.5 and
-                    self.landmark_visibility.get(i, True)):
+    def target_locked(self, video_num):
+        """视频的播放流是否锁定了目标人物（目标长时间消失后自动解除；不为查询创建引擎）"""
+        if not self.mediapipe_initialized:
+            return False
+        engine = self.pose_pool.peek(f"video{video_num}")
+        return engine is not None and engine.locked_target is not None
+
+    def locked_target_seed(self, video_num):
+        """
+        播放流锁定的目标在当前显示帧上的 (帧序号, 包围框)，没有锁定时为None
+
+        导出引擎据此在自己的检测结果中锁定同一人
+        """
+        if not self.target_locked(video_num):
+            return None
+        box = self.pose_pool.peek(f"video{video_num}").target_box()
+        if box is None:
+            return None
+        return self.displayed_frame_indices.get(video_num, 0), box
+
+    def select_target_at(self, video_num, x, y):
+        """
+        点击播放画面时锁定该位置的人物作为分析目标，点击空白处解除锁定
+
+        锁定后该视频的播放只在目标周围的区域内推理并跟随其ID，锁定期间不读写缓存
+        （预分析缓存保存的是自动选择的人物）；导出时由 locked_target_seed() 把目标交给导出引擎
+        """
+        if not self.mediapipe_initialized or video_num not in self.displayed_frames:
+            return
+        frame, _ = self.displayed_frames[video_num]
+        frame_index = self.displayed_frame_indices.get(video_num, 0)
+        if video_num == 1:
+            rotation, mirror, fps = self.video1_rotation, self.video1_mirror, self.fps1
+        else:
+            rotation, mirror, fps = self.video2_rotation, self.video2_mirror, self.fps2
 
-                    x = int(landmark.x * width)
-                    y = int(landmark.y * height)
+        try:
+            engine = self.pose_pool.get(f"video{video_num}")
+            source_x, source_y = source_point(x, y, rotation, mirror)
+            target_id = engine.select_target(frame, source_x, source_y, frame_timestamp_ms(frame_index, fps))
+        except Exception as e:
+            print(f"锁定目标人物时出错: {e}")
+            return
 
-                    # 绘制关键点
-                    cv2.circle(image, (x, y), self.landmark_size,
-                             self.landmark_color, -1)
+        self.inference_schedulers[video_num].reset()
+        if target_id is None:
+            self.update_status(f"视频{video_num}已解除目标锁定，自动跟随最大的人物")
+        else:
+            self.update_status(f"视频{video_num}已锁定目标人物 #{target_id}")
+
+        # 暂停时立即按新目标重新绘制当前画面
+        playing = self.is_playing1 if video_num == 1 else self.is_playing2
+        if not playing:
+            self.show_video_frame(video_num, self.render_display_frame(frame, video_num))
+
+    def prepare_stream(self, video_num, stream=None):
+        """
+        准备流的推理：按需打开视频的关键点缓存、创建流的引擎并切换到当前档位（在界面线程中调用）
+
+        打开缓存、创建引擎和移除加载失败的模型都会修改共享状态，
+        因此并行处理两个视频之前先在界面线程中完成，工作线程只使用返回的引擎
+
+        Returns:
+            流的引擎，MediaPipe未初始化时为None
+        """
+        if not self.mediapipe_initialized:
+            return None
+        if stream is None:
+            stream = f"video{video_num or 1}"
+        self.get_landmark_cache(video_num)
+        engine = self.pose_pool.get(stream)
+        model_complexity, max_input_size = self.inference_settings(stream)
+        try:
+            engine.configure(model_complexity, max_input_size)
+        except Exception as e:
+            # 引擎保留原模型继续推理；该模型不再被选用，避免每帧重试
+            print(f"切换到{MODEL_NAMES[model_complexity]}模型失败，继续使用当前模型: {e}")
+            self.available_models.discard(model_complexity)
+        return engine
+
+    def detect_pose_landmarks(self, frame, video_num=None, frame_index=None, stream=None, engine=None):
+        """获取帧的姿态关键点，已分析过的帧直接读取缓存
+
+        stream 为使用的Pose实例所属的流，默认按视频编号选择 video1/video2；
+        engine 为 prepare_stream() 准备好的该流的引擎（在工作线程中调用时必须给出），否则在这里准备
+        """
+        cache = None
+        # 播放流锁定了目标人物时，缓存中自动选择的人物可能不是目标
+        if frame_index is not None and not (stream is None and self.target_locked(video_num)):
+            cache = self.get_landmark_cache(video_num)
+
+        if cache is not None and cache.has(frame_index):
+            landmarks, _ = cache.get(frame_index)
+            return landmarks
+
+        # 进行姿态检测（只对上一帧人物周围的区域做颜色转换和推理）
+        if engine is None:
+            engine = self.prepare_stream(video_num, stream)
+        fps = self.fps2 if video_num == 2 else self.fps1
+        timestamp_ms = frame_timestamp_ms(frame_index, fps) if frame_index is not None else None
+        landmarks, world_landmarks = engine.detect(frame, timestamp_ms)
+
+        # 只有与缓存相同模型的结果才写入缓存（播放时自动选择的较轻模型不写入）
+        if cache is not None and engine.model_complexity == self.export_inference_settings()[0]:
+            cache.put(frame_index, landmarks, world_landmarks)
+
+        return landmarks
+
+    def get_pose_style(self):
+        """当前骨架绘制样式的快照（可传给导出子进程），设置未改变时沿用上次的样式"""
+        key = (self.landmark_color, self.connection_color, self.landmark_size,
+               self.line_thickness, self.landmark_shape,
+               tuple(self.landmark_visibility.get(i, True) for i in range(33)))
+        if self.pose_style_key != key:
+            self.pose_style = PoseStyle(
+                landmark_color=self.landmark_color,
+                connection_color=self.connection_color,
+                landmark_size=self.landmark_size,
+                line_thickness=self.line_thickness,
+                landmark_visibility=self.landmark_visibility,
+                landmark_shape=self.landmark_shape
+            )
+            self.pose_style_key = key
+        return self.pose_style
 
+    def draw_custom_landmarks(self, image, landmarks):
+        """绘制自定义关键点（landmarks为 (33, 4) 数组：x, y, z, visibility）"""
+        try:
+            draw_pose_landmarks(image, landmarks, self.get_pose_style())
         except Exception as e:
             print(f"绘制关键点时出错: {e}")
 
@@ -2887,18 +3277,21 @@ class PoseDetectionApp(QMainWindow):
                 target_frame = int(progress * self.total_frames1)
 
                 # 设置视频位置
-                self.cap1.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
                 self.current_frame_pos1 = target_frame
+                # 跳转后画面不连续，重新检测而不是沿用上一位置的跟踪结果
+                self.reset_pose_tracking("video1")
 
-                # 读取并显示当前帧
-                ret, frame = self.cap1.read()
-                if ret:
+                # 读取并显示当前帧（按关键帧索引定位，读取后无需回退）
+                frame = self.frame_reader1.read_at(target_frame)
+                if frame is not None:
                     self.current_frame1 = frame
-                    processed_frame = self.process_pose_detection(frame)
-                    self.display_frame_in_widget(processed_frame, self.video1_widget)
+                    self.show_video_frame(1, self.render_display_frame(frame, 1, target_frame), target_frame)
 
-                    # 回退一帧，因为read()会前进一帧
-                    self.cap1.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
+                # 播放中跳转时，从新位置重新启动后台解码（目标帧已经显示，从下一帧开始）
+                if self.is_playing1:
+                    if frame is not None:
+                        self.current_frame_pos1 = target_frame + 1
+                    self.start_decoder(1)
 
                 # 更新时间显示
                 self.update_time_display1()
@@ -2915,18 +3308,21 @@ class PoseDetectionApp(QMainWindow):
                 target_frame = int(progress * self.total_frames2)
 
                 # 设置视频位置
-                self.cap2.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
                 self.current_frame_pos2 = target_frame
+                # 跳转后画面不连续，重新检测而不是沿用上一位置的跟踪结果
+                self.reset_pose_tracking("video2")
 
-                # 读取并显示当前帧
-                ret, frame = self.cap2.read()
-                if ret:
+                # 读取并显示当前帧（按关键帧索引定位，读取后无需回退）
+                frame = self.frame_reader2.read_at(target_frame)
+                if frame is not None:
                     self.current_frame2 = frame
-                    processed_frame = self.process_pose_detection(frame)
-                    self.display_frame_in_widget(processed_frame, self.video2_widget)
+                    self.show_video_frame(2, self.render_display_frame(frame, 2, target_frame), target_frame)
 
-                    # 回退一帧，因为read()会前进一帧
-                    self.cap2.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
+                # 播放中跳转时，从新位置重新启动后台解码（目标帧已经显示，从下一帧开始）
+                if self.is_playing2:
+                    if frame is not None:
+                        self.current_frame_pos2 = target_frame + 1
+                    self.start_decoder(2)
 
                 # 更新时间显示
                 self.update_time_display2()
@@ -3307,6 +3703,65 @@ class PoseDetectionApp(QMainWindow):
 
         layout.addWidget(shape_group)
 
+        # 推理质量设置（"实时预览"按推理耗时自动选择模型和输入分辨率）
+        quality_group = QGroupBox("推理质量")
+        quality_layout = QVBoxLayout(quality_group)
+
+        playback_profile_layout = QHBoxLayout()
+        playback_profile_layout.addWidget(QLabel("播放:"))
+        self.config_playback_profile_combo = QComboBox()
+        # 只提供模型已在本地的配置
+        self.config_playback_profile_combo.addItems(available_profiles(self.available_models))
+        self.config_playback_profile_combo.setCurrentText(self.playback_profile)
+        self.config_playback_profile_combo.currentTextChanged.connect(self.on_playback_profile_changed)
+        playback_profile_layout.addWidget(self.config_playback_profile_combo)
+        quality_layout.addLayout(playback_profile_layout)
+
+        export_profile_layout = QHBoxLayout()
+        export_profile_layout.addWidget(QLabel("导出:"))
+        self.config_export_profile_combo = QComboBox()
+        self.config_export_profile_combo.addItems(available_profiles(self.available_models))
+        self.config_export_profile_combo.setCurrentText(self.export_profile)
+        self.config_export_profile_combo.currentTextChanged.connect(self.on_export_profile_changed)
+        export_profile_layout.addWidget(self.config_export_profile_combo)
+        quality_layout.addLayout(export_profile_layout)
+
+        backend_layout = QHBoxLayout()
+        backend_layout.addWidget(QLabel("后端:"))
+        self.config_backend_combo = QComboBox()
+        self.config_backend_combo.addItems(list(BACKENDS))
+        self.config_backend_combo.setCurrentText(self.pose_backend)
+        self.config_backend_combo.currentTextChanged.connect(self.on_pose_backend_changed)
+        backend_layout.addWidget(self.config_backend_combo)
+        quality_layout.addLayout(backend_layout)
+
+        if not self.tasks_backend_ready:
+            # 选择tasks后端也只会退回单人的旧版Pose，不提供该选项
+            tasks_item = self.config_backend_combo.model().item(BACKENDS.index("tasks"))
+            tasks_item.setEnabled(False)
+            tasks_item.setToolTip("未找到PoseLandmarker模型文件")
+            missing_label = QLabel(f"未找到 pose_landmarker_*.task 模型文件（{MODEL_DIR}），tasks后端和多人检测不可用")
+            missing_label.setWordWrap(True)
+            missing_label.setStyleSheet("color: #888888;")
+            quality_layout.addWidget(missing_label)
+
+        # 多人检测（需要tasks后端），点击画面中的人物锁定分析目标
+        max_poses_layout = QHBoxLayout()
+        max_poses_layout.addWidget(QLabel("最多人数:"))
+        self.config_max_poses_combo = QComboBox()
+        self.config_max_poses_combo.addItems(["1", "2", "3", "4", "6"])
+        self.config_max_poses_combo.setCurrentText(str(self.max_poses))
+        self.config_max_poses_combo.currentTextChanged.connect(self.on_max_poses_changed)
+        self.config_max_poses_combo.setToolTip("需要tasks后端和PoseLandmarker模型文件")
+        self.config_max_poses_combo.setEnabled(self.multi_person_available())
+        max_poses_layout.addWidget(self.config_max_poses_combo)
+        quality_layout.addLayout(max_poses_layout)
+
+        layout.addWidget(quality_group)
+        self.inference_settings_groups.append(quality_group)
+        # 对话框在导出过程中创建时同样锁定
+        quality_group.setEnabled(not self.export_running)
+
         # 添加弹性空间
         layout.addStretch()
 
@@ -3419,17 +3874,19 @@ class PoseDetectionApp(QMainWindow):
     def on_landmark_checkbox_changed(self, landmark_idx, state):
         """关节点复选框状态改变"""
         self.landmark_visibility[landmark_idx] = (state == Qt.CheckState.Checked.value)
-        # 这里可以添加实时更新视频显示的逻辑
+        self.invalidate_render()
 
     def on_config_thickness_changed(self, value):
         """配置中线条粗细改变"""
         self.line_thickness = value
         self.config_thickness_label.setText(str(value))
+        self.invalidate_render()
 
     def on_config_size_changed(self, value):
         """配置中关节点大小改变"""
         self.landmark_size = value
         self.config_size_label.setText(str(value))
+        self.invalidate_render()
 
     def on_config_shape_changed(self, shape_name):
         """配置中关节点形状改变"""
@@ -3439,6 +3896,88 @@ class PoseDetectionApp(QMainWindow):
             "菱形": "diamond"
         }
         self.landmark_shape = shape_map.get(shape_name, "square")
+        self.invalidate_render()
+
+    def on_playback_profile_changed(self, profile_name):
+        """播放推理质量配置改变，自动切换从该配置的起始档位重新开始"""
+        if profile_name not in QUALITY_PROFILES:
+            return
+        self.playback_profile = profile_name
+        for video_num, controller in self.level_controllers.items():
+            controller.start_level = QUALITY_PROFILES[profile_name]["level"]
+            controller.set_fps(self.fps1 if video_num == 1 else self.fps2)
+        self.update_status(f"播放推理质量: {profile_name}")
+
+    def on_export_profile_changed(self, profile_name):
+        """导出推理质量配置改变，按新模型重新预分析（缓存按模型区分）"""
+        if profile_name not in QUALITY_PROFILES or profile_name == self.export_profile:
+            return
+        self.export_profile = profile_name
+        for video_num in (1, 2):
+            if getattr(self, f'video{video_num}_path', None):
+                self.start_background_analysis(video_num)
+        self.update_status(f"导出推理质量: {profile_name}")
+
+    def on_pose_backend_changed(self, backend):
+        """切换推理后端：重建所有流的引擎，按新后端的缓存重新预分析"""
+        if backend not in BACKENDS or backend == self.pose_backend:
+            return
+        self.pose_backend = backend
+        self.request_engine_rebuild(backend=backend)
+        self.available_models = available_model_complexities(backend)
+        for video_num in (1, 2):
+            self.inference_schedulers[video_num].reset()
+            controller = self.level_controllers[video_num]
+            controller.available = self.available_models
+            controller.set_fps(self.fps1 if video_num == 1 else self.fps2)
+            if getattr(self, f'video{video_num}_path', None):
+                self.start_background_analysis(video_num)
+        if hasattr(self, 'config_playback_profile_combo'):
+            for combo, profile_name in ((self.config_playback_profile_combo, self.playback_profile),
+                                        (self.config_export_profile_combo, self.export_profile)):
+                combo.blockSignals(True)
+                combo.clear()
+                combo.addItems(available_profiles(self.available_models))
+                combo.setCurrentText(profile_name)
+                combo.blockSignals(False)
+            self.config_max_poses_combo.setEnabled(self.multi_person_available())
+        self.update_status(f"推理后端: {backend}")
+
+    def multi_person_available(self):
+        """当前后端能否检测多人（只有找到模型文件的tasks后端支持）"""
+        return self.pose_backend == "tasks" and self.tasks_backend_ready
+
+    def on_max_poses_changed(self, text):
+        """每帧最多检测的人数改变：重建所有流的引擎（锁定的目标随之解除）"""
+        max_poses = int(text)
+        if max_poses == self.max_poses:
+            return
+        self.max_poses = max_poses
+        self.request_engine_rebuild(num_poses=max_poses)
+        self.update_status(f"每帧最多检测 {max_poses} 人")
+
+    def request_engine_rebuild(self, **options):
+        """
+        按新参数重建引擎池中的所有引擎（切换后端或每帧人数时）
+
+        播放时视频2的推理在工作线程中进行，不在设置改变时直接关闭可能正在使用的引擎：
+        播放中只记录新参数，由 render_playback_frames() 在提交下一帧推理之前应用
+        （导出线程使用自己的引擎，且导出期间这些设置被锁定）
+        """
+        self.pending_engine_options.update(options)
+        if not (self.is_playing1 or self.is_playing2):
+            self.apply_pending_engine_options()
+
+    def apply_pending_engine_options(self):
+        """关闭旧引擎，之后按新参数创建（在界面线程中没有推理进行时调用）"""
+        if not self.pending_engine_options:
+            return
+        options, self.pending_engine_options = self.pending_engine_options, {}
+        if self.mediapipe_initialized:
+            self.pose_pool.close_all()
+            self.pose_pool.pose_options.update(options)
+        for video_num in (1, 2):
+            self.inference_schedulers[video_num].reset()
 
     def on_config_landmark_color_changed(self, color_name):
         """配置中关键点颜色改变"""
@@ -3451,6 +3990,7 @@ class PoseDetectionApp(QMainWindow):
             "白色": (255, 255, 255)
         }
         self.landmark_color = color_map.get(color_name, (0, 255, 0))
+        self.invalidate_render()
 
     def on_config_connection_color_changed(self, color_name):
         """配置中连接线颜色改变"""
@@ -3463,6 +4003,7 @@ class PoseDetectionApp(QMainWindow):
             "白色": (255, 255, 255)
         }
         self.connection_color = color_map.get(color_name, (0, 0, 255))
+        self.invalidate_render()
 
     def apply_color_preset(self, preset_name):
         """应用颜色预设"""
@@ -3510,7 +4051,9 @@ class PoseDetectionApp(QMainWindow):
                 "landmark_size": self.landmark_size,
                 "landmark_shape": shape_text,
                 "landmark_color": landmark_color_text,
-                "connection_color": connection_color_text
+                "connection_color": connection_color_text,
+                "playback_profile": self.playback_profile,
+                "export_profile": self.export_profile
             }
 
             self.complete_configs[config_name] = complete_config
@@ -3527,7 +4070,7 @@ class PoseDetectionApp(QMainWindow):
             QMessageBox.information(
                 self.landmark_selector_dialog,
                 "保存成功",
-                f"完整配置 '{config_name}' 已保存\n包含：关节点选择、显示设置、颜色设置"
+                f"完整配置 '{config_name}' 已保存\n包含：关节点选择、显示设置、颜色设置、推理质量"
             )
 
         except Exception as e:
@@ -3566,6 +4109,7 @@ class PoseDetectionApp(QMainWindow):
             # 应用颜色设置
             self.on_config_landmark_color_changed(landmark_color_text)
             self.on_config_connection_color_changed(connection_color_text)
+            self.invalidate_render()
 
             # 更新界面控件
             if hasattr(self, 'landmark_checkboxes'):
@@ -3589,10 +4133,20 @@ class PoseDetectionApp(QMainWindow):
             if hasattr(self, 'config_connection_color_combo'):
                 self.config_connection_color_combo.setCurrentText(connection_color_text)
 
+            # 推理质量配置（旧版本保存的配置中没有时保持当前设置）
+            playback_profile = saved_config.get("playback_profile", self.playback_profile)
+            export_profile = saved_config.get("export_profile", self.export_profile)
+            if hasattr(self, 'config_playback_profile_combo'):
+                self.config_playback_profile_combo.setCurrentText(playback_profile)
+                self.config_export_profile_combo.setCurrentText(export_profile)
+            else:
+                self.on_playback_profile_changed(playback_profile)
+                self.on_export_profile_changed(export_profile)
+
             QMessageBox.information(
                 self.landmark_selector_dialog,
                 "加载成功",
-                f"完整配置 '{config_name}' 已应用\n包含：关节点选择、显示设置、颜色设置"
+                f"完整配置 '{config_name}' 已应用\n包含：关节点选择、显示设置、颜色设置、推理质量"
             )
 
         except Exception as e:
@@ -3886,6 +4440,7 @@ class PoseDetectionApp(QMainWindow):
             # 应用颜色设置
             self.on_config_landmark_color_changed(landmark_color_text)
             self.on_config_connection_color_changed(connection_color_text)
+            self.invalidate_render()
 
             # 如果配置管理器窗口打开，更新界面控件
             if (hasattr(self, 'landmark_selector_dialog') and
@@ -3973,6 +4528,18 @@ class PoseDetectionApp(QMainWindow):
     def closeEvent(self, event):
         """窗口关闭事件"""
         # 清理资源
+        self.stop_background_analysis()
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+            self.export_worker.wait()
+        self.flush_landmark_caches()
+        self.playback_executor.shutdown(wait=True)
+        if self.mediapipe_initialized:
+            self.pose_pool.close_all()
+        if self.decoder1:
+            self.decoder1.stop()
+        if self.decoder2:
+            self.decoder2.stop()
         if self.cap1:
             self.cap1.release()
         if self.cap2:
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+姿态检测引擎 - 按逻辑流管理姿态检测实例
+每个流（视频1、视频2、导出预览）使用独立的跟踪状态，避免交替处理不同视频时反复重新检测；
+导出线程和导出子进程按导出任务的参数创建自己的引擎
+
+支持两种后端：
+- legacy: mp.solutions.pose.Pose（单人）
+- tasks: MediaPipe Tasks PoseLandmarker（VIDEO模式，显式时间戳，支持多人），
+  模型文件为 assets/pose_landmarker_{lite,full,heavy}.task
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set
+
+import cv2
+import mediapipe as mp
+from mediapipe.tasks import python as mp_tasks
+from mediapipe.tasks.python import vision
+
+from landmark_cache import landmarks_to_array
+from person_tracker import Person, PersonTracker
+from quality_profiles import MODEL_NAMES
+from roi_tracker import RoiTracker
+
+# 默认的Pose参数（与应用原有设置一致）
+DEFAULT_POSE_OPTIONS = {
+    "static_image_mode": False,
+    "model_complexity": 1,
+    "smooth_landmarks": True,
+    "min_detection_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+}
+
+# 旧版后端的模型文件目录：full模型随mediapipe发布，lite和heavy首次使用时才下载到这里
+LEGACY_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(mp.__file__)), "modules", "pose_landmark")
+
+# 可选的推理后端
+BACKENDS = ("legacy", "tasks")
+DEFAULT_BACKEND = "legacy"
+
+# PoseLandmarker模型文件所在目录
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# 未给出时间戳时相邻两次推理的时间间隔（毫秒）
+DEFAULT_FRAME_INTERVAL_MS = 33
+
+# Tasks后端跟踪不连续（推理区域改变、跳转、重新检测）时，发送的时间戳额外前进的间隔（毫秒），
+# 使PoseLandmarker的平滑滤波按不连续的帧处理
+DISCONTINUITY_GAP_MS = 1000
+
+
+def tasks_model_path(model_complexity: int) -> str:
+    """模型复杂度对应的PoseLandmarker模型文件路径"""
+    return os.path.join(MODEL_DIR, f"pose_landmarker_{MODEL_NAMES[model_complexity]}.task")
+
+
+def available_tasks_model(model_complexity: int) -> Optional[str]:
+    """优先返回指定复杂度的模型文件，不存在时返回最接近的已有模型，都没有时返回None"""
+    for complexity in sorted(MODEL_NAMES, key=lambda c: abs(c - model_complexity)):
+        path = tasks_model_path(complexity)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def tasks_models_available() -> bool:
+    """是否有任何PoseLandmarker模型文件（没有时tasks后端退回单人的旧版Pose）"""
+    return any(os.path.exists(tasks_model_path(c)) for c in MODEL_NAMES)
+
+
+def legacy_model_path(model_complexity: int) -> str:
+    """模型复杂度对应的旧版Pose模型文件路径"""
+    return os.path.join(LEGACY_MODEL_DIR, f"pose_landmark_{MODEL_NAMES[model_complexity]}.tflite")
+
+
+def available_model_complexities(backend: str = DEFAULT_BACKEND) -> Set[int]:
+    """
+    后端不需要下载就能使用的模型复杂度
+
+    选择tasks后端但没有任何模型文件时按退回的旧版后端计算
+    """
+    if backend == "tasks":
+        available = {c for c in MODEL_NAMES if os.path.exists(tasks_model_path(c))}
+        if available:
+            return available
+    available = {c for c in MODEL_NAMES if os.path.exists(legacy_model_path(c))}
+    # full模型随mediapipe发布，总是可用
+    available.add(DEFAULT_POSE_OPTIONS["model_complexity"])
+    return available
+
+
+class BasePoseEngine(ABC):
+    """
+    单个逻辑流的姿态检测引擎（公共部分：多人ID跟踪、目标区域跟踪、输入缩放和模型切换）
+
+    子类实现 create_model / reset_model / infer（缺少实现时创建引擎就会失败），这些方法在持有锁时调用
+    """
+
+    def __init__(self, roi_tracking: bool = True, max_input_size: Optional[int] = None, **pose_options):
+        """
+        创建引擎
+
+        Args:
+            roi_tracking: detect() 是否只在上一帧人物周围的区域内推理
+            max_input_size: detect() 推理输入的长边上限（像素），None表示不缩小
+            **pose_options: Pose参数（与 mp.solutions.pose.Pose 的参数同名），未指定的使用默认值
+        """
+        self.options = dict(DEFAULT_POSE_OPTIONS)
+        self.options.update(pose_options)
+        self.roi_tracker = RoiTracker() if roi_tracking else None
+        self.person_tracker = PersonTracker()
+        self.max_input_size = max_input_size
+        # 同一引擎同一时间只能处理一帧
+        self.lock = threading.Lock()
+        self.model = self.create_model(self.options)
+
+    @abstractmethod
+    def create_model(self, options: dict):
+        """按参数创建并返回新模型（不修改引擎状态，失败时抛出异常）"""
+
+    def close_model(self):
+        """释放模型"""
+        self.model.close()
+
+    @abstractmethod
+    def reset_model(self):
+        """清除模型的跟踪状态"""
+
+    @abstractmethod
+    def infer(self, rgb_frame, timestamp_ms: Optional[int]) -> List[Person]:
+        """对RGB图像推理，返回检测到的所有人（归一化坐标相对于输入图像）"""
+
+    @property
+    def model_complexity(self) -> int:
+        return self.options["model_complexity"]
+
+    @property
+    def locked_target(self) -> Optional[int]:
+        """用户锁定的目标ID，没有锁定时为None"""
+        tracker = self.person_tracker
+        return tracker.target_id if tracker.locked else None
+
+    def configure(self, model_complexity: int, max_input_size: Optional[int] = None):
+        """
+        切换模型复杂度和推理输入分辨率上限（模型改变时重新创建）
+
+        先创建新模型，成功后才替换并释放旧模型；创建失败（如模型下载失败）时抛出异常，
+        引擎保留原来的模型和参数，仍可继续推理
+        """
+        with self.lock:
+            self.max_input_size = max_input_size
+            if model_complexity == self.options["model_complexity"]:
+                return
+            options = dict(self.options, model_complexity=model_complexity)
+            model = self.create_model(options)
+            self.close_model()
+            self.model, self.options = model, options
+            if self.roi_tracker is not None:
+                self.roi_tracker.reset()
+
+    def detect(self, frame, timestamp_ms: Optional[int] = None):
+        """
+        检测BGR帧中的目标人物
+
+        整帧检测时为所有人分配稳定的ID，返回目标（锁定的人，或自动跟随的最大的一人）；
+        启用区域跟踪时之后只对目标周围的区域做颜色转换和推理，不再每帧检测所有人，
+        关键点映射回整帧坐标；区域内没有找到目标时清除区域，并在同一帧上退回整帧检测
+
+        Args:
+            frame: BGR帧
+            timestamp_ms: 帧的时间戳（毫秒），VIDEO模式的后端按时间戳跟踪
+
+        Returns:
+            (landmarks, world_landmarks)：(33, 4) 数组，未检测到目标时为None
+        """
+        with self.lock:
+            tracker = self.roi_tracker
+            if tracker is None or tracker.roi is None:
+                landmarks, world_landmarks = self.person_tracker.update(self._detect_region(frame, timestamp_ms))
+            else:
+                landmarks, world_landmarks = self.person_tracker.follow(self._detect_region(frame, timestamp_ms))
+                if not tracker.confident(landmarks):
+                    tracker.reset()
+                    self.reset_model()
+                    # 同一帧再次推理，时间戳后移1毫秒以保持递增
+                    retry_timestamp = timestamp_ms + 1 if timestamp_ms is not None else None
+                    landmarks, world_landmarks = self.person_tracker.update(
+                        self._detect_region(frame, retry_timestamp))
+
+            self._update_region(landmarks, frame)
+            return landmarks, world_landmarks
+
+    def select_target(self, frame, x: float, y: float, timestamp_ms: Optional[int] = None) -> Optional[int]:
+        """
+        检测整帧中的所有人并锁定位于 (x, y)（原始帧上的归一化坐标）的人，之后 detect() 跟随该人
+
+        Returns:
+            锁定的ID，该位置没有人时解除锁定并返回None
+        """
+        with self.lock:
+            if self.roi_tracker is not None:
+                self.roi_tracker.reset()
+            self.reset_model()
+            self.person_tracker.update(self._detect_region(frame, timestamp_ms))
+            target_id = self.person_tracker.lock(x, y)
+            self._update_region(self.person_tracker.target_person()[0], frame)
+            return target_id
+
+    def seed_target(self, box):
+        """
+        按包围框 (x0, y0, x1, y1)（原始帧上的归一化坐标）指定目标，用于在另一个流中锁定同一人
+
+        下一帧整帧检测后锁定与该包围框最接近的人，之后 detect() 跟随该人
+        """
+        with self.lock:
+            if self.roi_tracker is not None:
+                self.roi_tracker.reset()
+            self.reset_model()
+            self.person_tracker.seed(box)
+
+    def target_box(self):
+        """目标最近一次出现时的包围框（原始帧上的归一化坐标），没有目标时为None"""
+        with self.lock:
+            return self.person_tracker.target_box()
+
+    def _update_region(self, landmarks, frame):
+        """根据目标的关键点确定下一帧的推理区域"""
+        tracker = self.roi_tracker
+        # 区域改变后上一帧的跟踪结果不再对应新的输入坐标
+        if tracker is not None and tracker.update(landmarks, (frame.shape[1], frame.shape[0])):
+            self.reset_model()
+
+    def detect_poses(self, frame, timestamp_ms: Optional[int] = None) -> List[Person]:
+        """检测整帧中的所有人（不使用推理区域），单人后端最多返回一人"""
+        with self.lock:
+            return self.infer(cv2.cvtColor(self._limit_size(frame), cv2.COLOR_BGR2RGB), timestamp_ms)
+
+    def _detect_region(self, frame, timestamp_ms: Optional[int]) -> List[Person]:
+        """在当前区域（没有区域时为整帧）内推理，返回整帧坐标的检测结果"""
+        tracker = self.roi_tracker
+        region = tracker.crop(frame) if tracker is not None else frame
+        people = self.infer(cv2.cvtColor(self._limit_size(region), cv2.COLOR_BGR2RGB), timestamp_ms)
+        if tracker is not None:
+            frame_size = (frame.shape[1], frame.shape[0])
+            people = [(tracker.to_frame(landmarks, frame_size), world) for landmarks, world in people]
+        return people
+
+    def _limit_size(self, image):
+        """等比缩小到输入上限（不改变归一化坐标，只减少颜色转换和送入模型的数据量）"""
+        if self.max_input_size and max(image.shape[:2]) > self.max_input_size:
+            scale = self.max_input_size / max(image.shape[:2])
+            size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        return image
+
+    def reset(self, forget_people: bool = False):
+        """
+        重置跟踪状态（跳转到不连续的位置后调用）
+
+        Args:
+            forget_people: 同时清除所有人的ID和锁定的目标（打开新视频时使用）；
+                否则保留，跳转距离较近时目标仍能按位置匹配上
+        """
+        with self.lock:
+            if forget_people:
+                self.person_tracker.reset()
+            self.reset_model()
+            if self.roi_tracker is not None:
+                self.roi_tracker.reset()
+
+    def close(self):
+        """释放MediaPipe资源"""
+        with self.lock:
+            self.close_model()
+
+
+class PoseEngine(BasePoseEngine):
+    """旧版后端：mp.solutions.pose.Pose（单人）"""
+
+    def create_model(self, options: dict):
+        return mp.solutions.pose.Pose(**options)
+
+    def reset_model(self):
+        self.model.reset()
+
+    def infer(self, rgb_frame, timestamp_ms: Optional[int]) -> List[Person]:
+        results = self.model.process(rgb_frame)
+        if not results.pose_landmarks:
+            return []
+        return [(landmarks_to_array(results.pose_landmarks), landmarks_to_array(results.pose_world_landmarks))]
+
+    def process(self, rgb_frame):
+        """处理一帧RGB图像，返回MediaPipe结果"""
+        with self.lock:
+            return self.model.process(rgb_frame)
+
+
+class TasksPoseEngine(BasePoseEngine):
+    """
+    Tasks后端：PoseLandmarker
+
+    非静态模式使用VIDEO运行模式并传入显式时间戳。每个引擎只创建一个PoseLandmarker（只在模型参数改变时重建）：
+    时间戳回退（跳转到之前的位置）或跟踪重置时不重新加载模型，而是给发送的时间戳加上偏移量，
+    保持严格递增并跳过一段间隔
+    """
+
+    def __init__(self, roi_tracking: bool = True, max_input_size: Optional[int] = None,
+                 num_poses: int = 1, **pose_options):
+        """
+        Args:
+            num_poses: 每帧最多检测的人数
+            其余参数同 BasePoseEngine
+        """
+        self.num_poses = max(1, num_poses)
+        # 最近一次发送给PoseLandmarker的时间戳、对应的帧时间戳，以及帧时间戳到发送时间戳的偏移量
+        self.last_timestamp = None
+        self.last_frame_timestamp = None
+        self.timestamp_offset = 0
+        # 下一帧与之前的帧不连续
+        self.discontinuous = False
+        super().__init__(roi_tracking, max_input_size, **pose_options)
+
+    def create_model(self, options: dict):
+        model_path = available_tasks_model(options["model_complexity"])
+        if model_path is None:
+            raise FileNotFoundError(f"未找到PoseLandmarker模型文件: {tasks_model_path(options['model_complexity'])}")
+
+        static = options["static_image_mode"]
+        landmarker = vision.PoseLandmarker.create_from_options(vision.PoseLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.IMAGE if static else vision.RunningMode.VIDEO,
+            num_poses=self.num_poses,
+            min_pose_detection_confidence=options["min_detection_confidence"],
+            min_pose_presence_confidence=options["min_detection_confidence"],
+            min_tracking_confidence=options["min_tracking_confidence"],
+        ))
+        return landmarker
+
+    def reset_model(self):
+        # VIDEO模式没有重置接口，重新加载模型又太慢（区域每秒可能改变多次）：
+        # 下一帧的时间戳跳过一段间隔，上一帧的跟踪结果与新输入不对应时，
+        # 模型的跟踪置信度下降后会自动重新检测
+        self.discontinuous = True
+
+    def video_timestamp(self, timestamp_ms: Optional[int]) -> int:
+        """
+        帧时间戳对应的发送给PoseLandmarker的时间戳（严格递增）
+
+        时间戳回退或跟踪被重置时增大偏移量，使发送的时间戳位于上一次之后至少 DISCONTINUITY_GAP_MS
+        """
+        if timestamp_ms is None:
+            timestamp_ms = (0 if self.last_frame_timestamp is None
+                            else self.last_frame_timestamp + DEFAULT_FRAME_INTERVAL_MS)
+        timestamp_ms = int(timestamp_ms)
+
+        sent = timestamp_ms + self.timestamp_offset
+        if self.last_timestamp is not None:
+            backwards = timestamp_ms <= self.last_frame_timestamp
+            minimum = self.last_timestamp + (DISCONTINUITY_GAP_MS if self.discontinuous or backwards else 1)
+            if sent < minimum:
+                self.timestamp_offset += minimum - sent
+                sent = minimum
+
+        self.discontinuous = False
+        self.last_frame_timestamp = timestamp_ms
+        self.last_timestamp = sent
+        return sent
+
+    def infer(self, rgb_frame, timestamp_ms: Optional[int]) -> List[Person]:
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        if self.options["static_image_mode"]:
+            result = self.model.detect(image)
+        else:
+            result = self.model.detect_for_video(image, self.video_timestamp(timestamp_ms))
+
+        world = result.pose_world_landmarks or [None] * len(result.pose_landmarks)
+        return [(landmarks_to_array(landmarks), landmarks_to_array(world_landmarks))
+                for landmarks, world_landmarks in zip(result.pose_landmarks, world)]
+
+
+def create_pose_engine(backend: str = DEFAULT_BACKEND, **options) -> BasePoseEngine:
+    """
+    按后端名称创建引擎
+
+    选择tasks后端但没有任何模型文件时退回旧版后端
+    """
+    model_complexity = options.get("model_complexity", DEFAULT_POSE_OPTIONS["model_complexity"])
+    if backend == "tasks":
+        if available_tasks_model(model_complexity) is not None:
+            return TasksPoseEngine(**options)
+        print(f"未找到PoseLandmarker模型文件 {tasks_model_path(model_complexity)}，使用旧版Pose")
+    options.pop("num_poses", None)
+    return PoseEngine(**options)
+
+
+class PoseEnginePool:
+    """姿态检测引擎池：为每个逻辑流分配独立的引擎"""
+
+    def __init__(self, **pose_options):
+        """
+        初始化引擎池
+
+        Args:
+            **pose_options: 池中所有引擎共用的参数（可包含 backend、num_poses、roi_tracking）
+        """
+        self.pose_options = pose_options
+        self._engines: Dict[str, BasePoseEngine] = {}
+        self._lock = threading.Lock()
+
+    def get(self, stream: str) -> BasePoseEngine:
+        """获取指定流的引擎（首次使用时创建）"""
+        with self._lock:
+            engine = self._engines.get(stream)
+            if engine is None:
+                engine = create_pose_engine(**self.pose_options)
+                self._engines[stream] = engine
+            return engine
+
+    def peek(self, stream: str) -> Optional[BasePoseEngine]:
+        """获取指定流已创建的引擎，尚未创建时返回None（不创建引擎）"""
+        with self._lock:
+            return self._engines.get(stream)
+
+    def reset(self, stream: str, forget_people: bool = False):
+        """重置指定流的跟踪状态（引擎尚未创建时忽略）"""
+        engine = self.peek(stream)
+        if engine is not None:
+            engine.reset(forget_people)
+
+    def streams(self):
+        """已创建引擎的流名称"""
+        with self._lock:
+            return list(self._engines.keys())
+
+    def close_all(self):
+        """释放所有引擎"""
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.close()
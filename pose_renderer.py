@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+姿态绘制 - 与界面无关的帧旋转和骨架绘制函数
+绘制参数保存在可序列化的 PoseStyle 中，导出子进程可以直接使用
+"""
+
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# MediaPipe Pose 的骨架连接（与 mp.solutions.pose.POSE_CONNECTIONS 相同），
+# 在此固定下来，绘制时无需导入MediaPipe
+POSE_CONNECTIONS = frozenset([
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20), (11, 23),
+    (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28), (27, 29),
+    (28, 30), (29, 31), (30, 32), (27, 31), (28, 32),
+])
+
+# 按序号排列的连接线端点数组 (K, 2)
+CONNECTION_ARRAY = np.array(sorted(POSE_CONNECTIONS), dtype=np.int32)
+
+# 关键点数量
+NUM_LANDMARKS = 33
+
+# 关键点可见度阈值
+VISIBILITY_THRESHOLD = 0.5
+
+# 关键点形状（界面和保存的配置中使用中文名称）
+LANDMARK_SHAPES = {"圆形": "circle", "正方形": "square", "菱形": "diamond"}
+
+# 导出分辨率预设：输出帧短边的像素数（横屏和竖屏视频都适用）
+RESOLUTION_PRESETS = {"1080p": 1080, "720p": 720, "480p": 480}
+
+
+def landmark_shape_offsets(shape: str, size: int) -> Optional[np.ndarray]:
+    """正方形/菱形关键点相对中心的顶点偏移 (4, 2)，圆形返回None"""
+    if shape == "square":
+        return np.array([(-size, -size), (size, -size), (size, size), (-size, size)], dtype=np.int32)
+    elif shape == "diamond":
+        return np.array([(0, -size), (size, 0), (0, size), (-size, 0)], dtype=np.int32)
+    return None
+
+
+class PoseStyle:
+    """骨架绘制样式（创建时预先计算启用的关键点掩码和连接线数组）"""
+
+    def __init__(self, landmark_color: Tuple[int, int, int] = (0, 255, 0),
+                 connection_color: Tuple[int, int, int] = (0, 0, 255),
+                 landmark_size: int = 8, line_thickness: int = 2,
+                 landmark_visibility: Optional[Dict[int, bool]] = None,
+                 landmark_shape: str = "circle"):
+        """
+        Args:
+            landmark_color: 关键点颜色（BGR）
+            connection_color: 连接线颜色（BGR）
+            landmark_size: 关键点半径
+            line_thickness: 连接线粗细
+            landmark_visibility: 关键点序号 -> 是否显示，未列出的默认显示
+            landmark_shape: 关键点形状（circle/square/diamond，也接受中文名称）
+        """
+        self.landmark_color = tuple(landmark_color)
+        self.connection_color = tuple(connection_color)
+        self.landmark_size = landmark_size
+        self.line_thickness = line_thickness
+        self.landmark_visibility = dict(landmark_visibility or {})
+        self.landmark_shape = LANDMARK_SHAPES.get(landmark_shape, landmark_shape)
+
+        self.enabled = np.array([self.landmark_visibility.get(i, True) for i in range(NUM_LANDMARKS)])
+        self.connections = CONNECTION_ARRAY[self.enabled[CONNECTION_ARRAY].all(axis=1)]
+        self.shape_offsets = landmark_shape_offsets(self.landmark_shape, landmark_size)
+
+
+def rotate_frame(frame: np.ndarray, rotation: int) -> np.ndarray:
+    """按90度为单位顺时针旋转帧（rotation为0-3）"""
+    if rotation == 1:
+        return cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+    elif rotation == 2:
+        return cv2.rotate(frame, cv2.ROTATE_180)
+    elif rotation == 3:
+        return cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return frame
+
+
+def orient_frame(frame: np.ndarray, rotation: int, mirror: bool = False,
+                 size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """
+    先顺时针旋转（rotation为0-3）再按需水平镜像；不需要变换时返回原帧
+
+    指定输出尺寸 size (宽, 高) 时，先在旋转前的方向上一次缩放（INTER_AREA），
+    旋转和镜像只处理缩小后的帧
+    """
+    if size is not None:
+        scaled_size = oriented_size(size[0], size[1], rotation)
+        if (frame.shape[1], frame.shape[0]) != scaled_size:
+            frame = cv2.resize(frame, scaled_size, interpolation=cv2.INTER_AREA)
+    frame = rotate_frame(frame, rotation)
+    if mirror:
+        frame = cv2.flip(frame, 1)
+    return frame
+
+
+def oriented_size(width: int, height: int, rotation: int):
+    """旋转后的帧尺寸 (宽, 高)，90度和270度旋转会交换宽高"""
+    return (height, width) if rotation in (1, 3) else (width, height)
+
+
+def output_frame_size(width: int, height: int, rotation: int,
+                      short_side: Optional[int] = None) -> Tuple[int, int]:
+    """
+    导出帧尺寸 (宽, 高)：旋转后按短边像素数等比缩小
+
+    short_side为None或不小于原始短边时保持原始分辨率（不放大）；缩小后宽高取偶数，兼容H.264编码
+    """
+    width, height = oriented_size(width, height, rotation)
+    if not short_side or min(width, height) <= short_side:
+        return width, height
+    scale = short_side / min(width, height)
+    return max(2, round(width * scale / 2) * 2), max(2, round(height * scale / 2) * 2)
+
+
+def orient_landmarks(landmarks: Optional[np.ndarray], rotation: int, mirror: bool = False) -> Optional[np.ndarray]:
+    """
+    将原始帧上的归一化关键点变换到 orient_frame() 之后的帧上
+
+    Args:
+        landmarks: (n, 4) 数组（x, y, z, visibility）
+        rotation: 顺时针旋转级数（0-3，每级90度）
+        mirror: 旋转后是否水平镜像
+    """
+    if landmarks is None or (rotation == 0 and not mirror):
+        return landmarks
+
+    oriented = landmarks.copy()
+    x, y = landmarks[:, 0], landmarks[:, 1]
+    if rotation == 1:
+        oriented[:, 0], oriented[:, 1] = 1.0 - y, x
+    elif rotation == 2:
+        oriented[:, 0], oriented[:, 1] = 1.0 - x, 1.0 - y
+    elif rotation == 3:
+        oriented[:, 0], oriented[:, 1] = y, 1.0 - x
+    if mirror:
+        oriented[:, 0] = 1.0 - oriented[:, 0]
+    return oriented
+
+
+def source_point(x: float, y: float, rotation: int, mirror: bool = False) -> Tuple[float, float]:
+    """orient_landmarks() 的逆变换：orient_frame() 之后的帧上的归一化坐标对应的原始帧坐标"""
+    if mirror:
+        x = 1.0 - x
+    point = orient_landmarks(np.array([[x, y, 0.0, 1.0]]), (4 - rotation) % 4)
+    return float(point[0, 0]), float(point[0, 1])
+
+
+def visible_pose_elements(landmarks: np.ndarray, width: int, height: int, style: PoseStyle):
+    """
+    计算要绘制的骨架元素
+
+    Returns:
+        (points, visible, connections)：(n, 2) 浮点像素坐标、(n,) 可见掩码、
+        两端都可见的连接线端点序号 (m, 2)
+    """
+    count = min(len(landmarks), NUM_LANDMARKS)
+    landmarks = landmarks[:count]
+
+    points = landmarks[:, :2] * (width, height)
+    visible = (landmarks[:, 3] > VISIBILITY_THRESHOLD) & style.enabled[:count]
+
+    connections = style.connections
+    if count < NUM_LANDMARKS:
+        connections = connections[(connections < count).all(axis=1)]
+    connections = connections[visible[connections].all(axis=1)]
+    return points, visible, connections
+
+
+def draw_pose_landmarks(image: np.ndarray, landmarks: Optional[np.ndarray], style: PoseStyle):
+    """
+    在图像上就地绘制骨架
+
+    Args:
+        image: BGR图像
+        landmarks: (33, 4) 数组（x, y, z, visibility），坐标为归一化值
+        style: 绘制样式
+    """
+    if landmarks is None:
+        return
+
+    height, width = image.shape[:2]
+    points, visible, connections = visible_pose_elements(landmarks, width, height, style)
+    points = points.astype(np.int32)
+
+    # 绘制连接线（两端都可见的连接一次性绘制）
+    if len(connections):
+        cv2.polylines(image, points[connections], False, style.connection_color, style.line_thickness)
+
+    # 绘制关键点
+    centers = points[visible]
+    if style.shape_offsets is None:
+        for x, y in centers.tolist():
+            cv2.circle(image, (x, y), style.landmark_size, style.landmark_color, -1)
+    else:
+        for polygon in centers[:, np.newaxis, :] + style.shape_offsets:
+            cv2.fillConvexPoly(image, polygon, style.landmark_color)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推理质量配置 - 模型复杂度（lite/full/heavy）和推理输入分辨率上限
+播放使用"实时预览"配置时，按实测推理耗时与视频帧率在各档位之间自动切换；
+导出可以固定使用最精确的档位。模型文件不存在的档位（需要运行时下载）不会被选用
+"""
+
+from typing import Collection, List, Optional, Tuple
+
+# MediaPipe Pose 的 model_complexity 对应的模型
+MODEL_NAMES = {0: "lite", 1: "full", 2: "heavy"}
+
+# 推理档位：从精确到快速排列的 (模型复杂度, 推理输入长边上限)，None表示不限制
+INFERENCE_LEVELS = [(2, None), (1, None), (1, 1280), (0, 960), (0, 640)]
+
+# 质量配置（界面和保存的配置中使用中文名称）：
+# auto为True时播放按推理耗时在档位间切换，level为固定档位或自动切换的起始档位
+QUALITY_PROFILES = {
+    "实时预览": {"auto": True, "level": 1},
+    "均衡": {"auto": False, "level": 2},
+    "标准": {"auto": False, "level": 1},
+    "精确导出": {"auto": False, "level": 0},
+}
+
+DEFAULT_PLAYBACK_PROFILE = "实时预览"
+# 导出和预分析默认使用随MediaPipe发布的full模型，不需要下载
+DEFAULT_EXPORT_PROFILE = "标准"
+
+
+def level_available(level: int, available: Optional[Collection[int]] = None) -> bool:
+    """档位的模型是否可用（available 为不需要下载就能使用的模型复杂度，None表示全部可用）"""
+    return available is None or INFERENCE_LEVELS[level][0] in available
+
+
+def nearest_level(level: int, available: Optional[Collection[int]] = None) -> int:
+    """模型可用的最接近的档位（距离相同时取更快的档位），没有可用档位时原样返回"""
+    usable = [i for i in range(len(INFERENCE_LEVELS)) if level_available(i, available)]
+    if not usable:
+        return level
+    return min(usable, key=lambda i: (abs(i - level), -i))
+
+
+def profile_settings(profile_name: str, default: str = DEFAULT_EXPORT_PROFILE,
+                     available: Optional[Collection[int]] = None) -> Tuple[int, Optional[int]]:
+    """
+    配置的固定档位 (模型复杂度, 推理输入长边上限)
+
+    未知的配置名使用默认配置；配置的模型不可用时使用最接近的可用档位
+    """
+    profile = QUALITY_PROFILES.get(profile_name, QUALITY_PROFILES[default])
+    return INFERENCE_LEVELS[nearest_level(profile["level"], available)]
+
+
+def available_profiles(available: Optional[Collection[int]] = None) -> List[str]:
+    """可以选择的配置：自动切换的配置，以及固定档位的模型可用的配置"""
+    return [name for name, profile in QUALITY_PROFILES.items()
+            if profile["auto"] or level_available(profile["level"], available)]
+
+
+class LevelController:
+    """按实测推理耗时在推理档位之间自动切换"""
+
+    def __init__(self, level: int = 1, fps: float = 30.0, frame_budget: float = 0.7,
+                 upgrade_ratio: float = 0.35, patience: int = 15, smoothing: float = 0.2,
+                 available: Optional[Collection[int]] = None):
+        """
+        Args:
+            level: 起始档位（INFERENCE_LEVELS 的序号）
+            fps: 视频帧率（决定每帧的时间预算）
+            frame_budget: 推理可占用的帧间隔比例
+            upgrade_ratio: 平均耗时低于预算的该比例时尝试更精确的档位
+            patience: 连续多少次推理满足条件后才切换
+            smoothing: 推理耗时指数平均的权重
+            available: 不需要下载就能使用的模型复杂度，只在这些模型的档位之间切换（None表示全部可用）
+        """
+        self.start_level = level
+        self.available = available
+        self.frame_budget = frame_budget
+        self.upgrade_ratio = upgrade_ratio
+        self.patience = patience
+        self.smoothing = smoothing
+        self.set_fps(fps)
+
+    def set_fps(self, fps: float):
+        """设置视频帧率并从起始档位重新开始（加载新视频时调用）"""
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30.0
+        self.level = nearest_level(self.start_level, self.available)
+        # 因为太慢而降级过的档位不再升回，避免在两个档位之间来回切换
+        self.best_level = 0
+        self.latency = None
+        self.streak = 0
+        self.direction = 0
+
+    def neighbor(self, direction: int) -> Optional[int]:
+        """沿方向（1为更快，-1为更精确）的下一个模型可用的档位，没有时返回None"""
+        level = self.level + direction
+        while 0 <= level < len(INFERENCE_LEVELS):
+            if level_available(level, self.available):
+                return level
+            level += direction
+        return None
+
+    @property
+    def settings(self) -> Tuple[int, Optional[int]]:
+        """当前档位的 (模型复杂度, 推理输入长边上限)"""
+        return INFERENCE_LEVELS[self.level]
+
+    def record(self, latency: float) -> bool:
+        """
+        记录一次推理耗时（秒）
+
+        Returns:
+            档位是否改变（改变后耗时统计重新开始）
+        """
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += (latency - self.latency) * self.smoothing
+
+        budget = self.frame_interval * self.frame_budget
+        faster, more_accurate = self.neighbor(1), self.neighbor(-1)
+        if self.latency > budget and faster is not None:
+            direction, target = 1, faster
+        elif (self.latency < budget * self.upgrade_ratio and more_accurate is not None
+              and more_accurate >= self.best_level):
+            direction, target = -1, more_accurate
+        else:
+            self.streak = 0
+            return False
+
+        self.streak = self.streak + 1 if direction == self.direction else 1
+        self.direction = direction
+        if self.streak < self.patience:
+            return False
+
+        if direction > 0:
+            self.best_level = target
+        self.level = target
+        self.latency = None
+        self.streak = 0
+        return True
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运动员区域跟踪 - 根据上一帧的关键点确定下一帧的推理区域
+远处的运动员只占画面很小一部分时，只对其周围的裁剪区域做颜色转换和推理，
+人物在模型输入中更大，检测更准确；置信度下降时退回整帧检测
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from pose_renderer import VISIBILITY_THRESHOLD
+
+# 推理区域 (x0, y0, x1, y1)，像素坐标，右下角不包含
+Roi = Tuple[int, int, int, int]
+
+
+class RoiTracker:
+    """推理区域跟踪器（与MediaPipe无关，只处理坐标）"""
+
+    def __init__(self, padding: float = 1.6, min_size_ratio: float = 0.25,
+                 max_area_ratio: float = 0.6, min_visible_landmarks: int = 8,
+                 min_mean_visibility: float = 0.5):
+        """
+        Args:
+            padding: 区域边长与关键点包围框长边之比
+            min_size_ratio: 区域边长不小于画面短边的比例
+            max_area_ratio: 区域面积超过画面的该比例时直接整帧检测（裁剪收益太小）
+            min_visible_landmarks: 可见关键点少于该数量时认为跟踪丢失
+            min_mean_visibility: 关键点平均可见度低于该值时认为跟踪丢失
+        """
+        self.padding = padding
+        self.min_size_ratio = min_size_ratio
+        self.max_area_ratio = max_area_ratio
+        self.min_visible_landmarks = min_visible_landmarks
+        self.min_mean_visibility = min_mean_visibility
+        self.roi: Optional[Roi] = None
+
+    def reset(self):
+        """清除区域，下一帧整帧检测"""
+        self.roi = None
+
+    def confident(self, landmarks: Optional[np.ndarray]) -> bool:
+        """关键点是否足够可靠，可以用来确定下一帧的区域"""
+        if landmarks is None:
+            return False
+        visibility = landmarks[:, 3]
+        return (int(np.count_nonzero(visibility > VISIBILITY_THRESHOLD)) >= self.min_visible_landmarks
+                and float(visibility.mean()) >= self.min_mean_visibility)
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """当前区域的裁剪视图（不复制），没有区域时返回整帧"""
+        if self.roi is None:
+            return frame
+        x0, y0, x1, y1 = self.roi
+        return frame[y0:y1, x0:x1]
+
+    def to_frame(self, landmarks: Optional[np.ndarray], frame_size: Tuple[int, int]) -> Optional[np.ndarray]:
+        """
+        将裁剪区域内的归一化关键点映射回整帧的归一化坐标
+
+        Args:
+            landmarks: (n, 4) 数组（x, y, z, visibility），z与x的尺度相同，随区域宽度一起缩放
+            frame_size: 整帧尺寸 (宽, 高)
+        """
+        if landmarks is None or self.roi is None:
+            return landmarks
+        width, height = frame_size
+        x0, y0, x1, y1 = self.roi
+        scale_x, scale_y = (x1 - x0) / width, (y1 - y0) / height
+        mapped = landmarks.copy()
+        mapped[:, 0] = landmarks[:, 0] * scale_x + x0 / width
+        mapped[:, 1] = landmarks[:, 1] * scale_y + y0 / height
+        mapped[:, 2] = landmarks[:, 2] * scale_x
+        return mapped
+
+    def update(self, landmarks: Optional[np.ndarray], frame_size: Tuple[int, int]) -> bool:
+        """
+        根据本帧整帧坐标的关键点确定下一帧的区域
+
+        人物仍在当前区域内部且大小合适时保持区域不变，避免跟踪状态因区域频繁移动而失效
+
+        Returns:
+            区域是否改变（调用方需要重置Pose的跟踪状态）
+        """
+        roi = self.fit(landmarks, frame_size) if self.confident(landmarks) else None
+        if roi is not None and self.roi is not None and self.keeps(roi, landmarks, frame_size):
+            return False
+        changed = roi != self.roi
+        self.roi = roi
+        return changed
+
+    def keeps(self, roi: Roi, landmarks: np.ndarray, frame_size: Tuple[int, int]) -> bool:
+        """可见关键点仍位于当前区域内部（留出边距），且新区域没有明显变小时沿用当前区域"""
+        x0, y0, x1, y1 = self.roi
+        side = x1 - x0
+        margin = side * 0.1
+        bx0, by0, bx1, by1 = self.landmark_box(landmarks, frame_size)
+        inside = bx0 >= x0 + margin and by0 >= y0 + margin and bx1 <= x1 - margin and by1 <= y1 - margin
+        return inside and roi[2] - roi[0] >= side * 0.6
+
+    @staticmethod
+    def landmark_box(landmarks: np.ndarray, frame_size: Tuple[int, int]):
+        """可见关键点的像素包围框 (x0, y0, x1, y1)"""
+        width, height = frame_size
+        visible = landmarks[landmarks[:, 3] > VISIBILITY_THRESHOLD]
+        if len(visible) == 0:
+            return None
+        xs, ys = visible[:, 0] * width, visible[:, 1] * height
+        return float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())
+
+    def fit(self, landmarks: np.ndarray, frame_size: Tuple[int, int]) -> Optional[Roi]:
+        """以关键点包围框为中心的正方形区域（超出画面时平移回画面内），区域过大时返回None"""
+        width, height = frame_size
+        box = self.landmark_box(landmarks, frame_size)
+        if box is None:
+            return None
+        bx0, by0, bx1, by1 = box
+
+        side = max(bx1 - bx0, by1 - by0) * self.padding
+        side = int(min(max(side, min(width, height) * self.min_size_ratio), width, height))
+        if side * side > width * height * self.max_area_ratio:
+            return None
+
+        x0 = int(round((bx0 + bx1 - side) / 2))
+        y0 = int(round((by0 + by1 - side) / 2))
+        x0 = min(max(x0, 0), width - side)
+        y0 = min(max(y0, 0), height - side)
+        return x0, y0, x0 + side, y0 + side
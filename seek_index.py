@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键帧索引 - 快速且帧准确的随机读取
+加载视频时在后台线程扫描一次压缩包（不解码）得到关键帧位置并按内容哈希缓存；
+跳转时根据关键帧位置估算重新定位和顺序 grab() 的解码量，选择代价小的方式，读取后不再回退定位；
+读取的帧可放入共享的 FrameCache，重复读取同一帧时不再解码
+"""
+
+import bisect
+import os
+import threading
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from video_pipeline import FrameCache
+
+# 默认索引缓存目录（与应用配置目录一致）
+DEFAULT_INDEX_DIR = os.path.expanduser("~/.pose_detection_app/seek_index")
+
+# 没有关键帧信息时，向前跳转不超过该帧数则直接grab，否则交给OpenCV定位
+MAX_BLIND_GRABS = 30
+
+# OpenCV定位时先退到目标帧之前至少这么多帧处的关键帧，再逐帧解码到目标帧
+OPENCV_SEEK_PREROLL = 16
+
+
+def scan_keyframes(video_path: str) -> Optional[List[int]]:
+    """
+    扫描视频的关键帧序号
+
+    以原始数据模式读取视频流的压缩包，只检查关键帧标记而不解码，
+    长视频也能很快完成。当前OpenCV后端不支持时返回None。
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened() or not cap.set(cv2.CAP_PROP_FORMAT, -1):
+            return None
+
+        keyframes = []
+        packet_index = 0
+        while cap.grab():
+            if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keyframes.append(packet_index)
+            packet_index += 1
+
+        # 第0帧总能直接定位
+        if not keyframes or keyframes[0] != 0:
+            keyframes.insert(0, 0)
+        return keyframes
+
+    except Exception as e:
+        print(f"扫描关键帧时出错: {e}")
+        return None
+    finally:
+        cap.release()
+
+
+class SeekIndex:
+    """单个视频的关键帧索引"""
+
+    def __init__(self, keyframes: Optional[List[int]]):
+        """
+        Args:
+            keyframes: 升序的关键帧序号列表，None表示没有关键帧信息
+        """
+        self.keyframes = list(keyframes) if keyframes else None
+
+    @classmethod
+    def for_video(cls, video_path: str, video_hash: Optional[str] = None,
+                  cache_dir: Optional[str] = None) -> "SeekIndex":
+        """读取缓存的索引，没有时扫描视频并写入缓存"""
+        cache_path = None
+        if video_hash:
+            cache_dir = cache_dir or DEFAULT_INDEX_DIR
+            cache_path = os.path.join(cache_dir, f"{video_hash}.keyframes.npy")
+            if os.path.exists(cache_path):
+                try:
+                    return cls(np.load(cache_path).tolist())
+                except (ValueError, OSError) as e:
+                    print(f"读取关键帧索引缓存失败，重新扫描: {e}")
+
+        keyframes = scan_keyframes(video_path)
+        if keyframes is not None and cache_path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                np.save(cache_path, np.asarray(keyframes, dtype=np.int64))
+            except OSError as e:
+                print(f"保存关键帧索引缓存失败: {e}")
+        return cls(keyframes)
+
+    def keyframe_before(self, frame_index: int) -> int:
+        """不晚于指定帧的最近关键帧"""
+        if not self.keyframes:
+            return 0
+        i = bisect.bisect_right(self.keyframes, frame_index) - 1
+        return self.keyframes[max(0, i)]
+
+    def seek_landing(self, target: int) -> int:
+        """OpenCV定位到目标帧时实际开始解码的关键帧"""
+        if target <= 0:
+            return 0
+        return self.keyframe_before(max(0, target - OPENCV_SEEK_PREROLL))
+
+    def plan(self, position: int, target: int) -> Optional[int]:
+        """
+        决定读取目标帧时是否需要重新定位
+
+        Args:
+            position: 解码器当前位置（下一次read返回的帧序号）
+            target: 目标帧序号
+
+        Returns:
+            需要定位到的帧序号；None表示从当前位置用grab()顺序前进即可
+        """
+        if self.keyframes is None:
+            if 0 <= target - position <= MAX_BLIND_GRABS:
+                return None
+            return target
+
+        # 重新定位要从落点关键帧解码到目标帧；当前位置在落点之后时顺序前进解码的帧更少
+        if self.seek_landing(target) <= position <= target:
+            return None
+        return target
+
+
+class FrameReader:
+    """按帧序号随机读取视频帧，记录解码位置以避免多余的定位"""
+
+    def __init__(self, cap: cv2.VideoCapture, seek_index: SeekIndex,
+                 frame_cache: Optional[FrameCache] = None):
+        """
+        Args:
+            cap: 用于随机读取的VideoCapture
+            seek_index: 该视频的关键帧索引
+            frame_cache: 已解码帧缓存，命中时不访问解码器（返回的帧为只读）
+        """
+        self.cap = cap
+        self.seek_index = seek_index
+        self.frame_cache = frame_cache
+        self.position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+    def load_index_in_background(self, video_path: str, video_hash: Optional[str] = None,
+                                 cache_dir: Optional[str] = None) -> threading.Thread:
+        """
+        在后台线程中读取或扫描关键帧索引，完成后替换当前索引
+
+        首次打开长视频时扫描压缩包需要一段时间，期间使用没有关键帧信息的索引
+        （近距离向前grab，其余直接按 CAP_PROP_POS_FRAMES 定位），不阻塞界面
+        """
+        def load():
+            self.seek_index = SeekIndex.for_video(video_path, video_hash, cache_dir)
+
+        thread = threading.Thread(target=load, name="SeekIndexLoader", daemon=True)
+        thread.start()
+        return thread
+
+    def read_at(self, frame_index: int) -> Optional[np.ndarray]:
+        """读取指定帧，解码时读取后解码位置停在下一帧"""
+        frame_index = max(0, int(frame_index))
+
+        if self.frame_cache is not None:
+            frame = self.frame_cache.get(frame_index)
+            if frame is not None:
+                return frame
+
+        seek_to = self.seek_index.plan(self.position, frame_index)
+        if seek_to is not None:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, seek_to)
+            self.position = seek_to
+
+        # 跳过的帧只grab不转换为BGR
+        while self.position < frame_index:
+            if not self.cap.grab():
+                return None
+            self.position += 1
+
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.position = frame_index + 1
+
+        if self.frame_cache is not None:
+            self.frame_cache.put(frame_index, frame)
+        return frame
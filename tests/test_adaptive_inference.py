@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+测试自适应推理调度 - 推理间隔选择、关键点外推和不连续时重置
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive_inference import InferenceScheduler
+
+
+def make_landmarks(x):
+    """所有关键点位于同一横坐标的 (33, 4) 数组"""
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, 0] = x
+    landmarks[:, 1] = 0.5
+    landmarks[:, 3] = 1.0
+    return landmarks
+
+
+def run_playback(scheduler, frame_count, latency, speed):
+    """模拟播放：返回推理过的帧序号"""
+    inferred = []
+    for frame_index in range(frame_count):
+        if scheduler.should_infer(frame_index):
+            inferred.append(frame_index)
+            scheduler.record(frame_index, make_landmarks(0.2 + speed * frame_index), latency)
+    return inferred
+
+
+def test_fast_machine_slow_motion():
+    """测试推理足够快但动作很小时也会隔帧推理"""
+    print("测试小动作隔帧推理...")
+
+    scheduler = InferenceScheduler(fps=60.0, max_stride=4)
+    inferred = run_playback(scheduler, 40, latency=0.005, speed=0.0005)
+    assert inferred[:2] == [0, 1], "未知动作幅度时应先逐帧推理"
+    assert scheduler.stride == 4
+    assert len(inferred) < 15, f"推理次数: {len(inferred)}"
+    print(f"✅ 40 帧中推理 {len(inferred)} 次，间隔 {scheduler.stride}")
+
+
+def test_slow_machine_keeps_real_time():
+    """测试推理耗时超过帧间隔时按耗时增大间隔，即使动作很大"""
+    print("\n测试按推理耗时调整间隔...")
+
+    scheduler = InferenceScheduler(fps=60.0, max_stride=4)
+    run_playback(scheduler, 30, latency=0.030, speed=0.05)
+    # 30ms / (16.7ms * 0.7) 向上取整为3
+    assert scheduler.stride == 3, f"间隔: {scheduler.stride}"
+
+    fast = InferenceScheduler(fps=30.0, max_stride=4)
+    run_playback(fast, 30, latency=0.005, speed=0.05)
+    assert fast.stride == 1, "推理快且动作大时应逐帧推理"
+    print("✅ 推理间隔随耗时和动作变化")
+
+
+def test_extrapolation():
+    """测试中间帧由最近两次关键点线性外推"""
+    print("\n测试关键点外推...")
+
+    scheduler = InferenceScheduler()
+    assert scheduler.estimate(0) is None
+    scheduler.record(0, make_landmarks(0.2))
+    assert np.allclose(scheduler.estimate(1)[:, 0], 0.2), "只有一次结果时沿用"
+    scheduler.record(2, make_landmarks(0.3))
+    assert np.allclose(scheduler.estimate(3)[:, 0], 0.35)
+    assert np.allclose(scheduler.estimate(3)[:, 3], 1.0)
+    print("✅ 外推结果正确")
+
+
+def test_reset_on_seek_and_lost_pose():
+    """测试跳转和丢失姿态后重新逐帧推理"""
+    print("\n测试重置...")
+
+    scheduler = InferenceScheduler(fps=60.0)
+    run_playback(scheduler, 20, latency=0.005, speed=0.0)
+    assert scheduler.stride > 1
+
+    assert scheduler.should_infer(100), "跳转后应立即推理"
+    assert scheduler.stride == 1 and scheduler.estimate(100) is None
+
+    run_playback(scheduler, 20, latency=0.005, speed=0.0)
+    scheduler.record(20, None, 0.005)
+    assert scheduler.stride == 1 and scheduler.should_infer(21), "未检测到姿态后应逐帧推理"
+    print("✅ 重置正常")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("自适应推理调度测试")
+    print("=" * 60)
+
+    tests = [
+        test_fast_machine_slow_motion,
+        test_slow_machine_keeps_real_time,
+        test_extrapolation,
+        test_reset_on_seek_and_lost_pose,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
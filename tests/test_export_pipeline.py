@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+测试视频导出管线 - 工作线程中的解码、处理、编码和取消
+"""
+
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_pipeline import (ExportJob, ExportWorker, FrameResampler, ParallelExportWorker, SegmentTask,
+                             export_segment, plan_segments, render_export_frame)
+from landmark_cache import LandmarkCache
+from pose_renderer import PoseStyle
+from watermark import WatermarkCompositor, WatermarkSettings
+
+
+def make_video(path, frame_count=15, size=(64, 48)):
+    """生成测试视频"""
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 30.0, size)
+    for i in range(frame_count):
+        out.write(np.full((size[1], size[0], 3), i * 10, dtype=np.uint8))
+    out.release()
+
+
+def test_export_rotated():
+    """测试导出全部帧并按旋转交换输出尺寸"""
+    print("测试导出线程...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "output.mp4")
+        make_video(source)
+
+        processed = []
+
+        def process_frame(frame, frame_index):
+            processed.append(frame_index)
+            return cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+
+        job = ExportJob(1, source, output, rotation=1)
+        worker = ExportWorker(job, process_frame, finalize=lambda path: path + ".final")
+        progress, finished, stages = [], [], []
+        worker.progress.connect(lambda num, done, total, elapsed: progress.append((done, total)))
+        worker.stage_changed.connect(lambda num, stage: stages.append(stage))
+        worker.export_finished.connect(lambda num, path, elapsed, ok: finished.append((path, ok)))
+        worker.run()
+
+        assert processed == list(range(15)), f"处理的帧: {processed}"
+        assert progress[-1] == (15, 15)
+        assert stages == ["encoding", "audio"]
+        assert finished == [(output + ".final", True)]
+        assert (job.output_width, job.output_height) == (48, 64)
+
+        cap = cv2.VideoCapture(output)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 15
+        assert int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == 48
+        cap.release()
+        print("✅ 导出了 15 帧，输出尺寸 48x64")
+
+
+def test_export_cancel():
+    """测试取消后删除未完成的文件"""
+    print("\n测试取消导出...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "output.mp4")
+        make_video(source)
+
+        job = ExportJob(2, source, output)
+        worker = None
+
+        def process_frame(frame, frame_index):
+            if frame_index == 3:
+                worker.cancel()
+            return frame
+
+        worker = ExportWorker(job, process_frame)
+        finished = []
+        worker.export_finished.connect(lambda num, path, elapsed, ok: finished.append(ok))
+        worker.run()
+
+        assert finished == [False]
+        assert not os.path.exists(output), "取消后应删除未完成的文件"
+        print("✅ 取消导出正常")
+
+
+def test_segment_output_resolution():
+    """测试分段按输出分辨率缩放后绘制和编码"""
+    print("\n测试输出分辨率导出...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "segment.mp4")
+        make_video(source, frame_count=10, size=(128, 96))
+
+        task = SegmentTask(
+            0, source, output, warmup_start=0, start=0, end=10, fps=30.0,
+            output_size=(48, 64), rotation=1, mirror=False,
+            pose_options=None, pose_style=PoseStyle(),
+            watermark_settings=WatermarkSettings(enabled=False)
+        )
+        assert export_segment(task) == 10
+
+        cap = cv2.VideoCapture(output)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == 48
+        assert int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == 64
+        cap.release()
+        print("✅ 128x96 旋转并缩小为 48x64")
+
+
+def test_frame_resampler():
+    """测试按时间戳选帧（包括非整数比例和不插帧）"""
+    print("\n测试帧率重采样...")
+
+    half = FrameResampler(30.0, 15.0)
+    assert [i for i in range(10) if half.keeps(i)] == [0, 2, 4, 6, 8]
+
+    ntsc = FrameResampler(60000 / 1001, 25.0)
+    kept = [i for i in range(5994) if ntsc.keeps(i)]
+    assert len(kept) == ntsc.kept_count(0, 5994) == 2500, f"保留帧数: {len(kept)}"
+    gaps = set(b - a for a, b in zip(kept, kept[1:]))
+    assert gaps == {2, 3}, f"选帧间隔: {gaps}"
+
+    upsample = FrameResampler(25.0, 30.0)
+    assert upsample.keeps_all and upsample.output_fps == 25.0
+    assert upsample.kept_count(0, 10) == 10
+    print(f"✅ 59.94→25 保留 {len(kept)} 帧，间隔 {sorted(gaps)}")
+
+
+def test_export_decimated():
+    """测试降帧率导出只处理和编码保留的帧"""
+    print("\n测试降帧率导出...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "output.mp4")
+        make_video(source)
+
+        processed = []
+
+        def process_frame(frame, frame_index):
+            processed.append(frame_index)
+            return frame
+
+        job = ExportJob(1, source, output, output_fps=15.0)
+        ExportWorker(job, process_frame).run()
+
+        assert processed == list(range(0, 15, 2)), f"处理的帧: {processed}"
+        assert job.total_frames == 8
+
+        cap = cv2.VideoCapture(output)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 8
+        assert abs(cap.get(cv2.CAP_PROP_FPS) - 15.0) < 0.1
+        cap.release()
+        print("✅ 30→15 FPS 只处理并编码了 8 帧")
+
+
+def test_render_export_frame_from_job_snapshot():
+    """测试导出帧只使用任务中的设置快照，且不修改只读的缓存帧"""
+    print("\n测试导出帧合成...")
+
+    style = PoseStyle(landmark_color=(0, 0, 255))
+    job = ExportJob(1, "source.mp4", "output.mp4", rotation=1, pose_style=style)
+    assert job.pose_style is style and not job.watermark_settings.enabled
+
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    frame.setflags(write=False)
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, :2] = 0.5
+    landmarks[:, 3] = 1.0
+
+    rendered = render_export_frame(frame, landmarks, job.rotation, job.mirror, (48, 64),
+                                   job.pose_style, WatermarkCompositor(job.watermark_settings))
+    assert rendered.shape == (64, 48, 3)
+    assert rendered[:, :, 2].max() == 255, "应按快照中的样式绘制骨架"
+    assert frame.max() == 0, "不应修改原始帧"
+
+    unrotated = render_export_frame(frame, None, 0, False, None, job.pose_style,
+                                    WatermarkCompositor(job.watermark_settings))
+    assert unrotated.flags.writeable
+    print("✅ 按任务快照合成导出帧")
+
+
+def test_export_from_job_cache():
+    """测试未指定帧处理函数时按任务中的缓存和样式渲染，已缓存的帧不创建引擎"""
+    print("\n测试按任务缓存导出...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "output.mp4")
+        make_video(source, frame_count=10)
+
+        cache = LandmarkCache.for_video("job_cache", 10, cache_dir=temp_dir)
+        landmarks = np.zeros((33, 4), dtype=np.float32)
+        landmarks[:, :2] = 0.5
+        landmarks[:, 3] = 1.0
+        for i in range(10):
+            cache.put(i, landmarks)
+
+        # 无效的Pose参数：一旦尝试创建引擎就会失败
+        job = ExportJob(1, source, output, pose_style=PoseStyle(landmark_color=(0, 0, 255)),
+                        cache=cache, pose_options={"invalid_option": True})
+        worker = ExportWorker(job, preview_interval=0.0)
+        previews, finished = [], []
+        worker.preview.connect(lambda num, frame: previews.append(frame))
+        worker.export_finished.connect(lambda num, path, elapsed, ok: finished.append(ok))
+        worker.run()
+
+        assert finished == [True]
+        assert len(previews) == 10 and all(frame[:, :, 2].max() == 255 for frame in previews), \
+            "应按任务中的样式绘制缓存的关键点"
+        assert worker.landmarks.engine is None
+        print("✅ 10 帧全部从任务缓存渲染")
+
+
+def test_plan_segments():
+    """测试分段覆盖全部帧且每段带预热帧"""
+    print("\n测试分段规划...")
+
+    segments = plan_segments(100, 3, warmup_frames=5)
+    assert segments == [(0, 0, 33), (28, 33, 66), (61, 66, 100)], f"分段: {segments}"
+    assert plan_segments(2, 4, warmup_frames=5) == [(0, 0, 1), (0, 1, 2)]
+    print(f"✅ 分段: {segments}")
+
+
+def test_parallel_export():
+    """测试多进程分段导出后拼接的帧数和顺序"""
+    print("\n测试并行分段导出...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "parallel.mp4")
+        make_video(source, frame_count=24)
+
+        job = ExportJob(1, source, output)
+        worker = ParallelExportWorker(
+            job, 2,
+            pose_options=None,  # 不做姿态检测，只验证分段和拼接
+            pose_style=PoseStyle(),
+            watermark_settings=WatermarkSettings(enabled=False)
+        )
+        finished = []
+        worker.export_finished.connect(lambda num, path, elapsed, ok: finished.append(ok))
+        worker.run()
+        assert finished == [True]
+
+        cap = cv2.VideoCapture(output)
+        brightness = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            brightness.append(int(frame.mean()))
+        cap.release()
+
+        assert len(brightness) == 24, f"拼接后帧数: {len(brightness)}"
+        assert brightness == sorted(brightness), "分段拼接后帧顺序应保持不变"
+        assert not [name for name in os.listdir(temp_dir) if name.startswith(".segments_")], "临时分段应被删除"
+        print("✅ 两个进程导出 24 帧，拼接顺序正确")
+
+
+def test_segment_render_only_from_cache():
+    """测试整段关键点已缓存时只渲染不推理（不创建Pose实例，不读取预热帧）"""
+    print("\n测试缓存渲染导出...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "segment.mp4")
+        make_video(source, frame_count=20)
+
+        cache = LandmarkCache.for_video("render_only", 20, cache_dir=temp_dir)
+        landmarks = np.zeros((33, 4), dtype=np.float32)
+        landmarks[:, :2] = 0.5
+        landmarks[:, 3] = 1.0
+        for i in range(5, 20):
+            cache.put(i, landmarks)
+        cache.flush()
+        assert cache.covers(5, 20) and not cache.covers(0, 20)
+        assert cache.covers(0, 20, keeps=lambda i: i >= 5), "只检查会输出的帧"
+
+        # 无效的Pose参数：一旦尝试创建Pose实例就会失败
+        task = SegmentTask(
+            0, source, output, warmup_start=2, start=5, end=20, fps=30.0,
+            output_size=(64, 48), rotation=0, mirror=False,
+            pose_options={"invalid_option": True}, pose_style=PoseStyle(),
+            watermark_settings=WatermarkSettings(enabled=False),
+            cache_base_path=cache.base_path, cache_frame_count=20
+        )
+        assert export_segment(task) == 15
+
+        cap = cv2.VideoCapture(output)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 15
+        cap.release()
+        print("✅ 已缓存的分段只渲染了 15 帧")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("视频导出管线测试")
+    print("=" * 60)
+
+    tests = [
+        test_export_rotated,
+        test_export_cancel,
+        test_frame_resampler,
+        test_export_decimated,
+        test_segment_output_resolution,
+        test_render_export_frame_from_job_snapshot,
+        test_export_from_job_cache,
+        test_plan_segments,
+        test_parallel_export,
+        test_segment_render_only_from_cache,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
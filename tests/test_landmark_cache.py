@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+测试姿态关键点缓存 - 内容哈希和内存映射存储
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from landmark_cache import LandmarkCache, compute_video_hash, LANDMARK_COUNT
+
+
+def test_video_hash():
+    """测试内容哈希能区分不同文件且结果稳定"""
+    print("测试视频内容哈希...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path_a = os.path.join(temp_dir, "a.bin")
+        path_b = os.path.join(temp_dir, "b.bin")
+        data = np.random.randint(0, 255, 3 * 1024 * 1024, dtype=np.uint8).tobytes()
+        with open(path_a, "wb") as f:
+            f.write(data)
+        with open(path_b, "wb") as f:
+            f.write(data[:-1] + bytes([data[-1] ^ 0xFF]))
+
+        hash_a = compute_video_hash(path_a)
+        assert hash_a == compute_video_hash(path_a), "同一文件的哈希应保持不变"
+        assert hash_a != compute_video_hash(path_b), "不同内容的文件哈希应不同"
+        print(f"✅ 哈希: {hash_a}")
+
+
+def test_cache_roundtrip():
+    """测试写入后重新打开（内存映射）仍能读取"""
+    print("\n测试关键点缓存读写...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        landmarks = np.random.rand(LANDMARK_COUNT, 4).astype(np.float32)
+        world = np.random.rand(LANDMARK_COUNT, 4).astype(np.float32)
+
+        cache = LandmarkCache.for_video("abc123", 10, variant="r0", cache_dir=temp_dir)
+        assert not cache.has(3)
+        cache.put(3, landmarks, world)
+        cache.put(4, None)
+        cache.put(99, landmarks)  # 超出范围的帧应被忽略
+        cache.flush()
+        del cache
+
+        reopened = LandmarkCache.for_video("abc123", 10, variant="r0", cache_dir=temp_dir)
+        assert reopened.has(3) and reopened.has(4) and not reopened.has(5)
+
+        cached_landmarks, cached_world = reopened.get(3)
+        assert np.allclose(cached_landmarks, landmarks)
+        assert np.allclose(cached_world, world)
+        assert reopened.get(4) == (None, None), "未检测到姿态的帧应返回None"
+        assert abs(reopened.coverage() - 0.2) < 1e-6
+        print("✅ 缓存读写正常")
+
+
+def test_cache_shape_mismatch():
+    """测试帧数不匹配时重新创建缓存"""
+    print("\n测试缓存格式校验...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = LandmarkCache.for_video("xyz", 5, cache_dir=temp_dir)
+        cache.put(0, None)
+        cache.flush()
+        del cache
+
+        resized = LandmarkCache.for_video("xyz", 8, cache_dir=temp_dir)
+        assert resized.frame_count == 8
+        assert not resized.has(0), "帧数变化后旧缓存应被丢弃"
+        print("✅ 格式校验正常")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("姿态关键点缓存测试")
+    print("=" * 60)
+
+    tests = [
+        test_video_hash,
+        test_cache_roundtrip,
+        test_cache_shape_mismatch,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -140,6 +140,50 @@ def test_image_processing_performance():
     
     return ops_per_second
 
+def test_pose_backend_comparison(video_path=None, frame_count=60):
+    """
+    对比旧版Pose与Tasks PoseLandmarker后端的推理速度
+
+    Args:
+        video_path: 用于测试的视频（如训练素材），None时使用随机图像
+        frame_count: 测试的帧数
+    """
+    print("\n对比姿态检测后端...")
+
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from pose_engine import BACKENDS, create_pose_engine
+
+    frames = []
+    if video_path:
+        cap = cv2.VideoCapture(video_path)
+        while len(frames) < frame_count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    if not frames:
+        frames = [np.random.randint(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(frame_count)]
+
+    results = {}
+    for backend in BACKENDS:
+        engine = create_pose_engine(backend=backend, roi_tracking=False)
+        try:
+            detected = 0
+            start_time = time.time()
+            for frame_index, frame in enumerate(frames):
+                landmarks, _ = engine.detect(frame, frame_index * 33)
+                detected += landmarks is not None
+            fps = len(frames) / (time.time() - start_time)
+        finally:
+            engine.close()
+        results[backend] = fps
+        print(f"{backend} ({type(engine).__name__}): {fps:.1f} FPS，检测到姿态 {detected}/{len(frames)} 帧")
+
+    return results
+
 def main():
     """主测试函数"""
     print("=" * 60)
@@ -150,6 +194,8 @@ def main():
     pose_fps = test_pose_detection_performance()
     video_fps = test_video_reading_performance()
     image_ops = test_image_processing_performance()
+    import sys
+    test_pose_backend_comparison(sys.argv[1] if len(sys.argv) > 1 else None)
     
     print("\n" + "=" * 60)
     print("性能测试总结:")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+测试多人跟踪 - 稳定ID、自动跟随、点击锁定和区域内跟随
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from person_tracker import PersonTracker, box_iou, keypoint_distance
+
+
+def make_person(center_x, center_y, height, visibility=1.0):
+    """以指定中心和高度（归一化坐标）竖直排列的 (33, 4) 关键点"""
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, 0] = center_x + np.linspace(-height / 4, height / 4, 33)
+    landmarks[:, 1] = center_y + np.linspace(-height / 2, height / 2, 33)
+    landmarks[:, 3] = visibility
+    return landmarks
+
+
+def test_similarity_measures():
+    """测试包围框IoU和关键点距离"""
+    print("测试相似度...")
+
+    assert box_iou((0, 0, 1, 1), (0, 0, 1, 1)) == 1.0
+    assert box_iou((0, 0, 1, 1), (2, 2, 3, 3)) == 0.0
+    assert abs(box_iou((0, 0, 2, 1), (1, 0, 3, 1)) - 1 / 3) < 1e-6
+
+    a, b = make_person(0.5, 0.5, 0.2), make_person(0.52, 0.5, 0.2)
+    assert abs(keypoint_distance(a, b) - 0.02) < 1e-6
+    assert keypoint_distance(a, make_person(0.5, 0.5, 0.2, visibility=0.0)) is None
+    print("✅ IoU和关键点距离正确")
+
+
+def test_stable_ids_when_order_changes():
+    """测试检测结果顺序变化时ID保持不变，目标不在人之间跳动"""
+    print("\n测试稳定ID...")
+
+    tracker = PersonTracker()
+    coach, skier = make_person(0.2, 0.5, 0.3), make_person(0.7, 0.5, 0.5)
+    landmarks, _ = tracker.update([(coach, None), (skier, None)])
+    assert landmarks is skier, "没有锁定时应自动跟随最大的一人"
+    ids = {track.id for track in tracker.tracks}
+    target_id = tracker.target_id
+
+    # 下一帧检测顺序互换，教练变得更大（走近镜头）
+    coach, skier = make_person(0.21, 0.5, 0.6), make_person(0.72, 0.5, 0.5)
+    landmarks, _ = tracker.update([(skier, None), (coach, None)])
+    assert landmarks is skier, "目标不应跳到变大的另一个人"
+    assert tracker.target_id == target_id
+    assert {track.id for track in tracker.tracks} == ids, "两人的ID都应保持不变"
+    print(f"✅ 目标ID {target_id} 保持不变")
+
+
+def test_lock_by_click():
+    """测试按点击位置锁定目标，空白处解除锁定"""
+    print("\n测试点击锁定...")
+
+    tracker = PersonTracker()
+    coach, skier = make_person(0.2, 0.5, 0.3), make_person(0.7, 0.5, 0.5)
+    tracker.update([(coach, None), (skier, None)])
+
+    coach_id = tracker.lock(0.2, 0.5)
+    assert coach_id is not None and tracker.locked
+    landmarks, _ = tracker.update([(make_person(0.22, 0.5, 0.3), None), (skier, None)])
+    assert abs(landmarks[:, 0].mean() - 0.22) < 1e-6, "锁定后应跟随教练"
+
+    assert tracker.lock(0.95, 0.05) is None, "空白处应解除锁定"
+    assert not tracker.locked
+    landmarks, _ = tracker.target_person()
+    assert landmarks is skier
+    print(f"✅ 锁定ID {coach_id}，空白处解除锁定后跟随最大的一人")
+
+
+def test_target_lost_and_expired():
+    """测试目标暂时消失时不跳到别人，超过期限后解除锁定"""
+    print("\n测试目标丢失...")
+
+    tracker = PersonTracker(max_missed=2)
+    coach, skier = make_person(0.2, 0.5, 0.3), make_person(0.7, 0.5, 0.5)
+    tracker.update([(coach, None), (skier, None)])
+    tracker.lock(0.2, 0.5)
+
+    for _ in range(2):
+        assert tracker.update([(skier, None)]) == (None, None), "目标被遮挡时不应跳到别人"
+        assert tracker.locked
+
+    landmarks, _ = tracker.update([(skier, None)])
+    assert landmarks is skier and not tracker.locked, "目标过期后应解除锁定"
+    print("✅ 目标丢失处理正常")
+
+
+def test_follow_in_region():
+    """测试区域内只更新目标，取与目标最相似的一人"""
+    print("\n测试区域内跟随...")
+
+    tracker = PersonTracker()
+    skier = make_person(0.5, 0.5, 0.2)
+    tracker.update([(skier, None)])
+    target_id = tracker.target_id
+
+    # 区域边缘露出另一个人的一部分（更大，但与目标不重叠）
+    other = make_person(0.8, 0.5, 0.4)
+    moved = make_person(0.51, 0.5, 0.2)
+    landmarks, _ = tracker.follow([(other, None), (moved, None)])
+    assert landmarks is moved and tracker.target_id == target_id
+    assert tracker.follow([(other, None)]) == (None, None), "区域内没有目标时应返回None"
+    print("✅ 区域内跟随目标")
+
+
+def test_seed_by_box():
+    """测试按另一个检测流中目标的包围框锁定同一人（即使他不是最大的一人）"""
+    print("\n测试按包围框锁定...")
+
+    tracker = PersonTracker()
+    coach, skier = make_person(0.2, 0.5, 0.3), make_person(0.7, 0.5, 0.5)
+    tracker.update([(coach, None), (skier, None)])
+    assert tracker.target_person()[0] is skier
+
+    seed = PersonTracker()
+    seed.update([(make_person(0.22, 0.5, 0.3), None)])
+    tracker.seed(seed.target_box())
+    assert not tracker.locked
+
+    coach = make_person(0.21, 0.5, 0.3)
+    landmarks, _ = tracker.update([(skier, None), (coach, None)])
+    assert landmarks is coach and tracker.locked, "应锁定与包围框最接近的教练"
+    assert tracker.seed_box is None
+
+    # 包围框与任何人都不重叠时取中心最近的人
+    tracker.seed((0.85, 0.1, 0.95, 0.2))
+    landmarks, _ = tracker.update([(skier, None), (coach, None)])
+    assert landmarks is skier
+    print(f"✅ 按包围框锁定ID {tracker.target_id}")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("多人跟踪测试")
+    print("=" * 60)
+
+    tests = [
+        test_similarity_measures,
+        test_stable_ids_when_order_changes,
+        test_lock_by_click,
+        test_target_lost_and_expired,
+        test_follow_in_region,
+        test_seed_by_box,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+测试后台姿态预分析 - 由粗到细的分析顺序和缓存写入
+"""
+
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from landmark_cache import LandmarkCache
+from pose_analysis import coarse_to_fine_passes, PoseAnalysisWorker
+
+
+class FakePose:
+    """记录处理次数的假姿态检测器（不依赖MediaPipe模型）"""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def detect(self, frame, timestamp_ms=None):
+        self.calls.append(frame.shape)
+        return None, None
+
+    def close(self):
+        pass
+
+
+def test_pass_order():
+    """测试粗略阶段先于补全阶段且覆盖全部帧"""
+    print("测试由粗到细的分析顺序...")
+
+    passes = list(coarse_to_fine_passes(25, 10))
+    assert passes[0] == ("coarse", [0, 10, 20])
+    assert passes[1][0] == "fine"
+    assert sorted(passes[0][1] + passes[1][1]) == list(range(25))
+
+    # 间隔为1时只有一个阶段
+    assert [phase for phase, _ in coarse_to_fine_passes(5, 1)] == ["coarse"]
+    print("✅ 分析顺序正确")
+
+
+def test_worker_fills_cache():
+    """测试预分析线程写满缓存并跳过已分析的帧"""
+    print("\n测试预分析写入缓存...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = os.path.join(temp_dir, "analysis.mp4")
+        out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), 30.0, (64, 48))
+        for i in range(20):
+            out.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+        out.release()
+
+        cache = LandmarkCache.for_video("analysis", 20, cache_dir=temp_dir)
+        cache.put(5, None)  # 已分析过的帧不应再次处理
+
+        calls = []
+        worker = PoseAnalysisWorker(
+            1, video_path, cache,
+            pose_factory=lambda static: FakePose(calls),
+            coarse_stride=4
+        )
+        progress = []
+        worker.progress.connect(lambda num, done, total, phase: progress.append((phase, done, total)))
+        worker.run()
+
+        assert cache.coverage() == 1.0, f"缓存覆盖率: {cache.coverage()}"
+        assert len(calls) == 19, f"处理次数: {len(calls)}"
+        assert progress[-1] == ("fine", 15, 15)
+        print(f"✅ 分析了 {len(calls)} 帧，缓存覆盖率 100%")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("后台姿态预分析测试")
+    print("=" * 60)
+
+    tests = [
+        test_pass_order,
+        test_worker_fills_cache,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
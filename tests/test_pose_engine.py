@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+测试姿态检测引擎池 - 每个逻辑流使用独立的Pose实例，旧版与Tasks后端
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pose_engine import (DISCONTINUITY_GAP_MS, BasePoseEngine, PoseEngine, PoseEnginePool, TasksPoseEngine,
+                         available_tasks_model, create_pose_engine)
+
+
+def test_engine_per_stream():
+    """测试不同流获得不同引擎，同一流复用同一引擎"""
+    print("测试按流分配引擎...")
+
+    pool = PoseEnginePool(model_complexity=1)
+    try:
+        video1 = pool.get("video1")
+        video2 = pool.get("video2")
+        assert video1 is pool.get("video1"), "同一流应复用引擎"
+        assert video1 is not video2, "不同流应使用独立引擎"
+        assert sorted(pool.streams()) == ["video1", "video2"]
+        assert pool.peek("video1") is video1
+        assert pool.peek("preview") is None and "preview" not in pool.streams(), "peek不应创建引擎"
+        assert video1.options["model_complexity"] == 1
+        assert video1.options["static_image_mode"] is False
+        print("✅ 引擎分配正确")
+    finally:
+        pool.close_all()
+
+
+def test_process_and_reset():
+    """测试引擎处理帧和重置跟踪状态"""
+    print("\n测试引擎处理与重置...")
+
+    pool = PoseEnginePool()
+    try:
+        blank = np.zeros((120, 160, 3), dtype=np.uint8)
+        results = pool.get("export").process(blank)
+        assert results.pose_landmarks is None, "空白画面不应检测到姿态"
+
+        pool.reset("export")
+        pool.reset("preview")  # 尚未创建的流应被忽略
+        assert "preview" not in pool.streams()
+
+        pool.get("export").process(blank)
+        print("✅ 处理与重置正常")
+    finally:
+        pool.close_all()
+        assert pool.streams() == []
+
+
+def test_backend_selection():
+    """测试按名称选择后端，没有模型文件时tasks退回旧版"""
+    print("\n测试后端选择...")
+
+    engine = create_pose_engine(backend="tasks", num_poses=2)
+    try:
+        if available_tasks_model(1) is None:
+            assert isinstance(engine, PoseEngine), "没有模型文件时应退回旧版后端"
+        else:
+            assert isinstance(engine, TasksPoseEngine) and engine.num_poses == 2
+        print(f"✅ tasks 后端创建为 {type(engine).__name__}")
+    finally:
+        engine.close()
+
+    legacy = create_pose_engine(backend="legacy", num_poses=3)
+    assert isinstance(legacy, PoseEngine)
+    legacy.close()
+
+
+def test_tasks_out_of_order_timestamps():
+    """测试真实PoseLandmarker在时间戳回退（跳转）和重置后继续推理而不报错（需要模型文件）"""
+    print("\n测试Tasks后端时间戳...")
+
+    if available_tasks_model(1) is None:
+        raise unittest.SkipTest("未找到PoseLandmarker模型文件（assets/pose_landmarker_*.task）")
+
+    engine = TasksPoseEngine(num_poses=2)
+    try:
+        blank = np.zeros((120, 160, 3), dtype=np.uint8)
+        assert engine.detect_poses(blank, 0) == []
+        assert engine.detect(blank, 100) == (None, None)
+        assert engine.detect(blank, 50) == (None, None), "时间戳回退后应继续推理"
+        engine.reset()
+        assert engine.detect(blank, 83) == (None, None), "重置后应继续推理"
+        print("✅ 时间戳回退处理正常")
+    finally:
+        engine.close()
+
+
+class StubLandmarker:
+    """记录收到的时间戳的假PoseLandmarker（与真实的VIDEO模式一样拒绝不递增的时间戳）"""
+
+    def __init__(self):
+        self.timestamps = []
+        self.closed = False
+
+    def detect_for_video(self, image, timestamp_ms):
+        if self.timestamps and timestamp_ms <= self.timestamps[-1]:
+            raise ValueError(f"时间戳必须递增: {timestamp_ms} <= {self.timestamps[-1]}")
+        self.timestamps.append(timestamp_ms)
+        return type("Result", (), {"pose_landmarks": [], "pose_world_landmarks": []})()
+
+    def close(self):
+        self.closed = True
+
+
+class StubTasksEngine(TasksPoseEngine):
+    """不需要模型文件的Tasks引擎"""
+
+    def create_model(self, options):
+        self.created = getattr(self, "created", 0) + 1
+        return StubLandmarker()
+
+
+def test_tasks_timestamps_monotonic_without_reload():
+    """测试跳转和重置时发送的时间戳保持递增，且不重新创建PoseLandmarker"""
+    print("\n测试Tasks后端时间戳偏移...")
+
+    engine = StubTasksEngine(num_poses=2)
+    blank = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    engine.detect(blank, 100)
+    engine.detect(blank, 133)
+    engine.detect(blank, 50)      # 向前跳转
+    engine.reset()                # 区域改变等重置跟踪状态
+    engine.detect(blank, 83)
+    engine.detect(blank, None)    # 没有时间戳时按帧间隔递增
+    engine.detect_poses(blank, 149)
+
+    sent = engine.model.timestamps
+    assert sent[:2] == [100, 133], "连续的帧应按原时间戳发送"
+    assert all(b > a for a, b in zip(sent, sent[1:])), f"时间戳应严格递增: {sent}"
+    assert sent[2] - sent[1] >= DISCONTINUITY_GAP_MS, "跳转后应跳过一段间隔"
+    assert sent[3] - sent[2] >= DISCONTINUITY_GAP_MS, "重置后应跳过一段间隔"
+    assert sent[4] - sent[3] == 33 and sent[5] - sent[4] == 33
+    assert engine.created == 1, "跳转和重置不应重新创建PoseLandmarker"
+
+    engine.configure(0)
+    assert engine.created == 2, "模型参数改变时才重新创建"
+    engine.detect(blank, 150)
+    assert engine.model.timestamps[-1] > sent[-1]
+    engine.close()
+    print(f"✅ 发送的时间戳: {sent}")
+
+
+class StubModel:
+    """记录是否已释放的假模型"""
+
+    def __init__(self, model_complexity):
+        self.model_complexity = model_complexity
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def reset(self):
+        pass
+
+
+class StubEngine(BasePoseEngine):
+    """模型复杂度为2时创建失败的假引擎（模拟模型下载失败）"""
+
+    def create_model(self, options):
+        if options["model_complexity"] == 2:
+            raise RuntimeError("模型下载失败")
+        return StubModel(options["model_complexity"])
+
+    def reset_model(self):
+        self.model.reset()
+
+    def infer(self, rgb_frame, timestamp_ms):
+        assert not self.model.closed, "不应使用已释放的模型"
+        return []
+
+
+def test_configure_keeps_model_when_open_fails():
+    """测试切换模型失败时保留原模型和参数，之后仍可推理和再次切换"""
+    print("\n测试模型切换失败...")
+
+    engine = StubEngine(roi_tracking=False)
+    original = engine.model
+    blank = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    try:
+        engine.configure(2, 960)
+        assert False, "创建失败应抛出异常"
+    except RuntimeError:
+        pass
+    assert engine.model is original and not original.closed, "失败时不应释放原模型"
+    assert engine.model_complexity == 1, "失败时不应修改参数"
+    assert engine.detect(blank, 0) == (None, None)
+
+    engine.configure(0)
+    assert engine.model.model_complexity == 0 and original.closed, "成功后才替换并释放旧模型"
+    assert engine.model_complexity == 0
+    engine.close()
+    print("✅ 切换失败时引擎保持可用")
+
+
+def test_missing_override_fails_on_creation():
+    """测试子类缺少接口实现时创建引擎就失败，而不是推理到一半才出错"""
+    print("\n测试引擎接口...")
+
+    class IncompleteEngine(BasePoseEngine):
+        def create_model(self, options):
+            return StubModel(options["model_complexity"])
+
+    try:
+        IncompleteEngine(roi_tracking=False)
+        assert False, "缺少 reset_model/infer 时应无法创建"
+    except TypeError:
+        pass
+    print("✅ 缺少实现时创建失败")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("姿态检测引擎池测试")
+    print("=" * 60)
+
+    tests = [
+        test_engine_per_stream,
+        test_process_and_reset,
+        test_backend_selection,
+        test_tasks_out_of_order_timestamps,
+        test_tasks_timestamps_monotonic_without_reload,
+        test_configure_keeps_model_when_open_fails,
+        test_missing_override_fails_on_creation,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except unittest.SkipTest as e:
+            print(f"⚠️  跳过: {e}")
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
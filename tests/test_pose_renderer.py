@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+测试骨架绘制 - 连接线筛选、可见度、关键点形状和方向变换
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pose_renderer import (PoseStyle, draw_pose_landmarks, orient_frame, orient_landmarks, output_frame_size,
+                           source_point)
+
+
+def make_landmarks(visibility=1.0):
+    """所有关键点排成一行的 (33, 4) 数组"""
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, 0] = np.linspace(0.1, 0.9, 33)
+    landmarks[:, 1] = 0.5
+    landmarks[:, 3] = visibility
+    return landmarks
+
+
+def test_connections_follow_selection():
+    """测试预先计算的连接线只包含两端都启用的连接"""
+    print("测试连接线筛选...")
+
+    style = PoseStyle()
+    assert len(style.connections) == 35
+
+    hidden = {i: i not in (11, 12) for i in range(33)}
+    style = PoseStyle(landmark_visibility=hidden)
+    assert all(11 not in pair and 12 not in pair for pair in style.connections.tolist())
+    print("✅ 连接线筛选正常")
+
+
+def test_invisible_landmarks_not_drawn():
+    """测试可见度低于阈值或未启用的关键点不绘制"""
+    print("\n测试可见度...")
+
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+    draw_pose_landmarks(image, make_landmarks(visibility=0.2), PoseStyle())
+    assert not image.any()
+
+    style = PoseStyle(landmark_visibility={i: False for i in range(33)})
+    draw_pose_landmarks(image, make_landmarks(), style)
+    assert not image.any()
+
+    draw_pose_landmarks(image, make_landmarks(), PoseStyle())
+    assert image.any()
+    print("✅ 可见度处理正常")
+
+
+def test_landmark_shapes():
+    """测试关键点按选择的形状绘制"""
+    print("\n测试关键点形状...")
+
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[0] = (0.5, 0.5, 0.0, 1.0)
+    only_nose = {i: i == 0 for i in range(33)}
+
+    filled = {}
+    for shape in ("circle", "square", "正方形", "diamond"):
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        style = PoseStyle(landmark_size=10, landmark_visibility=only_nose, landmark_shape=shape)
+        draw_pose_landmarks(image, landmarks, style)
+        filled[shape] = int(image[:, :, 1].astype(bool).sum())
+
+    # 正方形面积最大，菱形最小；中文名称与英文名称一致
+    assert filled["diamond"] < filled["circle"] < filled["square"], filled
+    assert filled["square"] == filled["正方形"]
+    print("✅ 关键点形状正常")
+
+
+def test_orient_landmarks_matches_orient_frame():
+    """测试关键点坐标变换与画面旋转/镜像一致"""
+    print("\n测试关键点方向变换...")
+
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[0] = (0.2, 0.3, 0.0, 1.0)
+    only_nose = PoseStyle(landmark_size=3, landmark_visibility={i: i == 0 for i in range(33)})
+
+    source = np.zeros((100, 200, 3), dtype=np.uint8)
+    draw_pose_landmarks(source, landmarks, only_nose)
+
+    for rotation in range(4):
+        for mirror in (False, True):
+            expected = orient_frame(source, rotation, mirror)
+            oriented = np.zeros_like(expected)
+            draw_pose_landmarks(oriented, orient_landmarks(landmarks, rotation, mirror), only_nose)
+
+            expected_center = np.argwhere(expected[:, :, 1]).mean(axis=0)
+            actual_center = np.argwhere(oriented[:, :, 1]).mean(axis=0)
+            assert np.all(np.abs(expected_center - actual_center) <= 1.5), (rotation, mirror)
+
+    assert orient_landmarks(landmarks, 0) is landmarks, "不需要变换时不应复制"
+    print("✅ 关键点方向变换正常")
+
+
+def test_source_point_inverts_orientation():
+    """测试显示画面上的点击位置映射回原始帧坐标"""
+    print("\n测试点击位置逆变换...")
+
+    landmarks = np.array([[0.2, 0.3, 0.0, 1.0]], dtype=np.float32)
+    for rotation in range(4):
+        for mirror in (False, True):
+            x, y = orient_landmarks(landmarks, rotation, mirror)[0, :2]
+            source_x, source_y = source_point(float(x), float(y), rotation, mirror)
+            assert abs(source_x - 0.2) < 1e-6 and abs(source_y - 0.3) < 1e-6, (rotation, mirror)
+    print("✅ 点击位置逆变换正常")
+
+
+def test_output_resolution():
+    """测试按短边缩小的输出尺寸和缩放旋转合并"""
+    print("\n测试输出分辨率...")
+
+    # 4K横屏和竖屏（旋转后）都按短边缩小到1080
+    assert output_frame_size(3840, 2160, 0, 1080) == (1920, 1080)
+    assert output_frame_size(3840, 2160, 1, 1080) == (1080, 1920)
+    assert output_frame_size(3840, 2160, 0, 480) == (854, 480)
+    # 不放大，未指定时保持原始分辨率
+    assert output_frame_size(1280, 720, 0, 1080) == (1280, 720)
+    assert output_frame_size(1280, 720, 3) == (720, 1280)
+
+    source = np.zeros((200, 400, 3), dtype=np.uint8)
+    source[:, :200] = 255  # 左半边为白色
+    resized = orient_frame(source, 1, False, (50, 100))
+    assert resized.shape == (100, 50, 3), resized.shape
+    # 顺时针旋转后原来的左半边在上方
+    assert resized[:45].min() == 255 and resized[55:].max() == 0
+    assert orient_frame(source, 0, False, (400, 200)) is source, "尺寸相同时不应缩放"
+    print("✅ 输出分辨率正常")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("骨架绘制测试")
+    print("=" * 60)
+
+    tests = [
+        test_connections_follow_selection,
+        test_invisible_landmarks_not_drawn,
+        test_landmark_shapes,
+        test_orient_landmarks_matches_orient_frame,
+        test_source_point_inverts_orientation,
+        test_output_resolution,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+测试推理质量配置 - 固定档位和按推理耗时自动切换
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quality_profiles import INFERENCE_LEVELS, LevelController, available_profiles, profile_settings
+
+
+def test_profile_settings():
+    """测试固定档位和未知配置名"""
+    print("测试配置档位...")
+
+    assert profile_settings("精确导出") == (2, None), "精确导出应固定使用heavy模型"
+    assert profile_settings("均衡") == (1, 1280)
+    assert profile_settings("不存在的配置") == (1, None), "默认使用随mediapipe发布的full模型"
+    print("✅ 配置档位正确")
+
+
+def test_unavailable_models_not_selected():
+    """测试只有full模型时不选用需要下载的heavy/lite模型"""
+    print("\n测试模型可用性...")
+
+    only_full = {1}
+    assert profile_settings("精确导出", available=only_full) == (1, None), "heavy不可用时退回full"
+    assert available_profiles(only_full) == ["实时预览", "均衡", "标准"]
+
+    controller = LevelController(level=1, fps=60.0, patience=3, available=only_full)
+    for _ in range(50):
+        controller.record(0.040)
+    assert controller.settings == (1, 1280), "太慢时也不应切换到需要下载的lite模型"
+
+    for _ in range(50):
+        controller.record(0.001)
+    assert controller.settings[0] == 1, "太快时也不应切换到需要下载的heavy模型"
+
+    # 缺少full之外的档位时跳过不可用的档位
+    controller = LevelController(level=1, fps=60.0, patience=3, available={0, 1})
+    for _ in range(3):
+        controller.record(0.040)
+    assert controller.level == 2
+    print("✅ 只在可用模型的档位之间切换")
+
+
+def test_downgrade_when_slow():
+    """测试推理耗时超过帧预算时逐级切换到更快的档位"""
+    print("\n测试耗时过长时降级...")
+
+    controller = LevelController(level=1, fps=60.0, patience=5)
+    changes = [controller.record(0.040) for _ in range(5)]
+    assert changes == [False] * 4 + [True], "连续超过预算后才切换"
+    assert controller.settings == INFERENCE_LEVELS[2]
+
+    for _ in range(50):
+        controller.record(0.040)
+    assert controller.level == len(INFERENCE_LEVELS) - 1, "持续太慢时降到最快的档位"
+    print(f"✅ 降级到 {controller.settings}")
+
+
+def test_upgrade_when_fast_without_oscillation():
+    """测试推理很快时升级，但不会升回因太慢而离开的档位"""
+    print("\n测试耗时很短时升级...")
+
+    controller = LevelController(level=2, fps=30.0, patience=3)
+    for _ in range(3):
+        controller.record(0.002)
+    assert controller.level == 1
+
+    for _ in range(3):
+        controller.record(0.002)
+    assert controller.level == 0, "推理足够快时可以升到heavy模型"
+
+    # heavy太慢，降级后不再升回
+    for _ in range(3):
+        controller.record(0.050)
+    assert controller.level == 1
+    for _ in range(10):
+        controller.record(0.002)
+    assert controller.level == 1, "因太慢而离开的档位不应再升回"
+
+    controller.set_fps(30.0)
+    assert controller.level == 2, "加载新视频后从起始档位重新开始"
+    print("✅ 升级和防抖正常")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("推理质量配置测试")
+    print("=" * 60)
+
+    tests = [
+        test_profile_settings,
+        test_unavailable_models_not_selected,
+        test_downgrade_when_slow,
+        test_upgrade_when_fast_without_oscillation,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
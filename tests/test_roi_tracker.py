@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+测试运动员区域跟踪 - 区域计算、坐标映射和跟踪丢失
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from roi_tracker import RoiTracker
+
+
+def make_person(center_x, center_y, height, visibility=1.0):
+    """以指定中心和高度（归一化坐标）竖直排列的 (33, 4) 关键点"""
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, 0] = center_x + np.linspace(-height / 4, height / 4, 33)
+    landmarks[:, 1] = center_y + np.linspace(-height / 2, height / 2, 33)
+    landmarks[:, 3] = visibility
+    return landmarks
+
+
+def test_roi_around_small_person():
+    """测试远处的小人物得到包含全部关键点的正方形区域"""
+    print("测试区域计算...")
+
+    tracker = RoiTracker()
+    frame_size = (3840, 2160)
+    assert tracker.update(make_person(0.7, 0.4, 0.1), frame_size), "首次检测到人物应建立区域"
+
+    x0, y0, x1, y1 = tracker.roi
+    assert x1 - x0 == y1 - y0, "区域应为正方形"
+    assert x0 <= 0.7 * 3840 - 0.025 * 3840 and x1 >= 0.7 * 3840 + 0.025 * 3840
+    assert y0 <= 0.35 * 2160 and y1 >= 0.45 * 2160
+    assert (x1 - x0) * (y1 - y0) < 3840 * 2160 * 0.1, f"区域过大: {tracker.roi}"
+
+    frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+    assert tracker.crop(frame).shape[:2] == (y1 - y0, x1 - x0)
+    print(f"✅ 区域 {tracker.roi}")
+
+
+def test_roi_stable_and_follows():
+    """测试人物小幅移动时区域不变，移出边缘时区域跟随"""
+    print("\n测试区域跟随...")
+
+    tracker = RoiTracker()
+    frame_size = (1920, 1080)
+    tracker.update(make_person(0.5, 0.5, 0.2), frame_size)
+    first = tracker.roi
+
+    assert not tracker.update(make_person(0.505, 0.5, 0.2), frame_size), "小幅移动不应改变区域"
+    assert tracker.roi == first
+
+    assert tracker.update(make_person(0.6, 0.5, 0.2), frame_size), "移到边缘后区域应跟随"
+    assert tracker.roi[0] > first[0]
+    print("✅ 区域保持稳定并跟随人物")
+
+
+def test_roi_mapping_roundtrip():
+    """测试裁剪区域内的坐标映射回整帧坐标"""
+    print("\n测试坐标映射...")
+
+    tracker = RoiTracker()
+    frame_size = (2000, 1000)
+    tracker.roi = (1000, 200, 1400, 600)
+
+    local = np.zeros((33, 4), dtype=np.float32)
+    local[0] = (0.5, 0.25, 0.1, 1.0)
+    mapped = tracker.to_frame(local, frame_size)
+    assert np.allclose(mapped[0], (1200 / 2000, 300 / 1000, 0.1 * 400 / 2000, 1.0))
+    assert tracker.to_frame(None, frame_size) is None
+    print("✅ 坐标映射正确")
+
+
+def test_fallback_to_full_frame():
+    """测试置信度下降或人物占满画面时退回整帧检测"""
+    print("\n测试退回整帧...")
+
+    tracker = RoiTracker()
+    frame_size = (1920, 1080)
+    tracker.update(make_person(0.5, 0.5, 0.2), frame_size)
+    assert tracker.roi is not None
+
+    assert not tracker.confident(make_person(0.5, 0.5, 0.2, visibility=0.2))
+    assert tracker.update(None, frame_size) and tracker.roi is None, "丢失人物后应整帧检测"
+
+    # 人物占满画面时裁剪没有收益
+    tracker.update(make_person(0.5, 0.5, 0.8), (1000, 1000))
+    assert tracker.roi is None
+
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    assert tracker.crop(frame) is frame
+    print("✅ 退回整帧检测正常")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("运动员区域跟踪测试")
+    print("=" * 60)
+
+    tests = [
+        test_roi_around_small_person,
+        test_roi_stable_and_follows,
+        test_roi_mapping_roundtrip,
+        test_fallback_to_full_frame,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
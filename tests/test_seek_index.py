@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+测试关键帧索引 - 跳转规划和帧准确读取
+"""
+
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seek_index import FrameReader, SeekIndex, MAX_BLIND_GRABS
+from video_pipeline import FrameCache
+
+
+def create_test_video(path, frame_count=60, size=(160, 120)):
+    """创建每帧亮度不同的测试视频"""
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(path, fourcc, 30.0, size)
+    for i in range(frame_count):
+        frame = np.full((size[1], size[0], 3), (i * 4) % 256, dtype=np.uint8)
+        out.write(frame)
+    out.release()
+
+
+def test_plan_with_keyframes():
+    """测试有关键帧信息时的跳转规划"""
+    print("测试跳转规划...")
+
+    index = SeekIndex([0, 50, 100])
+    assert index.keyframe_before(0) == 0
+    assert index.keyframe_before(75) == 50
+    assert index.keyframe_before(100) == 100
+
+    # 当前位置在落点关键帧之后，顺序前进即可
+    assert index.plan(60, 90) is None
+    # 当前位置在落点关键帧之前，重新定位
+    assert index.plan(10, 90) == 90
+    # 向后跳转总是重新定位
+    assert index.plan(90, 60) == 60
+    # 读取下一帧不需要定位
+    assert index.plan(30, 30) is None
+    print("✅ 跳转规划正常")
+
+
+def test_plan_without_keyframes():
+    """测试没有关键帧信息时的跳转规划"""
+    print("\n测试无关键帧信息时的规划...")
+
+    index = SeekIndex(None)
+    assert index.plan(10, 10 + MAX_BLIND_GRABS) is None
+    assert index.plan(10, 11 + MAX_BLIND_GRABS) == 11 + MAX_BLIND_GRABS
+    assert index.plan(10, 5) == 5
+    print("✅ 无关键帧信息时规划正常")
+
+
+def test_reader_matches_sequential_decode():
+    """测试随机读取的帧与顺序解码结果一致"""
+    print("\n测试帧准确读取...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = os.path.join(temp_dir, "seek_test.mp4")
+        create_test_video(video_path, frame_count=60)
+
+        cap = cv2.VideoCapture(video_path)
+        expected = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            expected.append(frame)
+        cap.release()
+
+        index = SeekIndex.for_video(video_path, "seektest", cache_dir=temp_dir)
+        cap = cv2.VideoCapture(video_path)
+        reader = FrameReader(cap, index)
+        for target in [0, 1, 40, 41, 45, 10, 59, 30]:
+            frame = reader.read_at(target)
+            assert frame is not None, f"第{target}帧读取失败"
+            assert np.array_equal(frame, expected[target]), f"第{target}帧内容不一致"
+            assert reader.position == target + 1
+
+        assert reader.read_at(len(expected)) is None, "超出范围应返回None"
+        cap.release()
+
+        # 使用帧缓存时，重复读取同一帧不再解码
+        cache = FrameCache()
+        cap = cv2.VideoCapture(video_path)
+        reader = FrameReader(cap, index, cache)
+        assert np.array_equal(reader.read_at(20), expected[20])
+        position = reader.position
+        assert np.array_equal(reader.read_at(20), expected[20])
+        assert reader.position == position, "缓存命中时不应访问解码器"
+        assert cache.stats()["hits"] == 1
+        cap.release()
+
+        # 扫描成功时写入缓存，再次打开直接读取
+        if index.keyframes is not None:
+            assert os.path.exists(os.path.join(temp_dir, "seektest.keyframes.npy"))
+            cached = SeekIndex.for_video(video_path, "seektest", cache_dir=temp_dir)
+            assert cached.keyframes == index.keyframes
+        print("✅ 帧准确读取正常")
+
+
+def test_index_loaded_in_background():
+    """测试索引在后台线程中就绪，就绪前按帧号定位仍然帧准确"""
+    print("\n测试后台加载索引...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = os.path.join(temp_dir, "background_index.mp4")
+        create_test_video(video_path, frame_count=60)
+
+        cap = cv2.VideoCapture(video_path)
+        reader = FrameReader(cap, SeekIndex(None))
+        thread = reader.load_index_in_background(video_path, "background", cache_dir=temp_dir)
+        frame = reader.read_at(45)
+        assert frame is not None and abs(frame.mean() - 45 * 4) < 3 and reader.position == 46
+
+        thread.join()
+        expected = SeekIndex.for_video(video_path, "background", cache_dir=temp_dir)
+        assert reader.seek_index.keyframes == expected.keyframes
+        frame = reader.read_at(10)
+        assert frame is not None and abs(frame.mean() - 10 * 4) < 3
+        cap.release()
+        print("✅ 后台加载索引正常")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("关键帧索引测试")
+    print("=" * 60)
+
+    tests = [
+        test_plan_with_keyframes,
+        test_plan_without_keyframes,
+        test_reader_matches_sequential_decode,
+        test_index_loaded_in_background,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试导出编码后端 - ffmpeg管道编码命令和编码结果
+"""
+
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_encoder import (
+    bitrate_to_kbps, build_ffmpeg_command, create_video_encoder, ffmpeg_available,
+    FFmpegPipeEncoder, release_encoder
+)
+
+
+def test_ffmpeg_command():
+    """测试质量设置和音频映射都体现在ffmpeg命令中"""
+    print("测试ffmpeg命令构建...")
+
+    cmd = build_ffmpeg_command(
+        "out.mp4", 29.97, (720, 1280),
+        {"bitrate": "5000k", "crf": 18, "preset": "slow"},
+        audio_source="source.mov"
+    )
+    assert cmd[cmd.index('-s') + 1] == "720x1280"
+    assert cmd[cmd.index('-crf') + 1] == "18"
+    assert cmd[cmd.index('-preset') + 1] == "slow"
+    assert cmd[cmd.index('-maxrate') + 1] == "5000k"
+    assert cmd[cmd.index('-bufsize') + 1] == "10000k"
+    assert "1:a:0?" in cmd and "source.mov" in cmd
+    assert cmd[-1] == "out.mp4"
+
+    video_only = build_ffmpeg_command("out.mp4", 30, (64, 48))
+    assert "-c:a" not in video_only and "1:a:0?" not in video_only
+    assert bitrate_to_kbps("2.5M") == 2500
+    print("✅ 命令构建正确")
+
+
+def test_encoder_roundtrip():
+    """测试编码器写出的视频帧数和尺寸"""
+    print("\n测试编码器输出...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output = os.path.join(temp_dir, "encoded.mp4")
+        encoder, audio_muxed = create_video_encoder(output, 30.0, (64, 48), {"crf": 23, "preset": "veryfast"})
+        for i in range(12):
+            encoder.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+        release_encoder(encoder)
+
+        cap = cv2.VideoCapture(output)
+        assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 12
+        assert int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == 64
+        cap.release()
+        assert not audio_muxed
+
+        backend = "ffmpeg管道" if isinstance(encoder, FFmpegPipeEncoder) else "OpenCV"
+        assert isinstance(encoder, FFmpegPipeEncoder) == ffmpeg_available()
+        print(f"✅ {backend} 编码输出 12 帧")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("导出编码后端测试")
+    print("=" * 60)
+
+    tests = [
+        test_ffmpeg_command,
+        test_encoder_roundtrip,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+测试后台解码管线 - 环形缓冲区和后台解码器
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_pipeline import FrameCache, FrameRingBuffer, VideoDecoder
+
+
+def create_test_video(path, frame_count=30, size=(160, 120)):
+    """创建带帧序号标记的测试视频"""
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(path, fourcc, 30.0, size)
+    for i in range(frame_count):
+        frame = np.full((size[1], size[0], 3), (i * 8) % 256, dtype=np.uint8)
+        out.write(frame)
+    out.release()
+
+
+def test_ring_buffer_limits():
+    """测试缓冲区的帧数和字节预算限制"""
+    print("测试环形缓冲区限制...")
+
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    # 帧数限制
+    buffer = FrameRingBuffer(max_frames=3, max_bytes=10 * frame.nbytes)
+    for i in range(3):
+        assert buffer.put(i, frame, timeout=0.1)
+    assert not buffer.put(3, frame, timeout=0.05), "超过帧数上限时应等待超时"
+    assert len(buffer) == 3
+
+    # 先进先出
+    index, _ = buffer.get_nowait()
+    assert index == 0
+    assert buffer.put(3, frame, timeout=0.1)
+
+    # 字节预算限制（至少允许一帧）
+    small = FrameRingBuffer(max_frames=10, max_bytes=frame.nbytes // 2)
+    assert small.put(0, frame, timeout=0.1), "字节预算小于一帧时仍应允许缓存一帧"
+    assert not small.put(1, frame, timeout=0.05)
+
+    # 关闭后唤醒并拒绝写入
+    small.close()
+    assert not small.put(2, frame, timeout=0.1)
+
+    buffer.clear()
+    assert buffer.get_nowait() is None
+    print("✅ 环形缓冲区限制正常")
+
+
+def test_decoder_reads_all_frames():
+    """测试后台解码器按顺序读取全部帧"""
+    print("\n测试后台解码器...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = os.path.join(temp_dir, "decoder_test.mp4")
+        create_test_video(video_path, frame_count=30)
+
+        decoder = VideoDecoder(video_path, max_frames=4)
+        decoder.start(10)
+
+        indices = []
+        deadline = time.time() + 10
+        while not decoder.at_end() and time.time() < deadline:
+            item = decoder.read()
+            if item is None:
+                time.sleep(0.001)
+                continue
+            indices.append(item[0])
+            assert len(decoder.buffer) <= 4
+
+        decoder.stop()
+
+        assert indices == list(range(10, 30)), f"帧序号不连续: {indices}"
+        print(f"✅ 从第10帧开始解码了 {len(indices)} 帧")
+
+
+def test_decoder_restart():
+    """测试解码器停止后可从新位置重新启动"""
+    print("\n测试解码器重启...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = os.path.join(temp_dir, "decoder_restart.mp4")
+        create_test_video(video_path, frame_count=20)
+
+        decoder = VideoDecoder(video_path, max_frames=2)
+        decoder.start(0)
+        time.sleep(0.1)
+        decoder.stop()
+        assert not decoder.running
+        assert decoder.read() is None, "停止后缓冲区应被清空"
+
+        decoder.start(15)
+        item = None
+        deadline = time.time() + 5
+        while item is None and time.time() < deadline:
+            item = decoder.read()
+            time.sleep(0.001)
+        decoder.stop()
+
+        assert item is not None and item[0] == 15
+        print("✅ 解码器重启正常")
+
+
+def test_frame_cache_lru_budget():
+    """测试帧缓存按字节预算淘汰最久未使用的帧"""
+    print("\n测试帧LRU缓存...")
+
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    cache = FrameCache(max_bytes=3 * frame.nbytes)
+    for i in range(3):
+        cache.put(i, frame.copy())
+    assert len(cache) == 3
+
+    # 访问第0帧后它成为最近使用，放入新帧时淘汰第1帧
+    assert cache.get(0) is not None
+    cache.put(3, frame.copy())
+    assert 1 not in cache and 0 in cache and 3 in cache
+    assert cache.nbytes == 3 * frame.nbytes
+
+    # 缓存的帧为只读
+    assert not cache.get(3).flags.writeable
+
+    assert cache.get(1) is None
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["evictions"] == 1
+    assert abs(stats["hit_rate"] - 2 / 3) < 1e-9
+
+    # 预算小于一帧时仍保留最近的一帧
+    small = FrameCache(max_bytes=frame.nbytes // 2)
+    small.put(0, frame.copy())
+    small.put(1, frame.copy())
+    assert len(small) == 1 and 1 in small
+
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+    print("✅ 帧LRU缓存正常")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("后台解码管线测试")
+    print("=" * 60)
+
+    tests = [
+        test_ring_buffer_limits,
+        test_decoder_reads_all_frames,
+        test_decoder_restart,
+        test_frame_cache_lru_budget,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+测试水印合成器 - 图片/文字水印缓存和区域混合
+"""
+
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watermark import WatermarkCompositor, WatermarkSettings
+
+
+def create_logo(path, size=(40, 20)):
+    """创建左半透明、右半不透明的BGRA水印图片"""
+    logo = np.zeros((size[1], size[0], 4), dtype=np.uint8)
+    logo[:, :, :3] = 255
+    logo[:, size[0] // 2:, 3] = 255
+    cv2.imwrite(path, logo)
+
+
+def image_only_settings(path, **kwargs):
+    """只启用图片水印的设置"""
+    kwargs.setdefault("image_position", "左上角")
+    return WatermarkSettings(text_enabled=False, image_path=path, **kwargs)
+
+
+def test_stamp_cached_per_frame_size():
+    """测试水印图片只读取一次，并按帧尺寸缓存"""
+    print("测试水印缓存...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "logo.png")
+        create_logo(path)
+
+        compositor = WatermarkCompositor(image_only_settings(path, opacity=100, size="大"))
+        frame = np.zeros((400, 600, 3), dtype=np.uint8)
+        compositor.apply(frame)
+        stamp = compositor.image_stamp(600, 400)
+        assert stamp is not None and stamp.width == int(400 * 0.18)
+
+        # 删除图片后仍使用已读取的图片
+        os.remove(path)
+        assert compositor.image_stamp(600, 400) is stamp
+        assert compositor.image_stamp(300, 200) is not None
+
+        # 位置改变不影响缓存，透明度改变时重新生成
+        compositor.set_settings(image_only_settings(path, opacity=100, size="大",
+                                                    image_position="右下角"))
+        assert compositor.image_stamp(600, 400) is stamp
+        compositor.set_settings(image_only_settings(path, opacity=50, size="大"))
+        assert compositor.image_stamp(600, 400) is not stamp
+        print("✅ 水印缓存正常")
+
+
+def test_blend_respects_alpha_and_opacity():
+    """测试只在水印区域内按透明通道和不透明度混合"""
+    print("\n测试水印混合...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "logo.png")
+        create_logo(path)
+
+        compositor = WatermarkCompositor(image_only_settings(path, opacity=50, size="大"))
+        frame = np.zeros((400, 600, 3), dtype=np.uint8)
+        result = compositor.apply(frame)
+        assert result is frame, "水印应就地绘制"
+
+        stamp = compositor.image_stamp(600, 400)
+        x = y = 20
+        # 不透明部分按50%混合，透明部分保持不变
+        right = frame[y + stamp.height // 2, x + stamp.width - 2]
+        left = frame[y + stamp.height // 2, x + 1]
+        assert np.all(np.abs(right.astype(int) - 128) <= 2), right
+        assert np.all(left == 0), left
+        # 水印区域之外不变
+        assert not frame[y + stamp.height:].any()
+        print("✅ 水印混合正常")
+
+
+def test_text_stamp_blends_only_text_region():
+    """测试文字水印只在文字区域内混合，并在文字改变时重新光栅化"""
+    print("\n测试文字水印...")
+
+    settings = WatermarkSettings(image_enabled=False, text="SnowNavi",
+                                 text_position="左上角", opacity=100)
+    compositor = WatermarkCompositor(settings)
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    compositor.apply(frame)
+
+    stamp = compositor.text_stamp(1280, 720)
+    ys, xs = np.nonzero(frame.any(axis=2))
+    assert len(xs) > 0, "应绘制文字"
+    assert xs.min() >= 20 - stamp.pad and xs.max() < 20 + stamp.text_width + stamp.pad
+    assert ys.min() >= 20 - stamp.pad and ys.max() < 20 + stamp.height
+    assert frame.max() == 255, "不透明度100%时文字为纯白"
+
+    # 位置改变沿用图层，文字改变时重新生成
+    compositor.set_settings(WatermarkSettings(image_enabled=False, text="SnowNavi",
+                                              text_position="居中", opacity=100))
+    assert compositor.text_stamp(1280, 720) is stamp
+    compositor.set_settings(WatermarkSettings(image_enabled=False, text="Coach",
+                                              text_position="居中", opacity=100))
+    assert compositor.text_stamp(1280, 720) is not stamp
+
+    # 超出画面的部分被裁掉
+    small = np.zeros((30, 40, 3), dtype=np.uint8)
+    compositor.apply(small)
+    print("✅ 文字水印正常")
+
+
+def main():
+    """主测试函数"""
+    print("=" * 60)
+    print("水印合成器测试")
+    print("=" * 60)
+
+    tests = [
+        test_stamp_cached_per_frame_size,
+        test_blend_respects_alpha_and_opacity,
+        test_text_stamp_blends_only_text_region,
+    ]
+
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            print(f"❌ 测试失败: {e}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+视频编码 - 导出时的编码后端
+优先将原始BGR帧通过管道送入单个ffmpeg进程编码（同时合并原始音频、应用质量设置），
+没有ffmpeg时退回到 cv2.VideoWriter
+"""
+
+import shutil
+import subprocess
+import tempfile
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# 各质量档位默认的编码参数
+DEFAULT_QUALITY = {"bitrate": "2500k", "crf": 23, "preset": "medium"}
+
+
+def ffmpeg_available() -> bool:
+    """系统中是否有ffmpeg可执行文件"""
+    return shutil.which("ffmpeg") is not None
+
+
+def bitrate_to_kbps(bitrate: str) -> int:
+    """将 "5000k" / "5M" 形式的码率转换为kbps"""
+    text = str(bitrate).strip().lower()
+    if text.endswith("m"):
+        return int(float(text[:-1]) * 1000)
+    if text.endswith("k"):
+        return int(float(text[:-1]))
+    return int(float(text) / 1000)
+
+
+def build_ffmpeg_command(output_path: str, fps: float, size: Tuple[int, int],
+                         quality: Optional[dict] = None,
+                         audio_source: Optional[str] = None) -> List[str]:
+    """
+    构建从标准输入读取原始帧的ffmpeg命令
+
+    Args:
+        output_path: 输出文件路径
+        fps: 输出帧率
+        size: 帧尺寸 (宽, 高)
+        quality: 质量设置 {"crf", "preset", "bitrate"}，bitrate作为最大码率
+        audio_source: 提供音频的原始视频文件，None表示不含音频
+    """
+    quality = dict(DEFAULT_QUALITY, **(quality or {}))
+    width, height = size
+
+    cmd = ['ffmpeg', '-y', '-v', 'error',
+           '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{width}x{height}',
+           '-r', f'{fps:.6g}', '-i', '-']
+    if audio_source:
+        cmd += ['-i', audio_source]
+
+    cmd += ['-map', '0:v:0']
+    if audio_source:
+        # 末尾的?表示原始视频没有音频流时忽略
+        cmd += ['-map', '1:a:0?', '-c:a', 'aac', '-shortest']
+
+    cmd += ['-c:v', 'libx264',
+            '-preset', str(quality["preset"]),
+            '-crf', str(quality["crf"])]
+    if quality.get("bitrate"):
+        maxrate = bitrate_to_kbps(quality["bitrate"])
+        cmd += ['-maxrate', f'{maxrate}k', '-bufsize', f'{maxrate * 2}k']
+
+    # yuv420p保证常见播放器兼容，faststart便于网络播放
+    cmd += ['-pix_fmt', 'yuv420p', '-movflags', '+faststart', output_path]
+    return cmd
+
+
+class FFmpegPipeEncoder:
+    """通过标准输入管道把帧送入ffmpeg编码（接口与 cv2.VideoWriter 相同）"""
+
+    def __init__(self, output_path: str, fps: float, size: Tuple[int, int],
+                 quality: Optional[dict] = None, audio_source: Optional[str] = None):
+        self.output_path = output_path
+        self.size = (int(size[0]), int(size[1]))
+        self.has_audio = bool(audio_source)
+        # stderr写入临时文件，避免管道写满阻塞ffmpeg
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            build_ffmpeg_command(output_path, fps, self.size, quality, audio_source),
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr
+        )
+
+    def isOpened(self) -> bool:
+        return self._process.poll() is None
+
+    def write(self, frame: np.ndarray):
+        """写入一帧BGR图像"""
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        try:
+            self._process.stdin.write(np.ascontiguousarray(frame).data)
+        except (BrokenPipeError, OSError):
+            raise Exception(f"FFmpeg编码进程已退出: {self.error_output()}")
+
+    def release(self):
+        """结束输入并等待编码完成"""
+        if self._process.stdin and not self._process.stdin.closed:
+            try:
+                self._process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        returncode = self._process.wait()
+        error = self.error_output()
+        self._stderr.close()
+        if returncode != 0:
+            raise Exception(f"FFmpeg编码失败: {error}")
+
+    def abort(self):
+        """取消编码（不保证输出文件完整）"""
+        self._process.kill()
+        self._process.wait()
+        self._stderr.close()
+
+    def error_output(self) -> str:
+        """ffmpeg输出的错误信息"""
+        try:
+            self._stderr.seek(0)
+            return self._stderr.read().decode("utf-8", errors="replace").strip()
+        except (ValueError, OSError):
+            return ""
+
+
+def open_video_writer(output_path: str, fps: float, size) -> cv2.VideoWriter:
+    """创建OpenCV视频写入器，H264不可用时回退到mp4v"""
+    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'H264'), fps, size)
+    if not out.isOpened():
+        print("H264编码器失败，尝试使用mp4v编码器")
+        out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    if not out.isOpened():
+        raise Exception(f"无法创建输出视频文件。尺寸: {size[0]}x{size[1]}, FPS: {fps}")
+    return out
+
+
+def create_video_encoder(output_path: str, fps: float, size: Tuple[int, int],
+                         quality: Optional[dict] = None, audio_source: Optional[str] = None):
+    """
+    创建导出使用的编码器
+
+    Returns:
+        (编码器, 是否已在编码时合并音频)；没有ffmpeg时返回 cv2.VideoWriter，需要之后另行添加音频
+    """
+    if ffmpeg_available():
+        try:
+            encoder = FFmpegPipeEncoder(output_path, fps, size, quality, audio_source)
+            return encoder, encoder.has_audio
+        except OSError as e:
+            print(f"启动FFmpeg编码失败，改用OpenCV编码: {e}")
+
+    return open_video_writer(output_path, fps, size), False
+
+
+def release_encoder(encoder, cancelled: bool = False):
+    """释放编码器（取消时直接终止ffmpeg，不等待编码完成）"""
+    if cancelled and isinstance(encoder, FFmpegPipeEncoder):
+        encoder.abort()
+    else:
+        encoder.release()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+视频处理管线 - 后台解码模块
+负责在工作线程中预读解码视频帧，GUI线程只从缓冲区取出已解码的帧；
+已解码的帧同时进入按字节预算淘汰的LRU缓存，来回拖动和逐帧查看时直接命中内存
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Hashable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def frame_timestamp_ms(frame_index: int, fps: float) -> Optional[int]:
+    """帧的显示时间戳（毫秒），帧率未知时返回None"""
+    if not fps or fps <= 0:
+        return None
+    return int(round(frame_index * 1000.0 / fps))
+
+
+class FrameRingBuffer:
+    """有界帧环形缓冲区（同时受帧数和字节预算限制）"""
+
+    def __init__(self, max_frames: int = 8, max_bytes: int = 256 * 1024 * 1024):
+        """
+        初始化缓冲区
+
+        Args:
+            max_frames: 最多缓存的帧数
+            max_bytes: 缓存帧占用的最大字节数（至少允许缓存一帧）
+        """
+        self.max_frames = max(1, int(max_frames))
+        self.max_bytes = max(1, int(max_bytes))
+        self._items = deque()
+        self._nbytes = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._items)
+
+    @property
+    def nbytes(self) -> int:
+        """当前缓存帧占用的字节数"""
+        with self._condition:
+            return self._nbytes
+
+    def _has_room(self, frame_bytes: int) -> bool:
+        """检查是否还能放入一帧"""
+        if not self._items:
+            return True
+        return (len(self._items) < self.max_frames and
+                self._nbytes + frame_bytes <= self.max_bytes)
+
+    def put(self, frame_index: int, frame: np.ndarray, timeout: Optional[float] = None) -> bool:
+        """
+        放入一帧，缓冲区已满时阻塞等待
+
+        Returns:
+            是否成功放入（缓冲区关闭或等待超时时返回False）
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._closed or self._has_room(frame.nbytes), timeout
+            ):
+                return False
+            if self._closed:
+                return False
+            self._items.append((frame_index, frame))
+            self._nbytes += frame.nbytes
+            self._condition.notify_all()
+            return True
+
+    def get_nowait(self) -> Optional[Tuple[int, np.ndarray]]:
+        """取出最早的一帧，缓冲区为空时立即返回None"""
+        with self._condition:
+            if not self._items:
+                return None
+            frame_index, frame = self._items.popleft()
+            self._nbytes -= frame.nbytes
+            self._condition.notify_all()
+            return frame_index, frame
+
+    def clear(self):
+        """清空缓冲区"""
+        with self._condition:
+            self._items.clear()
+            self._nbytes = 0
+            self._condition.notify_all()
+
+    def close(self):
+        """关闭缓冲区，唤醒所有等待的线程"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def reopen(self):
+        """重新打开已关闭的缓冲区"""
+        with self._condition:
+            self._closed = False
+
+
+class FrameCache:
+    """
+    按字节预算淘汰的已解码帧LRU缓存（线程安全）
+
+    键一般为帧序号，也可以用 (帧序号, 变体) 这样的元组缓存处理后的帧。
+    缓存的帧被设为只读，使用方需要修改时应先复制。
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: 缓存帧占用的最大字节数（至少保留最近的一帧）
+        """
+        self.max_bytes = max(1, int(max_bytes))
+        self._items = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    @property
+    def nbytes(self) -> int:
+        """当前缓存帧占用的字节数"""
+        with self._lock:
+            return self._nbytes
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """读取缓存帧并标记为最近使用，未命中时返回None"""
+        with self._lock:
+            frame = self._items.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key: Hashable, frame: np.ndarray):
+        """放入一帧，超出预算时淘汰最久未使用的帧"""
+        frame.flags.writeable = False
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._items[key] = frame
+            self._nbytes += frame.nbytes
+
+            while self._nbytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存（保留命中统计）"""
+        with self._lock:
+            self._items.clear()
+            self._nbytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """命中统计：帧数、字节数、命中/未命中/淘汰次数和命中率"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "frames": len(self._items),
+                "bytes": self._nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class VideoDecoder:
+    """后台视频解码器：在独立线程中预读解码帧到环形缓冲区"""
+
+    def __init__(self, video_path: str, max_frames: int = 8, max_bytes: int = 256 * 1024 * 1024):
+        """
+        初始化解码器
+
+        Args:
+            video_path: 视频文件路径（解码线程使用独立的VideoCapture）
+            max_frames: 预读帧数上限
+            max_bytes: 预读帧内存预算（字节）
+        """
+        self.video_path = video_path
+        self.buffer = FrameRingBuffer(max_frames, max_bytes)
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._eof = False
+
+    @property
+    def running(self) -> bool:
+        """解码线程是否正在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, start_frame: int = 0):
+        """从指定帧开始后台解码（如已在运行则先停止）"""
+        self.stop()
+        self.buffer.clear()
+        self.buffer.reopen()
+        self._stop_event.clear()
+        self._eof = False
+        self._thread = threading.Thread(
+            target=self._decode_loop, args=(int(start_frame),),
+            name="VideoDecoder", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """停止后台解码并丢弃已缓存的帧"""
+        if self._thread is not None:
+            self._stop_event.set()
+            self.buffer.close()
+            self._thread.join()
+            self._thread = None
+        self.buffer.clear()
+
+    def read(self) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        取出下一帧（不阻塞）
+
+        Returns:
+            (帧序号, 帧) 或 None（暂无可用帧）
+        """
+        return self.buffer.get_nowait()
+
+    def at_end(self) -> bool:
+        """是否已解码到视频末尾且缓冲区已取空"""
+        return self._eof and len(self.buffer) == 0
+
+    def _decode_loop(self, start_frame: int):
+        """解码线程主循环"""
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            if not cap.isOpened():
+                self._eof = True
+                return
+
+            if start_frame > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+            frame_index = start_frame
+            while not self._stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    self._eof = True
+                    break
+
+                if not self.buffer.put(frame_index, frame):
+                    break
+                frame_index += 1
+
+        except Exception as e:
+            print(f"后台解码出错: {e}")
+            self._eof = True
+        finally:
+            cap.release()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+水印 - 与界面无关的文字/图片水印叠加函数
+水印参数保存在可序列化的 WatermarkSettings 中，导出子进程可以直接使用；
+连续处理多帧时由 WatermarkCompositor 缓存缩放好的水印图片
+"""
+
+import os
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# 水印离画面边缘的距离（像素）
+WATERMARK_MARGIN = 20
+
+# 文字水印字体缩放（按“小/中/大”）
+TEXT_SIZE_MAP = {"小": 0.5, "中": 0.8, "大": 1.2}
+
+# 图片水印宽度占画面较短边的比例（按“小/中/大”）
+IMAGE_SIZE_MAP = {"小": 0.08, "中": 0.12, "大": 0.18}
+
+
+class WatermarkSettings:
+    """水印设置"""
+
+    def __init__(self, enabled: bool = True,
+                 text_enabled: bool = True, text: str = "SnowNavi Pose Analyzer",
+                 text_position: str = "右下角",
+                 image_enabled: bool = True, image_path: str = "assets/snownavi_logo.png",
+                 image_position: str = "左下角",
+                 opacity: int = 70, size: str = "中"):
+        """
+        Args:
+            enabled: 是否启用水印
+            text_enabled: 是否添加文字水印
+            text: 水印文字
+            text_position: 文字水印位置（右下角/右上角/左下角/左上角/居中）
+            image_enabled: 是否添加图片水印
+            image_path: 水印图片路径
+            image_position: 图片水印位置
+            opacity: 不透明度（0-100）
+            size: 水印大小（小/中/大）
+        """
+        self.enabled = enabled
+        self.text_enabled = text_enabled
+        self.text = text
+        self.text_position = text_position
+        self.image_enabled = image_enabled
+        self.image_path = image_path
+        self.image_position = image_position
+        self.opacity = opacity
+        self.size = size
+
+
+def watermark_origin(position: str, frame_width: int, frame_height: int,
+                     mark_width: int, mark_height: int):
+    """计算水印左上角坐标"""
+    margin = WATERMARK_MARGIN
+    if position == "右下角":
+        return frame_width - mark_width - margin, frame_height - mark_height - margin
+    elif position == "右上角":
+        return frame_width - mark_width - margin, margin
+    elif position == "左下角":
+        return margin, frame_height - mark_height - margin
+    elif position == "左上角":
+        return margin, margin
+    else:  # 居中
+        return (frame_width - mark_width) // 2, (frame_height - mark_height) // 2
+
+
+def apply_watermarks(frame: np.ndarray, settings: WatermarkSettings) -> np.ndarray:
+    """按设置添加文字和图片水印（一次性使用，连续处理多帧时应使用 WatermarkCompositor）"""
+    return WatermarkCompositor(settings).apply(frame)
+
+
+def add_text_watermark(frame: np.ndarray, settings: WatermarkSettings) -> np.ndarray:
+    """添加文字水印到帧（一次性使用）"""
+    return WatermarkCompositor(settings).add_text_watermark(frame)
+
+
+def add_image_watermark(frame: np.ndarray, settings: WatermarkSettings) -> np.ndarray:
+    """添加图片水印到帧（一次性使用）"""
+    return WatermarkCompositor(settings).add_image_watermark(frame)
+
+
+class Stamp:
+    """
+    预乘透明度的水印图层
+
+    以整数运算混合：out = (premultiplied + roi * inverse_alpha) / 255，
+    premultiplied = bgr * alpha，inverse_alpha = 255 - alpha，alpha已包含整体不透明度
+    """
+
+    def __init__(self, bgr: np.ndarray, alpha: np.ndarray, opacity: float):
+        """
+        Args:
+            bgr: 水印颜色 (h, w, 3)
+            alpha: 水印透明通道 (h, w)，0-255
+            opacity: 整体不透明度（0-1）
+        """
+        alpha = np.rint(alpha.astype(np.float32) * opacity).astype(np.uint16)[:, :, np.newaxis]
+        self.height, self.width = alpha.shape[:2]
+        self.premultiplied = bgr.astype(np.uint16) * alpha
+        self.inverse_alpha = 255 - alpha
+
+    def blend(self, frame: np.ndarray, x: int, y: int):
+        """就地叠加到帧的 (x, y) 处，只处理水印覆盖且在画面内的区域"""
+        frame_height, frame_width = frame.shape[:2]
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(frame_width, x + self.width), min(frame_height, y + self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        sx, sy = x0 - x, y0 - y
+        h, w = y1 - y0, x1 - x0
+        roi = frame[y0:y1, x0:x1]
+        blended = (self.premultiplied[sy:sy + h, sx:sx + w] +
+                   roi * self.inverse_alpha[sy:sy + h, sx:sx + w])
+        blended += 127
+        blended //= 255
+        roi[...] = blended
+
+
+class ImageStamp(Stamp):
+    """缩放到目标尺寸的图片水印"""
+
+    def __init__(self, image: np.ndarray, width: int, height: int, opacity: float):
+        resized = cv2.resize(image, (width, height), interpolation=cv2.INTER_LANCZOS4)
+
+        # 统一为BGR和0-255的alpha
+        if resized.ndim == 2:
+            bgr = cv2.cvtColor(resized, cv2.COLOR_GRAY2BGR)
+            alpha = np.full((height, width), 255, dtype=np.uint8)
+        elif resized.shape[2] == 4:  # 带透明通道的PNG
+            bgr = resized[:, :, :3]
+            alpha = resized[:, :, 3]
+        else:
+            bgr = resized
+            alpha = np.full((height, width), 255, dtype=np.uint8)
+
+        super().__init__(bgr, alpha, opacity)
+
+
+class TextStamp(Stamp):
+    """预先光栅化的白色文字水印（文字边缘抗锯齿作为透明通道）"""
+
+    FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+    def __init__(self, text: str, font_scale: float, opacity: float):
+        thickness = max(1, int(font_scale * 2))
+        (text_width, text_height), baseline = cv2.getTextSize(text, self.FONT, font_scale, thickness)
+
+        # 四周留出笔画粗细的余量，避免抗锯齿边缘被裁掉
+        self.pad = thickness + 1
+        self.text_width = text_width
+        self.text_height = text_height
+        mask = np.zeros((text_height + baseline + 2 * self.pad, text_width + 2 * self.pad), dtype=np.uint8)
+        cv2.putText(mask, text, (self.pad, self.pad + text_height), self.FONT, font_scale,
+                    255, thickness, cv2.LINE_AA)
+
+        bgr = np.full(mask.shape + (3,), 255, dtype=np.uint8)
+        super().__init__(bgr, mask, opacity)
+
+
+class WatermarkCompositor:
+    """
+    水印合成器
+
+    水印图片只读取一次，文字只光栅化一次，按帧尺寸缓存预乘透明度后的水印图层，
+    每帧只需在水印区域内混合。设置改变时调用 set_settings() 使缓存失效。
+    """
+
+    def __init__(self, settings: WatermarkSettings):
+        self.settings = settings
+        self._image = None
+        self._image_path = None
+        self._stamps = {}
+        self._text_stamps = {}
+
+    def set_settings(self, settings: WatermarkSettings):
+        """更新水印设置，只丢弃受影响的缓存"""
+        old = self.settings
+        self.settings = settings
+        if settings.image_path != old.image_path:
+            self._image = None
+            self._image_path = None
+        if (settings.image_path, settings.size, settings.opacity) != (old.image_path, old.size, old.opacity):
+            self._stamps = {}
+        if (settings.text, settings.size, settings.opacity) != (old.text, old.size, old.opacity):
+            self._text_stamps = {}
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """按设置添加文字和图片水印"""
+        settings = self.settings
+        if not settings.enabled:
+            return frame
+        if settings.text_enabled and settings.text:
+            frame = self.add_text_watermark(frame)
+        if settings.image_enabled and settings.image_path:
+            frame = self.add_image_watermark(frame)
+        return frame
+
+    def text_stamp(self, frame_width: int, frame_height: int) -> TextStamp:
+        """获取该帧尺寸下的文字水印（按需生成并缓存）"""
+        stamps = self._text_stamps
+        stamp = stamps.get((frame_width, frame_height))
+        if stamp is None:
+            # 根据大小设置字体缩放，并按视频分辨率调整
+            font_scale = TEXT_SIZE_MAP.get(self.settings.size, 0.8)
+            font_scale *= min(frame_width, frame_height) / 1000.0
+            stamp = TextStamp(self.settings.text, font_scale, self.settings.opacity / 100.0)
+            stamps[(frame_width, frame_height)] = stamp
+        return stamp
+
+    def add_text_watermark(self, frame: np.ndarray) -> np.ndarray:
+        """添加文字水印到帧"""
+        try:
+            frame_height, frame_width = frame.shape[:2]
+            stamp = self.text_stamp(frame_width, frame_height)
+
+            # 按文字本身的尺寸计算位置，再减去图层四周的余量
+            x, y = watermark_origin(self.settings.text_position, frame_width, frame_height,
+                                    stamp.text_width, stamp.text_height)
+            stamp.blend(frame, x - stamp.pad, y - stamp.pad)
+            return frame
+
+        except Exception as e:
+            print(f"添加文字水印时出错: {e}")
+            return frame
+
+    def load_image(self) -> Optional[np.ndarray]:
+        """读取水印图片（同一路径只读取一次）"""
+        path = self.settings.image_path
+        if self._image_path != path:
+            self._image_path = path
+            self._image = None
+            if not os.path.exists(path):
+                print(f"水印图片不存在: {path}")
+            else:
+                self._image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+                if self._image is None:
+                    print(f"无法读取水印图片: {path}")
+        return self._image
+
+    def image_stamp(self, frame_width: int, frame_height: int) -> Optional[ImageStamp]:
+        """获取该帧尺寸下的图片水印（按需生成并缓存）"""
+        stamps = self._stamps
+        stamp = stamps.get((frame_width, frame_height))
+        if stamp is not None:
+            return stamp
+
+        image = self.load_image()
+        if image is None:
+            return None
+
+        # 计算水印大小（基于帧的较小边），保持宽高比，且不超出画面
+        scale_factor = IMAGE_SIZE_MAP.get(self.settings.size, 0.12)
+        width = int(min(frame_width, frame_height) * scale_factor)
+        height = int(width * image.shape[0] / image.shape[1])
+        width, height = min(width, frame_width), min(height, frame_height)
+        if width <= 0 or height <= 0:
+            return None
+
+        stamp = ImageStamp(image, width, height, self.settings.opacity / 100.0)
+        stamps[(frame_width, frame_height)] = stamp
+        return stamp
+
+    def add_image_watermark(self, frame: np.ndarray) -> np.ndarray:
+        """添加图片水印到帧"""
+        try:
+            frame_height, frame_width = frame.shape[:2]
+            stamp = self.image_stamp(frame_width, frame_height)
+            if stamp is None:
+                return frame
+
+            # 计算水印位置，确保不会超出帧边界
+            x, y = watermark_origin(self.settings.image_position, frame_width, frame_height,
+                                    stamp.width, stamp.height)
+            x = max(0, min(x, frame_width - stamp.width))
+            y = max(0, min(y, frame_height - stamp.height))
+
+            stamp.blend(frame, x, y)
+            return frame
+
+        except Exception as e:
+            print(f"添加图片水印时出错: {e}")
+            return frame